@@ -0,0 +1,52 @@
+"""Shared helpers for benchmark reporting: percentiles and JSON result files."""
+from __future__ import annotations
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list (p in 0..1)."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def latency_summary(latencies: List[float], elapsed: float) -> dict:
+    """Throughput and latency percentiles (milliseconds) for one scenario."""
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "elapsedSeconds": round(elapsed, 4),
+        "throughput": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50Ms": round(percentile(values, 0.50) * 1000, 4),
+        "p95Ms": round(percentile(values, 0.95) * 1000, 4),
+        "p99Ms": round(percentile(values, 0.99) * 1000, 4),
+        "maxMs": round(values[-1] * 1000, 4) if values else 0.0,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def write_results(path: str, suite: str, params: dict, results: dict) -> None:
+    document = {
+        "suite": suite,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
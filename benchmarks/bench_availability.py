@@ -0,0 +1,94 @@
+"""Time "who is out" queries on the absence index against a scan of every employee's requests.
+
+Usage:
+    python -m benchmarks.bench_availability [--employees 100000] [--team-size 10] [--requests 3]
+"""
+from __future__ import annotations
+import argparse
+import gc
+import random
+import time
+from datetime import date
+
+from benchmarks._results import percentile
+from src.lib.store import InMemoryStore, VacationRequest
+
+
+def _populate(store: InMemoryStore, employees: int, team_size: int, per_employee: int) -> None:
+    rng = random.Random(7)
+    year_start = date(2031, 1, 6).toordinal()  # a Monday
+    requests = []
+    teams = {}
+    for e in range(employees):
+        employee_id = f"emp{e}"
+        teams[employee_id] = f"team{e // team_size}"
+        # Disjoint Monday-Friday weeks spread over the year
+        for i, week in enumerate(sorted(rng.sample(range(50), per_employee))):
+            start = year_start + 7 * week
+            requests.append(VacationRequest(
+                id=f"{employee_id}-{i}",
+                employee_id=employee_id,
+                start_date=date.fromordinal(start).isoformat(),
+                end_date=date.fromordinal(start + 4).isoformat(),
+                total_days=5,
+                total_hours=40,
+                status="Approved",
+            ))
+    store.bulk_load({}, requests, teams)
+
+
+def _scan(store: InMemoryStore, start: int, end: int, team=None):
+    """The pre-index approach: walk every employee's request list."""
+    found = []
+    for employee_id, requests in store.employee_id_to_requests.items():
+        employee_team = store.employee_id_to_team.get(employee_id)
+        if team is not None and employee_team != team:
+            continue
+        for r in requests:
+            if r.status == "Approved" and r.start_ordinal <= end and r.end_ordinal >= start:
+                found.append((r, employee_team))
+    return found
+
+
+def _time(fn, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return result, percentile(samples, 0.5), percentile(samples, 0.99)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--team-size", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=3, help="approved week-long requests per employee")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    store = InMemoryStore()
+    t0 = time.perf_counter()
+    _populate(store, args.employees, args.team_size, args.requests)
+    print(f"loaded {args.employees:,} employees in {time.perf_counter() - t0:.1f}s")
+    # Keep the loaded data out of GC passes so the percentiles measure the queries
+    gc.freeze()
+
+    day = date(2031, 6, 11).toordinal()
+    team = store.absentees(day, day)[0][1]
+    queries = [
+        ("team, one day", day, day, team),
+        ("team, one month", day - 10, day + 19, team),
+        ("everyone, one day", day, day, None),
+    ]
+    print(f"{'query':<18} {'rows':>7} {'index p50':>11} {'index p99':>11} {'scan p50':>11}")
+    for label, start, end, team in queries:
+        rows, p50, p99 = _time(lambda: store.absentees(start, end, team), args.repeat)
+        _, scan_p50, _ = _time(lambda: _scan(store, start, end, team), 3)
+        print(f"{label:<18} {len(rows):>7,} {p50 * 1e3:>9.3f}ms {p99 * 1e3:>9.3f}ms {scan_p50 * 1e3:>9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Throughput and latency of the REST and MCP paths under 1k concurrent connections, per store backend.
+
+Runs ``benchmarks.load`` once per backend in a fresh process (the backend is
+chosen at import time from ``STORE_BACKEND``) and prints a combined table.
+
+Usage:
+    python -m benchmarks.bench_concurrency [--concurrency 1000] [--requests 10000]
+        [--backends memory,sqlite] [--output concurrency.json]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks._results import write_results
+
+
+def run_backend(backend: str, args, workdir: str) -> dict:
+    out = os.path.join(workdir, f"{backend}.json")
+    env = dict(os.environ, STORE_BACKEND=backend)
+    if backend == "sqlite":
+        env["STORE_PATH"] = os.path.join(workdir, "bench.db")
+    elif backend == "journal":
+        env["STORE_PATH"] = os.path.join(workdir, "journal")
+    subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.load",
+            "--scenarios", args.scenarios,
+            "--concurrency", str(args.concurrency),
+            "--requests", str(args.requests),
+            "--employees", str(args.employees),
+            "--history", str(args.history),
+            "--output", out,
+        ],
+        env=env,
+        check=True,
+    )
+    with open(out, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--history", type=int, default=50)
+    parser.add_argument("--scenarios", default="balance,create,list,tool")
+    parser.add_argument("--backends", default="memory,sqlite")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends.split(","):
+            for scenario, summary in run_backend(backend, args, workdir).items():
+                results[f"{backend}/{scenario}"] = summary
+    if args.output:
+        write_results(args.output, "concurrency", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Throughput of RequestService.create_request as the thread count grows.
+
+Each thread submits requests for its own slice of employees, so with lock
+striping the threads should mostly not contend.
+
+Usage:
+    python -m benchmarks.bench_locking [--requests 20000] [--threads 1,2,4,8,16]
+"""
+from __future__ import annotations
+import argparse
+import threading
+import time
+from datetime import date, timedelta
+
+from src.lib.store import store
+from src.services.request_service import RequestService
+
+
+def run(threads: int, total: int, round_no: int) -> float:
+    per_thread = total // threads
+    barrier = threading.Barrier(threads + 1)
+    base = date(2040, 1, 1) + timedelta(days=3650 * round_no)
+
+    def worker(t: int) -> None:
+        employee = f"bench-{round_no}-{t}"
+        store.set_balance(employee, 10 ** 9)
+        barrier.wait()
+        for i in range(per_thread):
+            day = (base + timedelta(days=i)).isoformat()
+            RequestService.create_request(employee, day, day)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for t in pool:
+        t.join()
+    return per_thread * threads / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--threads", default="1,2,4,8,16")
+    args = parser.parse_args()
+
+    for round_no, threads in enumerate(int(t) for t in args.threads.split(",")):
+        rate = run(threads, args.requests, round_no)
+        print(f"threads={threads:<3} {rate:>12,.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Per-request latency of MCP tool calls with logging disabled, synchronous, and queued + sampled.
+
+Requests go through the ASGI app in-process (httpx ASGITransport) from
+concurrent clients; logs are written to a temporary file.
+
+Usage:
+    python -m benchmarks.bench_logging [--requests 5000] [--concurrency 50]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("MCP_RATE_LIMIT_PER_MINUTE", "100000000")
+
+import httpx  # noqa: E402
+
+from benchmarks._results import percentile  # noqa: E402
+
+from src.app import app  # noqa: E402
+from src.lib import logging as app_logging  # noqa: E402
+from src.services.balance_service import BalanceService  # noqa: E402
+
+FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+
+def _sync_logging(stream) -> None:
+    # The previous setup: a StreamHandler on the root logger, every body dumped
+    app_logging.shutdown_logging()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.handlers = [handler]
+    app_logging.body_sampler = app_logging.BodySampler(1.0, 10**9)
+
+
+def _queued_logging(stream) -> None:
+    app_logging.setup_logging(stream)
+    app_logging.body_sampler = app_logging.BodySampler(1.0, 10)
+
+
+def _disabled_logging(stream) -> None:
+    app_logging.shutdown_logging()
+    logging.getLogger().handlers = []
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+
+async def _run(total: int, concurrency: int) -> list:
+    latencies = []
+    payload = {"name": "check_vacation_balance", "arguments": {"employee_id": "bench"}}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(total))
+
+        async def worker() -> None:
+            for _ in remaining:
+                t0 = time.perf_counter()
+                r = await client.post("/mcp/tools/call", json=payload)
+                latencies.append(time.perf_counter() - t0)
+                assert r.status_code == 200
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    BalanceService.seed_balance("bench", 80)
+    modes = [("disabled", _disabled_logging), ("synchronous", _sync_logging), ("queued+sampled", _queued_logging)]
+    print(f"requests={args.requests:,} concurrency={args.concurrency}")
+    with tempfile.TemporaryFile("w") as sink:
+        for name, configure in modes:
+            configure(sink)
+            asyncio.run(_run(200, args.concurrency))  # warm up
+            latencies = asyncio.run(_run(args.requests, args.concurrency))
+            print(
+                f"  {name:15s} p50={percentile(latencies, 0.50) * 1000:6.2f} ms  "
+                f"p99={percentile(latencies, 0.99) * 1000:6.2f} ms  max={latencies[-1] * 1000:6.2f} ms"
+            )
+    app_logging.shutdown_logging()
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
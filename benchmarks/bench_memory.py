@@ -0,0 +1,71 @@
+"""Bytes per stored VacationRequest: the former dataclass vs the slotted record.
+
+Usage:
+    python -m benchmarks.bench_memory [--records 1000000]
+"""
+from __future__ import annotations
+import argparse
+import gc
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from src.lib.store import VacationRequest
+
+
+@dataclass
+class LegacyVacationRequest:
+    # The __dict__-backed dataclass the store used before the compact record
+    id: str
+    employee_id: str
+    start_date: str
+    end_date: str
+    total_days: int
+    total_hours: int
+    status: str
+    reason: str | None = None
+
+
+def _rows(count: int):
+    base = date(2020, 1, 6)
+    for i in range(count):
+        start = base + timedelta(days=i % 2000)
+        # Fresh string objects per row, as they arrive from request payloads
+        yield (
+            str(uuid.uuid4()),
+            f"emp{i % 10000}",
+            start.isoformat(),
+            (start + timedelta(days=4)).isoformat(),
+            5,
+            40,
+            "Approved",
+        )
+
+
+def measure(cls, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    # Input strings are traced too: whatever a record keeps alive counts against it
+    records = [cls(*row) for row in _rows(count)]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return retained / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    legacy = measure(LegacyVacationRequest, args.records)
+    compact = measure(VacationRequest, args.records)
+    print(f"records={args.records:,}")
+    print(f"  dataclass  {legacy:>7.1f} bytes/request")
+    print(f"  slotted    {compact:>7.1f} bytes/request  ({legacy / compact:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
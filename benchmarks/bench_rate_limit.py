@@ -0,0 +1,36 @@
+"""Per-request overhead of the GCRA rate limiter.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--calls 1000000] [--keys 1,1000,100000]
+"""
+from __future__ import annotations
+import argparse
+import time
+
+from src.middleware.rate_limit import GCRALimiter, Quota
+
+
+def run(calls: int, keys: int) -> float:
+    limiter = GCRALimiter(Quota(per_minute=1e9, burst=1_000_000), max_keys=max(keys // 2, 1))
+    names = [f"key-{i}" for i in range(keys)]
+    acquire = limiter.acquire
+    t0 = time.perf_counter()
+    for i in range(calls):
+        acquire(names[i % keys])
+    return (time.perf_counter() - t0) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--keys", default="1,1000,100000")
+    args = parser.parse_args()
+
+    for keys in (int(k) for k in args.keys.split(",")):
+        # max_keys is half the key count, so the multi-key runs also pay for eviction
+        per_call = run(args.calls, keys)
+        print(f"keys={keys:<7} {per_call * 1e9:>8,.0f} ns/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare InMemoryStore and SQLiteStore on the service-facing operations.
+
+Usage:
+    python -m benchmarks.bench_store [--employees 1000] [--requests 20]
+"""
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from src.lib.store import InMemoryStore, VacationRequest
+from src.lib.sqlite_store import SQLiteStore
+
+
+def _requests_for(employee_id: str, count: int):
+    start = date(2024, 1, 1)
+    for i in range(count):
+        s = start + timedelta(days=14 * i)
+        yield VacationRequest(
+            id=f"{employee_id}-{i}",
+            employee_id=employee_id,
+            start_date=s.isoformat(),
+            end_date=(s + timedelta(days=4)).isoformat(),
+            total_days=5,
+            total_hours=40,
+            status="Approved",
+        )
+
+
+def _timed(label: str, ops: int, fn) -> None:
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    print(f"  {label:<14} {ops / elapsed:>12,.0f} ops/s  ({elapsed * 1e6 / ops:,.1f} us/op)")
+
+
+def run(store, employees: int, per_employee: int) -> None:
+    ids = [f"emp{i}" for i in range(employees)]
+    probe = date(2024, 6, 5).toordinal()
+
+    def set_balances():
+        for e in ids:
+            store.set_balance(e, 80)
+
+    def get_balances():
+        for e in ids:
+            store.get_balance(e)
+
+    def add_requests():
+        for e in ids:
+            for r in _requests_for(e, per_employee):
+                store.add_request(e, r)
+
+    def overlaps():
+        for e in ids:
+            store.has_overlap(e, probe, probe + 1)
+
+    def lists():
+        for e in ids:
+            store.list_requests(e)
+
+    _timed("set_balance", employees, set_balances)
+    _timed("get_balance", employees, get_balances)
+    _timed("add_request", employees * per_employee, add_requests)
+    _timed("has_overlap", employees, overlaps)
+    _timed("list_requests", employees, lists)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20, help="requests per employee")
+    args = parser.parse_args()
+
+    print("memory")
+    run(InMemoryStore(), args.employees, args.requests)
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store = SQLiteStore(os.path.join(tmp, "bench.db"))
+        print("sqlite (WAL)")
+        run(sqlite_store, args.employees, args.requests)
+        sqlite_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare two JSON result files written by ``benchmarks.micro`` or ``benchmarks.load``.
+
+Prints each shared metric side by side with the relative change; exits
+non-zero when any metric regressed by more than ``--threshold`` percent.
+
+Usage:
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 10]
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+
+# Metric -> True when larger is better
+_METRICS = {"nsPerOp": False, "throughput": True, "p50Ms": False, "p95Ms": False, "p99Ms": False}
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> int:
+    regressions = 0
+    for name, base in baseline["results"].items():
+        cand = candidate["results"].get(name)
+        if cand is None:
+            continue
+        for metric, higher_is_better in _METRICS.items():
+            if metric not in base or metric not in cand or not base[metric]:
+                continue
+            change = (cand[metric] - base[metric]) / base[metric] * 100
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                regressions += 1
+                flag = "  REGRESSION"
+            print(f"  {name:<26} {metric:<10} {base[metric]:>12,.2f} -> {cand[metric]:>12,.2f}  ({change:+6.1f}%){flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent worse that counts as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    if baseline["suite"] != candidate["suite"]:
+        sys.exit(f"Cannot compare a {baseline['suite']} run with a {candidate['suite']} run")
+    print(f"{baseline['suite']}: {baseline.get('revision')} -> {candidate.get('revision')}")
+    regressions = compare(baseline, candidate, args.threshold)
+    if regressions:
+        sys.exit(f"{regressions} metric(s) regressed by more than {args.threshold:g}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""In-process ASGI load generator for the REST and MCP paths.
+
+Drives the app through httpx's ASGITransport (no sockets, no server), so
+numbers measure the application stack itself. Each scenario runs
+``--requests`` calls from ``--concurrency`` concurrent clients against
+``--employees`` seeded employees with ``--history`` stored requests each.
+The store backend follows ``STORE_BACKEND`` as in production.
+
+Usage:
+    python -m benchmarks.load [--scenarios balance,create,create-queued,list,list-conditional,tool,jsonrpc]
+        [--concurrency 32] [--requests 5000] [--employees 1000] [--history 50] [--output load.json]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("API_KEY", "bench")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000000")
+os.environ.setdefault("MCP_RATE_LIMIT_PER_MINUTE", "1000000000")
+
+import httpx  # noqa: E402
+
+from benchmarks._results import latency_summary, write_results  # noqa: E402
+from src.app import app  # noqa: E402
+from src.lib.store import STORE_BACKEND_ENV, VacationRequest, store  # noqa: E402
+from src.services.request_service import approval_queue  # noqa: E402
+
+SCENARIOS = ("balance", "create", "create-queued", "list", "list-conditional", "tool", "jsonrpc")
+_HISTORY_START = date(2015, 1, 5)
+_FUTURE_START = date(2080, 1, 1)
+
+
+def seed(employees: int, history: int) -> None:
+    balances = {f"emp{e}": 120 for e in range(employees)}
+    requests = []
+    for e in range(employees):
+        employee_id = f"emp{e}"
+        for i in range(history):
+            start = _HISTORY_START + timedelta(weeks=i)
+            requests.append(VacationRequest(
+                f"{employee_id}-{i}", employee_id, start.isoformat(), (start + timedelta(days=4)).isoformat(),
+                5, 40, "Approved",
+            ))
+    store.bulk_load(balances, requests)
+
+
+def _future_weekday(rng: random.Random) -> str:
+    day = _FUTURE_START + timedelta(days=rng.randrange(20000))
+    if day.weekday() >= 5:
+        day += timedelta(days=7 - day.weekday())
+    return day.isoformat()
+
+
+def build_call(scenario: str, employees: int, rng: random.Random):
+    auth = {"Authorization": f"Bearer {os.environ['API_KEY']}"}
+
+    def employee() -> str:
+        return f"emp{rng.randrange(employees)}"
+
+    if scenario == "balance":
+        return lambda c: c.get("/balance", headers={**auth, "X-Employee-Id": employee()})
+    if scenario == "create":
+        def create(c):
+            e, day = employee(), _future_weekday(rng)
+            return c.post("/vacation-requests", headers=auth, json={"employeeId": e, "startDate": day, "endDate": day})
+        return create
+    if scenario == "create-queued":
+        queued = {**auth, "Prefer": "respond-async"}
+
+        def create_queued(c):
+            e, day = employee(), _future_weekday(rng)
+            return c.post("/vacation-requests", headers=queued, json={"employeeId": e, "startDate": day, "endDate": day})
+        return create_queued
+    if scenario == "list":
+        return lambda c: c.get("/vacation-requests", headers={**auth, "X-Employee-Id": employee()})
+    if scenario == "list-conditional":
+        # Clients that keep the last ETag per employee and revalidate with If-None-Match
+        etags = {}
+
+        async def list_conditional(c):
+            e = employee()
+            headers = {**auth, "X-Employee-Id": e}
+            if e in etags:
+                headers["If-None-Match"] = etags[e]
+            resp = await c.get("/vacation-requests", headers=headers)
+            etags[e] = resp.headers["ETag"]
+            return resp
+        return list_conditional
+    if scenario == "tool":
+        return lambda c: c.post(
+            "/mcp/tools/call", json={"name": "check_vacation_balance", "arguments": {"employee_id": employee()}},
+        )
+    if scenario == "jsonrpc":
+        return lambda c: c.post("/mcp/", json={
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "list_vacation_requests", "arguments": {"employee_id": employee(), "limit": 20}},
+        })
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def run_scenario(call, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(total))
+
+        async def worker() -> None:
+            nonlocal errors
+            for _ in remaining:
+                t0 = time.perf_counter()
+                r = await call(client)
+                latencies.append(time.perf_counter() - t0)
+                if r.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {**latency_summary(latencies, elapsed), "errors": errors}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5000, help="requests per scenario")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--history", type=int, default=50, help="stored requests per employee")
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests per scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    seed(args.employees, args.history)
+    rng = random.Random(args.seed)
+    backend = os.getenv(STORE_BACKEND_ENV, "memory")
+    print(
+        f"backend={backend} concurrency={args.concurrency} requests={args.requests:,} "
+        f"employees={args.employees:,} history={args.history}"
+    )
+    results = {}
+    for scenario in scenarios:
+        call = build_call(scenario, args.employees, rng)
+        if args.warmup:
+            asyncio.run(run_scenario(call, args.warmup, args.concurrency))
+        summary = results[scenario] = asyncio.run(run_scenario(call, args.requests, args.concurrency))
+        print(
+            f"  {scenario:<16} {summary['throughput']:>9,.0f} req/s  p50={summary['p50Ms']:7.2f} ms  "
+            f"p95={summary['p95Ms']:7.2f} ms  p99={summary['p99Ms']:7.2f} ms  errors={summary['errors']}"
+        )
+    approval_queue.close()
+    store.close()
+    if args.output:
+        write_results(args.output, "load", {**vars(args), "backend": backend}, results)
+
+
+if __name__ == "__main__":
+    main()
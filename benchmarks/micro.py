@@ -0,0 +1,86 @@
+"""Microbenchmarks for the hot helpers: weekday counting, overlap checks, store operations, tool listing.
+
+Usage:
+    python -m benchmarks.micro [--history 200] [--repeat 5] [--output micro.json]
+"""
+from __future__ import annotations
+import argparse
+import os
+import timeit
+from datetime import date, timedelta
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from starlette.requests import Request  # noqa: E402
+
+from benchmarks._results import write_results  # noqa: E402
+from src.lib.date_utils import count_weekdays_inclusive  # noqa: E402
+from src.lib.store import EmployeeIntervalIndex, InMemoryStore, VacationRequest  # noqa: E402
+from src.mcp.mcp_endpoints import _build_tools_listing, _get_tools_response  # noqa: E402
+
+
+def _history(employee_id: str, count: int):
+    base = date(2020, 1, 6)
+    for i in range(count):
+        start = base + timedelta(weeks=i)
+        yield VacationRequest(
+            f"{employee_id}-{i}", employee_id, start.isoformat(), (start + timedelta(days=4)).isoformat(), 5, 40, "Approved",
+        )
+
+
+def _bench(fn, repeat: int) -> float:
+    """Best-of-``repeat`` nanoseconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def build_cases(history: int) -> dict:
+    store = InMemoryStore()
+    store.bulk_load({"bench": 120}, list(_history("bench", history)))
+    index = EmployeeIntervalIndex()
+    index.extend((r.start_ordinal, r.end_ordinal, r._id) for r in _history("idx", history))
+    mid = date(2020, 1, 6).toordinal() + 7 * (history // 2) + 2
+    request = Request({"type": "http", "method": "GET", "path": "/mcp/tools", "headers": []})
+    added = iter(range(10**9))
+    far = date(2090, 1, 1)
+
+    def add_request():
+        # Spread over employees so each history stays at 100 entries however many calls autorange makes
+        i = next(added)
+        employee_id = f"adder{i // 100}"
+        day = (far + timedelta(days=i % 100)).isoformat()
+        store.add_request(employee_id, VacationRequest(str(i), employee_id, day, day, 1, 8, "Approved"))
+
+    return {
+        "count_weekdays_inclusive": lambda: count_weekdays_inclusive("2024-01-01", "2024-12-31"),
+        "index_overlaps": lambda: index.overlaps(mid, mid + 1),
+        "store_has_overlap": lambda: store.has_overlap("bench", mid, mid + 1),
+        "store_get_balance": lambda: store.get_balance("bench"),
+        "store_add_request": add_request,
+        "store_list_requests": lambda: store.list_requests("bench"),
+        "store_page_requests_50": lambda: store.page_requests("bench", 0, 50),
+        "tools_listing_build": _build_tools_listing,
+        "tools_listing_response": lambda: _get_tools_response(request),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--history", type=int, default=200, help="stored requests per employee")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"history={args.history} (best of {args.repeat})")
+    for name, fn in build_cases(args.history).items():
+        ns = _bench(fn, args.repeat)
+        results[name] = {"nsPerOp": round(ns, 1)}
+        print(f"  {name:<26} {ns:>12,.0f} ns/op")
+    if args.output:
+        write_results(args.output, "micro", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,8 @@ Usage:
 
 from fastmcp import FastMCP
 from src.lib.logging import setup_logging
+from src.lib.store import store
+from src.mcp.registry import tool_registry
 from src.services.balance_service import BalanceService
 
 # Setup logging
@@ -22,76 +24,17 @@ setup_logging()
 mcp = FastMCP("VacationMCP")
 
 
-@mcp.tool()
-def check_vacation_balance(employee_id: str) -> str:
-    """Check available vacation hours for an employee (0-120 hours). Returns the number of hours available.
-    
-    Args:
-        employee_id: Employee identifier (e.g., 'alice', 'bob')
-    
-    Returns:
-        A message indicating the employee's available vacation hours.
-    """
-    from src.mcp.tools import check_vacation_balance as check_balance
-    hours = check_balance(employee_id)
-    return f"Employee {employee_id} has {hours} hours of vacation available."
-
-
-@mcp.tool()
-def request_vacation(employee_id: str, start_date: str, end_date: str) -> str:
-    """Request vacation time off. Validates balance and dates. Returns status (Approved/Declined) and reason if declined.
-    
-    Args:
-        employee_id: Employee identifier
-        start_date: Start date in ISO format (YYYY-MM-DD), weekdays only
-        end_date: End date in ISO format (YYYY-MM-DD), weekdays only
-    
-    Returns:
-        A message indicating the request status and reason if declined.
-    """
-    from src.mcp.tools import request_vacation as request_vac
-    result = request_vac(employee_id, start_date, end_date)
-    
-    status_text = f"Vacation request {result.get('id', 'created')}: Status is {result['status']}"
-    if result.get("reason"):
-        status_text += f". Reason: {result['reason']}"
-    
-    return status_text
-
-
-@mcp.tool()
-def list_vacation_requests(employee_id: str) -> str:
-    """List all vacation requests for an employee. Returns a list of requests with status, dates, and hours.
-    
-    Args:
-        employee_id: Employee identifier
-    
-    Returns:
-        A formatted list of vacation requests for the employee.
-    """
-    from src.mcp.tools import list_vacation_requests as list_requests
-    requests_list = list_requests(employee_id)
-    
-    if not requests_list:
-        return f"No vacation requests found for employee {employee_id}"
-    
-    # Format the response nicely
-    formatted = [f"Vacation requests for {employee_id}:"]
-    for req in requests_list:
-        formatted.append(
-            f"  - Request {req['id']}: {req['startDate']} to {req['endDate']} "
-            f"({req['totalDays']} days, {req['totalHours']} hours) - Status: {req['status']}"
-        )
-        if req.get("reason"):
-            formatted.append(f"    Reason: {req['reason']}")
-    
-    return "\n".join(formatted)
+# Register every tool from the shared declarations used by the HTTP /mcp routes
+for tool in tool_registry:
+    mcp.add_tool(tool.as_function(), name=tool.name, description=tool.description)
 
 
 # Seed demo data on startup
 @mcp.on_startup()
 async def seed_demo_data():
     """Seed demo balances for quick testing."""
+    if not store.is_empty():
+        return
     BalanceService.seed_balance("alice", 80)
     BalanceService.seed_balance("bob", 16)
 
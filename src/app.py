@@ -1,18 +1,61 @@
 import logging
-from typing import List
-from fastapi import FastAPI, Depends, Header, HTTPException, status
+from typing import List, Literal, Optional
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.lib.accrual import AccrualPolicy
+from src.lib.async_store import async_store
+from src.lib.cache import IdempotencyKeyConflict
+from src.lib.etag import etag_matches, make_etag
 from src.lib.logging import setup_logging
+from src.lib.metrics import CallbackGauge, registry as metrics_registry
+from src.lib.serialization import FastJSONResponse, dumps
+from src.lib.store import store
 from src.middleware.auth import require_api_key, security
-from src.models.schemas import BalanceResponse, CreateRequest, RequestResponse, VacationRequest as VacationRequestModel
-from src.services.balance_service import BalanceService
-from src.services.request_service import RequestService
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.rate_limit import check_employee_rate_limit
+from src.models.schemas import (
+    Absence,
+    AccrualPolicyModel,
+    BalanceResponse,
+    BatchRequestResult,
+    CreateRequest,
+    EmployeeBalance,
+    EmployeeTeam,
+    ProjectedBalance,
+    RequestResponse,
+    TeamAssignment,
+    VacationRequest as VacationRequestModel,
+)
+from src.services.availability_service import AvailabilityService
+from src.services.balance_service import BalanceService, accrual_poster
+from src.services.approval_queue import ApprovalQueueFull
+from src.services.change_feed import CHANGE_FEED_KEEPALIVE_SECONDS, ChangeFeedFull, ChangeFeedGap, change_feed, feed_stream
+from src.services.request_service import MAX_PAGE_SIZE, QUEUED_APPROVAL, RequestService, approval_queue
+from src.services.import_service import BulkImporter
 from src.mcp.mcp_endpoints import mcp_router
 
 setup_logging()
 logger = logging.getLogger("vacationmcp")
 
+# Upper bound on items per bulk call; larger syncs page through several calls
+MAX_BATCH_SIZE = 1000
+# Page size when the client passes a cursor without a limit
+DEFAULT_PAGE_SIZE = 100
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+# Set on responses that repeat the stored result for an Idempotency-Key
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+# RFC 7240 preference asking for a Pending request instead of an immediate decision
+RESPOND_ASYNC = "respond-async"
+# Longest long-poll on GET /vacation-requests/{id}
+MAX_STATUS_WAIT_SECONDS = 60
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Lines handed to the importer per threadpool hop while streaming an upload
+IMPORT_FEED_LINES = 10_000
+
 app = FastAPI(
     title="VacationMCP Service",
     description="Vacation management REST API service. For MCP protocol access, use the FastMCP server (mcp_server.py) or HTTP endpoints (/mcp/*).",
@@ -58,43 +101,119 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Mcp-Session-Id", "X-Next-Cursor", "Idempotent-Replayed", "Location", "Preference-Applied", "ETag"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 # MCP endpoints are available via /mcp/* routes (no authentication required)
 # REST API endpoints below require OAuth2 Bearer token authentication
 
 
 @app.on_event("startup")
 def seed_demo_data() -> None:
+    # Persistent backends keep their state across restarts; only seed a fresh store
+    if not store.is_empty():
+        return
     # Seed demo balances for quick testing
     BalanceService.seed_balance("alice", 80)
     BalanceService.seed_balance("bob", 16)
 
 
+@app.on_event("startup")
+def start_accrual_poster() -> None:
+    accrual_poster.start()
+
+
+@app.on_event("shutdown")
+def close_store() -> None:
+    # Decide what is still queued while the store is open
+    approval_queue.close()
+    accrual_poster.close()
+    change_feed.close()
+    store.close()
+
+
 @app.get("/health")
-def health() -> dict:
+async def health() -> dict:
     return {"status": "ok"}
 
 
+def _store_sizes() -> dict:
+    employees, requests = store.counts()
+    return {("employees",): employees, ("requests",): requests}
+
+
+metrics_registry.register(CallbackGauge(
+    "vacationmcp_store_size", "Employees with a balance and stored vacation requests.", ("kind",), _store_sizes,
+))
+metrics_registry.register(CallbackGauge(
+    "vacationmcp_approval_queue_depth", "Vacation requests awaiting a queued decision.", (),
+    lambda: {(): len(approval_queue)},
+))
+metrics_registry.register(CallbackGauge(
+    "vacationmcp_change_feed_subscribers", "Open GET /changes streams.", (),
+    lambda: {(): change_feed.subscribers},
+))
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus text exposition of the in-process metrics."""
+    # Rendering reads store sizes, which may hit the database
+    return Response(await async_store.run(metrics_registry.render), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
 @app.get("/balance", response_model=BalanceResponse)
-def get_balance(
+async def get_balance(
+    response: Response,
     employee_id: str = Header(..., alias="X-Employee-Id"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
     _auth: None = Depends(require_api_key),
 ) -> BalanceResponse:
     if not employee_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing X-Employee-Id header")
-    hours = BalanceService.get_balance_hours(employee_id)
+    check_employee_rate_limit(employee_id)
+    # Version first, so the body served under this tag is never older than it
+    etag = make_etag(store.version_epoch, await async_store.version(employee_id))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    hours = await BalanceService.get_balance_hours_async(employee_id)
     logger.info("balance_checked employee_id=%s hours=%s", employee_id, hours)
+    response.headers["ETag"] = etag
     return BalanceResponse(hoursAvailable=hours)
 
 
 @app.post("/vacation-requests", response_model=RequestResponse, status_code=201)
-def create_vacation_request(
+async def create_vacation_request(
     payload: CreateRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Repeat the key to get the original result instead of a new request"),
+    prefer: Optional[str] = Header(None, description="respond-async: accept as Pending (202) and decide in the background"),
     _auth: None = Depends(require_api_key),
 ) -> RequestResponse:
-    req, ok, reason = RequestService.create_request(payload.employeeId, payload.startDate, payload.endDate)
-    if not ok:
+    check_employee_rate_limit(payload.employeeId)
+    respond_async = prefer is not None and RESPOND_ASYNC in prefer.lower()
+    try:
+        (req, ok, reason), replayed = await RequestService.create_request_idempotent_async(
+            payload.employeeId, payload.startDate, payload.endDate, idempotency_key,
+            queued=QUEUED_APPROVAL or respond_async,
+        )
+    except IdempotencyKeyConflict as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except ApprovalQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if respond_async:
+        response.headers["Preference-Applied"] = RESPOND_ASYNC
+    if not ok and reason is None:
+        # Queued; the worker may already have decided it, so req.status is not a reliable signal
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"/vacation-requests/{req.id}"
+    if replayed:
+        response.headers[IDEMPOTENT_REPLAYED_HEADER] = "true"
+    elif not ok and reason is not None:
         logger.info(
             "vacation_request_declined employee_id=%s reason=%s start=%s end=%s",
             payload.employeeId,
@@ -104,27 +223,227 @@ def create_vacation_request(
         )
         return RequestResponse(id=req.id, status=req.status, reason=req.reason)
 
-    return RequestResponse(id=req.id, status=req.status, reason=None)
+    # A queued request may already be decided
+    return RequestResponse(id=req.id, status=req.status, reason=req.reason)
+
+
+@app.get("/balances", response_model=List[EmployeeBalance])
+async def get_balances(
+    ids: List[str] = Query(..., description="Employee ids, repeated (?ids=a&ids=b) or comma-separated"),
+    _auth: None = Depends(require_api_key),
+) -> List[EmployeeBalance]:
+    employee_ids = [e for raw in ids for e in raw.split(",") if e]
+    if not employee_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one employee id is required")
+    if len(employee_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_BATCH_SIZE} employee ids per call")
+    for employee_id in set(employee_ids):
+        check_employee_rate_limit(employee_id)
+    balances = await BalanceService.get_balances_hours_async(employee_ids)
+    logger.info("balances_checked count=%s", len(employee_ids))
+    return FastJSONResponse([{"employeeId": e, "hoursAvailable": balances[e]} for e in employee_ids])
+
+
+@app.get("/balances/projected", response_model=List[ProjectedBalance])
+async def get_projected_balances(
+    as_of: str = Query(..., alias="asOf", description="Projection date (ISO date, today or later)"),
+    ids: Optional[List[str]] = Query(None, description="Employee ids, repeated or comma-separated; all employees when omitted"),
+    _auth: None = Depends(require_api_key),
+) -> List[ProjectedBalance]:
+    """Current and projected balances with accrual, cap and carry-over applied up to ``asOf``."""
+    employee_ids = None if ids is None else [e for raw in ids for e in raw.split(",") if e]
+    try:
+        report = await BalanceService.project_balances_async(as_of, employee_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    logger.info("balances_projected as_of=%s count=%s", as_of, len(report))
+    return FastJSONResponse(report)
+
+
+@app.put("/employees/{employee_id}/accrual-policy", response_model=AccrualPolicyModel)
+async def set_accrual_policy(
+    employee_id: str,
+    payload: AccrualPolicyModel,
+    _auth: None = Depends(require_api_key),
+) -> AccrualPolicyModel:
+    await BalanceService.set_accrual_policy_async(employee_id, AccrualPolicy(
+        hours_per_month=payload.hoursPerMonth,
+        cap_hours=payload.capHours,
+        carry_over_hours=payload.carryOverHours,
+    ))
+    logger.info("accrual_policy_set employee_id=%s hours_per_month=%s", employee_id, payload.hoursPerMonth)
+    return payload
+
+
+@app.post("/vacation-requests/batch", response_model=List[BatchRequestResult])
+async def create_vacation_requests_batch(
+    payload: List[CreateRequest],
+    _auth: None = Depends(require_api_key),
+) -> List[BatchRequestResult]:
+    if len(payload) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_BATCH_SIZE} requests per call")
+    for employee_id in {p.employeeId for p in payload}:
+        check_employee_rate_limit(employee_id)
+    results = await RequestService.create_requests_async([(p.employeeId, p.startDate, p.endDate) for p in payload])
+    approved = sum(1 for _, ok, _ in results if ok)
+    logger.info("vacation_request_batch count=%s approved=%s", len(results), approved)
+    return FastJSONResponse([
+        {"id": req.id, "status": req.status, "reason": req.reason, "employeeId": req.employee_id}
+        for req, _, _ in results
+    ])
+
+
+@app.get(
+    "/vacation-requests",
+    response_model=List[VacationRequestModel],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def list_vacation_requests(
+    employee_id: str = Header(..., alias="X-Employee-Id"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    from_date: Optional[str] = Query(None, alias="from", description="Only requests ending on or after this ISO date"),
+    to_date: Optional[str] = Query(None, alias="to", description="Only requests starting on or before this ISO date"),
+    status_filter: Optional[Literal["Pending", "Approved", "Declined"]] = Query(None, alias="status"),
+    _auth: None = Depends(require_api_key),
+):
+    if not employee_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing X-Employee-Id header")
+    check_employee_rate_limit(employee_id)
+    headers = {}
+    try:
+        filters = RequestService.build_filter(from_date, to_date, status_filter)
+        if accept and NDJSON_MEDIA_TYPE in accept:
+            # Stream the whole (filtered) history a page at a time
+            items_iter = RequestService.iter_requests_async(employee_id, cursor, filters)
+            lines = (dumps(i.as_api_dict()) + b"\n" async for i in items_iter)
+            return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+        # Every page and filter of the list changes only when the employee's version does
+        version = await async_store.version(employee_id)
+        headers["ETag"] = make_etag(store.version_epoch, version)
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if limit is None and cursor is None:
+            if filters is None:
+                body = await RequestService.list_requests_json_async(employee_id, version)
+                return Response(body, media_type="application/json", headers=headers)
+            else:
+                items = [i async for i in RequestService.iter_requests_async(employee_id, None, filters)]
+        else:
+            items, next_cursor = await RequestService.page_requests_async(employee_id, cursor, limit or DEFAULT_PAGE_SIZE, filters)
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse([i.as_api_dict() for i in items], headers=headers)
 
 
-@app.get("/vacation-requests", response_model=List[VacationRequestModel])
-def list_vacation_requests(
+@app.get("/vacation-requests/{request_id}", response_model=VacationRequestModel)
+async def get_vacation_request(
+    request_id: str,
     employee_id: str = Header(..., alias="X-Employee-Id"),
+    wait: float = Query(0, ge=0, le=MAX_STATUS_WAIT_SECONDS, description="Seconds to wait for a pending request to be decided"),
     _auth: None = Depends(require_api_key),
-) -> List[VacationRequestModel]:
+) -> VacationRequestModel:
+    """A single request; poll it (or long-poll with ``wait``) after a 202 from queued creation."""
     if not employee_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing X-Employee-Id header")
-    items = RequestService.list_requests(employee_id)
-    return [
-        VacationRequestModel(
-            id=i.id,
-            employeeId=i.employee_id,
-            startDate=i.start_date,
-            endDate=i.end_date,
-            totalDays=i.total_days,
-            totalHours=i.total_hours,
-            status=i.status,
-            reason=i.reason,
+    check_employee_rate_limit(employee_id)
+    req = await RequestService.get_request_async(employee_id, request_id, wait)
+    if req is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vacation request not found")
+    return FastJSONResponse(req.as_api_dict())
+
+
+@app.get("/absences", response_model=List[Absence])
+async def list_absences(
+    from_date: str = Query(..., alias="from", description="First day of the range (ISO date)"),
+    to_date: Optional[str] = Query(None, alias="to", description="Last day of the range (ISO date); defaults to from"),
+    team: Optional[str] = Query(None, description="Only members of this team"),
+    _auth: None = Depends(require_api_key),
+) -> List[Absence]:
+    """Employees with approved vacation overlapping the range, ordered by employee and start date."""
+    try:
+        absences = await AvailabilityService.who_is_out_async(from_date, to_date, team)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse([AvailabilityService.absence_dict(a) for a in absences])
+
+
+@app.put("/employees/{employee_id}/team", response_model=EmployeeTeam)
+async def set_employee_team(
+    employee_id: str,
+    payload: TeamAssignment,
+    _auth: None = Depends(require_api_key),
+) -> EmployeeTeam:
+    try:
+        team = await AvailabilityService.set_team_async(employee_id, payload.team)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    logger.info("employee_team_set employee_id=%s team=%s", employee_id, team)
+    return EmployeeTeam(employeeId=employee_id, team=team)
+
+
+@app.get("/changes", responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, SSE_MEDIA_TYPE: {}}}})
+async def stream_changes(
+    accept: Optional[str] = Header(None),
+    after: Optional[str] = Query(None, description="Resume after this event id (or sequence number); live events only when omitted"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    _auth: None = Depends(require_api_key),
+):
+    """Vacation-request and balance events as they happen, as NDJSON or (``Accept: text/event-stream``) SSE.
+
+    410 when the events after the cursor are no longer retained: resync from
+    the list endpoints, then subscribe again without one.
+    """
+    cursor = after if after is not None else last_event_id
+    try:
+        start = change_feed.last_seq if cursor is None else change_feed.parse_cursor(cursor)
+        change_feed.check_resume(start)
+        sse = accept is not None and SSE_MEDIA_TYPE in accept
+        # Takes the subscriber slot now, so concurrent connects cannot all pass the limit
+        stream = feed_stream(change_feed, start, sse, CHANGE_FEED_KEEPALIVE_SECONDS)
+    except ChangeFeedFull as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+    except ChangeFeedGap as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return StreamingResponse(
+        stream,
+        media_type=SSE_MEDIA_TYPE if sse else NDJSON_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/admin/import")
+async def import_data(
+    request: Request,
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$"),
+    _auth: None = Depends(require_api_key),
+) -> dict:
+    """Stream a JSONL or CSV upload of balances and historical requests into the store."""
+    importer = BulkImporter(format)
+    pending = b""
+    lines: List[str] = []
+    try:
+        async for chunk in request.stream():
+            pending += chunk
+            *complete, pending = pending.split(b"\n")
+            lines.extend(line.decode("utf-8") for line in complete)
+            if len(lines) >= IMPORT_FEED_LINES:
+                await run_in_threadpool(importer.feed, lines)
+                lines = []
+        if pending:
+            lines.append(pending.decode("utf-8"))
+    except UnicodeDecodeError:
+        # Lines fed before the bad one stay imported
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload is not valid UTF-8",
         )
-        for i in items
-    ]
+    if lines:
+        await run_in_threadpool(importer.feed, lines)
+    return importer.finish().as_dict()
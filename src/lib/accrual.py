@@ -0,0 +1,186 @@
+"""Vacation accrual policies and array-backed balance projection.
+
+Each employee accrues ``hours_per_month`` on the first of every month, up to
+``cap_hours``; on January 1st any balance above ``carry_over_hours`` is
+forfeited before that month's accrual. Employees without a policy of their
+own follow the default policy (no accrual unless configured).
+``BalanceService.post_accruals`` credits the same amounts to stored balances
+as each first of the month passes.
+
+Policies are stored as NumPy columns, one row per employee, so a projection
+for every employee is a handful of array operations per month in the
+horizon rather than a Python loop per employee.
+"""
+from __future__ import annotations
+import math
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date
+from itertools import repeat
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+ACCRUAL_RATE_ENV = "ACCRUAL_HOURS_PER_MONTH"
+ACCRUAL_CAP_ENV = "ACCRUAL_CAP_HOURS"
+ACCRUAL_CARRY_OVER_ENV = "ACCRUAL_CARRY_OVER_HOURS"
+
+# Balances are reported in 0..120 hours; accrual never goes past this either
+MAX_BALANCE_HOURS = 120
+# Furthest a projection may look ahead
+MAX_PROJECTION_DAYS = 2 * 366
+
+
+@dataclass(frozen=True)
+class AccrualPolicy:
+    hours_per_month: float = 0.0
+    cap_hours: float = MAX_BALANCE_HOURS
+    # None keeps the whole balance across years
+    carry_over_hours: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.hours_per_month <= MAX_BALANCE_HOURS:
+            raise ValueError(f"hours_per_month must be between 0 and {MAX_BALANCE_HOURS}")
+        if not 0 <= self.cap_hours <= MAX_BALANCE_HOURS:
+            raise ValueError(f"cap_hours must be between 0 and {MAX_BALANCE_HOURS}")
+        if self.carry_over_hours is not None and self.carry_over_hours < 0:
+            raise ValueError("carry_over_hours must not be negative")
+
+    def project_one(self, balance: float, today: date, as_of: date) -> float:
+        """``balance`` on ``as_of`` under this policy, given its value on ``today``."""
+        carry = math.inf if self.carry_over_hours is None else self.carry_over_hours
+        return float(project(
+            np.array([balance], dtype=np.float64), np.array([self.hours_per_month]),
+            np.array([self.cap_hours]), np.array([carry]), today, as_of,
+        )[0])
+
+
+def accrual_dates(today: date, as_of: date) -> Iterator[date]:
+    """First-of-month accrual days after ``today`` up to and including ``as_of``."""
+    year, month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+    while True:
+        day = date(year, month, 1)
+        if day > as_of:
+            return
+        yield day
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def project(
+    balances: np.ndarray,
+    hours_per_month: np.ndarray,
+    cap_hours: np.ndarray,
+    carry_over_hours: np.ndarray,
+    today: date,
+    as_of: date,
+) -> np.ndarray:
+    """Balances on ``as_of`` given balances on ``today``; all arguments are aligned columns.
+
+    Loops over accrual days, never over employees. A balance already above
+    the cap keeps its value but stops accruing.
+    """
+    projected = balances.astype(np.float64)
+    for day in accrual_dates(today, as_of):
+        if day.month == 1:
+            np.minimum(projected, carry_over_hours, out=projected)
+        np.maximum(projected, np.minimum(projected + hours_per_month, cap_hours), out=projected)
+    return projected
+
+
+class AccrualEngine:
+    """Per-employee accrual policies in NumPy columns.
+
+    Row 0 holds the default policy; employees get their own row when a policy
+    is set for them. Columns grow by doubling. Writers take a lock; readers
+    index whatever arrays are current, which are only ever replaced whole.
+    """
+
+    def __init__(self, default: Optional[AccrualPolicy] = None, capacity: int = 1024) -> None:
+        self._rows: Dict[str, int] = {}
+        self._policies: List[AccrualPolicy] = []
+        self._rate = np.zeros(capacity, dtype=np.float64)
+        self._cap = np.zeros(capacity, dtype=np.float64)
+        self._carry = np.zeros(capacity, dtype=np.float64)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._write_row(0, default or AccrualPolicy())
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def default_policy(self) -> AccrualPolicy:
+        return self._policies[0]
+
+    def set_default_policy(self, policy: AccrualPolicy) -> None:
+        with self._lock:
+            self._write_row(0, policy)
+
+    def set_policy(self, employee_id: str, policy: Optional[AccrualPolicy]) -> None:
+        """Give ``employee_id`` its own policy; None returns it to the default."""
+        with self._lock:
+            row = self._rows.get(employee_id)
+            if policy is None:
+                if row is not None:
+                    # The row stays allocated but unreferenced
+                    del self._rows[employee_id]
+                return
+            if row is not None:
+                self._write_row(row, policy)
+                return
+            row = len(self._policies)
+            if row == len(self._rate):
+                self._grow()
+            # Fill the row before publishing it to readers
+            self._write_row(row, policy)
+            self._rows[employee_id] = row
+
+    def get_policy(self, employee_id: str) -> AccrualPolicy:
+        return self._policies[self._rows.get(employee_id, 0)]
+
+    def project(self, balances: Dict[str, int], as_of: date, today: Optional[date] = None) -> np.ndarray:
+        """Projected balances on ``as_of``, aligned with ``balances``' key order."""
+        today = today or date.today()
+        if as_of < today:
+            raise ValueError("Projection date must not be in the past")
+        if (as_of - today).days > MAX_PROJECTION_DAYS:
+            raise ValueError(f"Projection date must be within {MAX_PROJECTION_DAYS} days")
+        count = len(balances)
+        rows = np.fromiter(map(self._rows.get, balances, repeat(0)), dtype=np.intp, count=count)
+        current = np.fromiter(balances.values(), dtype=np.float64, count=count)
+        rate, cap, carry = self._rate, self._cap, self._carry
+        return project(current, rate[rows], cap[rows], carry[rows], today, as_of)
+
+    def project_one(self, employee_id: str, balance: int, as_of: date, today: Optional[date] = None) -> float:
+        return float(self.project({employee_id: balance}, as_of, today)[0])
+
+    def _write_row(self, row: int, policy: AccrualPolicy) -> None:
+        # Caller holds _lock
+        if row == len(self._policies):
+            self._policies.append(policy)
+        else:
+            self._policies[row] = policy
+        self._rate[row] = policy.hours_per_month
+        self._cap[row] = policy.cap_hours
+        self._carry[row] = math.inf if policy.carry_over_hours is None else policy.carry_over_hours
+
+    def _grow(self) -> None:
+        size = 2 * len(self._rate)
+        rate, cap, carry = (np.zeros(size, dtype=np.float64) for _ in range(3))
+        rate[:len(self._rate)] = self._rate
+        cap[:len(self._cap)] = self._cap
+        carry[:len(self._carry)] = self._carry
+        self._rate, self._cap, self._carry = rate, cap, carry
+
+
+def _default_policy_from_env() -> AccrualPolicy:
+    carry_over = os.getenv(ACCRUAL_CARRY_OVER_ENV)
+    return AccrualPolicy(
+        hours_per_month=float(os.getenv(ACCRUAL_RATE_ENV, "0")),
+        cap_hours=float(os.getenv(ACCRUAL_CAP_ENV, str(MAX_BALANCE_HOURS))),
+        carry_over_hours=float(carry_over) if carry_over else None,
+    )
+
+
+accrual_engine = AccrualEngine(_default_policy_from_env())
@@ -0,0 +1,94 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import anyio
+
+from src.lib.accrual import AccrualPolicy
+from src.lib.store import RequestFilter, Store, VacationRequest, store
+
+T = TypeVar("T")
+
+
+class AsyncStore:
+    """Awaitable view of a ``Store`` for handlers running on the event loop.
+
+    Non-blocking backends (the in-memory store) are called inline: a thread
+    hop would cost more than the dict lookups it wraps. Blocking backends
+    (SQLite, the fsync-waiting journal) run on a worker thread so the loop
+    keeps serving other connections. Callers with several store calls that
+    belong together should pass the whole unit to ``run`` for a single hop.
+    """
+
+    def __init__(self, backend: Store) -> None:
+        self.backend = backend
+
+    @property
+    def blocking(self) -> bool:
+        return getattr(self.backend, "blocking", True)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if not self.blocking:
+            return fn(*args)
+        return await anyio.to_thread.run_sync(fn, *args)
+
+    async def get_balance(self, employee_id: str) -> int:
+        return await self.run(self.backend.get_balance, employee_id)
+
+    async def get_balances(self, employee_ids: List[str]) -> Dict[str, int]:
+        return await self.run(self.backend.get_balances, employee_ids)
+
+    async def all_balances(self) -> Dict[str, int]:
+        return await self.run(self.backend.all_balances)
+
+    async def set_balance(self, employee_id: str, hours: int) -> None:
+        await self.run(self.backend.set_balance, employee_id, hours)
+
+    async def add_request(self, employee_id: str, request: VacationRequest) -> None:
+        await self.run(self.backend.add_request, employee_id, request)
+
+    async def remove_request(self, employee_id: str, request_id: str) -> Optional[VacationRequest]:
+        return await self.run(self.backend.remove_request, employee_id, request_id)
+
+    async def has_overlap(self, employee_id: str, start_ordinal: int, end_ordinal: int) -> bool:
+        return await self.run(self.backend.has_overlap, employee_id, start_ordinal, end_ordinal)
+
+    async def list_requests(self, employee_id: str) -> List[VacationRequest]:
+        return await self.run(self.backend.list_requests, employee_id)
+
+    async def page_requests(
+        self,
+        employee_id: str,
+        after_seq: int = 0,
+        limit: int = 100,
+        filters: Optional[RequestFilter] = None,
+    ) -> Tuple[List[VacationRequest], Optional[int]]:
+        return await self.run(self.backend.page_requests, employee_id, after_seq, limit, filters)
+
+    async def set_team(self, employee_id: str, team: Optional[str]) -> None:
+        await self.run(self.backend.set_team, employee_id, team)
+
+    async def get_accrual_policy(self, employee_id: str) -> Optional[AccrualPolicy]:
+        return await self.run(self.backend.get_accrual_policy, employee_id)
+
+    async def set_accrual_policy(self, employee_id: str, policy: Optional[AccrualPolicy]) -> None:
+        await self.run(self.backend.set_accrual_policy, employee_id, policy)
+
+    async def accrual_policies(self) -> Dict[str, AccrualPolicy]:
+        return await self.run(self.backend.accrual_policies)
+
+    async def absentees(
+        self, start_ordinal: int, end_ordinal: int, team: Optional[str] = None,
+    ) -> List[Tuple[VacationRequest, Optional[str]]]:
+        return await self.run(self.backend.absentees, start_ordinal, end_ordinal, team)
+
+    async def version(self, employee_id: str) -> int:
+        return await self.run(self.backend.version, employee_id)
+
+    async def counts(self) -> Tuple[int, int]:
+        return await self.run(self.backend.counts)
+
+    async def is_empty(self) -> bool:
+        return await self.run(self.backend.is_empty)
+
+
+async_store = AsyncStore(store)
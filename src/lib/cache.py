@@ -0,0 +1,127 @@
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe LRU map whose entries also expire ``ttl`` seconds after being set.
+
+    Lookups and inserts are O(1). Beyond ``max_entries`` the least recently
+    used entry is evicted; expired entries are dropped when looked up or when
+    they reach the LRU end.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None, now: Optional[float] = None) -> Any:
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= now:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V, now: Optional[float] = None) -> None:
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while self._entries:
+                oldest_key, (expires, _) = next(iter(self._entries.items()))
+                if len(self._entries) <= self.max_entries and expires > now:
+                    break
+                del self._entries[oldest_key]
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class IdempotencyKeyConflict(ValueError):
+    """An idempotency key was reused with a different request."""
+
+
+class IdempotentCalls(Generic[V]):
+    """Runs each keyed computation once and hands its result to every repeat.
+
+    Completed results are kept in a ``TTLCache``; a repeat within the TTL gets
+    the stored result in O(1). Concurrent duplicates wait on the one in-flight
+    computation instead of starting their own. Each key is bound to a
+    fingerprint of its request, and reusing a key for a different request
+    raises ``IdempotencyKeyConflict``. Failed computations are not cached,
+    so a retry after an error runs again.
+
+    In-flight work is tracked with ``concurrent.futures.Future``, so waiters
+    may sit on different event loops or threads.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.completed: TTLCache[Tuple[Hashable, V]] = TTLCache(max_entries, ttl)
+        self._in_flight: Dict[Hashable, Tuple[Hashable, "Future[V]"]] = {}
+        self._lock = threading.Lock()
+
+    async def run(self, key: Hashable, fingerprint: Hashable, compute: Callable[[], Awaitable[V]]) -> Tuple[V, bool]:
+        """Return ``(result, replayed)``; ``replayed`` is True when ``compute`` was not called."""
+        with self._lock:
+            done = self.completed.get(key, _MISSING)
+            if done is not _MISSING:
+                leader = None
+                stored_fingerprint, result = done
+            else:
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    leader = self._in_flight[key] = (fingerprint, Future())
+                else:
+                    leader = None
+        if done is not _MISSING:
+            if stored_fingerprint != fingerprint:
+                raise IdempotencyKeyConflict("Idempotency-Key was already used for a different request")
+            return result, True
+        if leader is None:
+            pending_fingerprint, future = pending
+            if pending_fingerprint != fingerprint:
+                raise IdempotencyKeyConflict("Idempotency-Key was already used for a different request")
+            return await asyncio.shield(asyncio.wrap_future(future)), True
+
+        _, future = leader
+        try:
+            result = await compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody was waiting on it
+            future.exception()
+            raise
+        with self._lock:
+            self.completed.set(key, (fingerprint, result))
+            del self._in_flight[key]
+        future.set_result(result)
+        return result, False
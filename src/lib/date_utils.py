@@ -1,19 +1,28 @@
-from datetime import date, timedelta
+from datetime import date
+
+# Weekdays contained in the first ``n`` days of a Monday-aligned week (n = 0..6).
+_WEEKDAYS_IN_PARTIAL_WEEK = (0, 1, 2, 3, 4, 5, 5)
 
 
 def parse_iso(d: str) -> date:
     return date.fromisoformat(d)
 
 
+def _weekdays_before(ordinal: int) -> int:
+    # Ordinal 1 (0001-01-01) is a Monday, so ordinals 1..ordinal-1 are
+    # ``whole`` full weeks plus a ``rem``-day partial week starting on Monday.
+    whole, rem = divmod(ordinal - 1, 7)
+    return whole * 5 + _WEEKDAYS_IN_PARTIAL_WEEK[rem]
+
+
+def count_weekdays_ordinals(start_ordinal: int, end_ordinal: int) -> int:
+    """Count Mon-Fri days between two ``date.toordinal()`` values, inclusive."""
+    if end_ordinal < start_ordinal:
+        raise ValueError("end date before start date")
+    return _weekdays_before(end_ordinal + 1) - _weekdays_before(start_ordinal)
+
+
 def count_weekdays_inclusive(start_iso: str, end_iso: str) -> int:
     start = parse_iso(start_iso)
     end = parse_iso(end_iso)
-    if end < start:
-        raise ValueError("end date before start date")
-    days = 0
-    current = start
-    while current <= end:
-        if current.weekday() < 5:  # 0=Mon .. 4=Fri
-            days += 1
-        current += timedelta(days=1)
-    return days
+    return count_weekdays_ordinals(start.toordinal(), end.toordinal())
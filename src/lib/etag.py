@@ -0,0 +1,23 @@
+"""Entity tags built from per-employee store versions.
+
+An ETag is ``"<epoch>-<version>"``: the store's epoch changes whenever its
+versions could restart (a new in-memory store, a new SQLite file), so a tag
+from before a restart never matches a version reached again after it.
+"""
+from __future__ import annotations
+from typing import Optional
+
+
+def make_etag(epoch: str, version: int) -> str:
+    return f'"{epoch}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an ``If-None-Match`` header lists ``etag`` (weak comparison) or is ``*``."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
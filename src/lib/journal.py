@@ -0,0 +1,348 @@
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.lib.accrual import AccrualPolicy
+from src.lib.store import Accrue, InMemoryStore, VacationRequest
+
+logger = logging.getLogger("vacationmcp")
+
+_SNAPSHOT_FILE = "snapshot.json"
+_SEGMENT_PREFIX = "journal-"
+_SEGMENT_SUFFIX = ".jsonl"
+
+
+def _request_row(request: VacationRequest) -> list:
+    return [
+        request.id,
+        request.employee_id,
+        request.start_date,
+        request.end_date,
+        request.total_days,
+        request.total_hours,
+        request.status,
+        request.reason,
+    ]
+
+
+def _policy_row(policy: Optional[AccrualPolicy]) -> Optional[list]:
+    if policy is None:
+        return None
+    return [policy.hours_per_month, policy.cap_hours, policy.carry_over_hours]
+
+
+def _encode(record: dict) -> bytes:
+    return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+def _fsync_dir(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class JournaledStore(InMemoryStore):
+    """``InMemoryStore`` that survives restarts via a journal and snapshots.
+
+    Reads are served from the same dicts as ``InMemoryStore``. Every mutation
+    is appended as a JSON line to the current journal segment; a committer
+    thread writes whatever has accumulated with one ``fsync`` (group commit)
+    and mutators return once their record is durable. A snapshot thread
+    periodically writes the full state, starts a new segment and deletes the
+    old ones, so recovery replays at most one snapshot interval of journal.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        snapshot_interval: float = 300.0,
+        wait_for_commit: bool = True,
+    ) -> None:
+        super().__init__()
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self.wait_for_commit = wait_for_commit
+        # Mutators wait for the group-commit fsync unless told not to
+        self.blocking = wait_for_commit
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()  # guards in-memory state, _seq and _pending
+        self._io_lock = threading.Lock()  # guards the segment file; taken before _lock
+        self._has_work = threading.Condition(self._lock)
+        self._committed = threading.Condition(self._lock)
+        self._pending: List[bytes] = []
+        self._seq = 0
+        self._durable_seq = 0
+        self._snapshot_seq = 0
+        self._closed = False
+
+        self._recover()
+        self._segment = open(self._segment_path(self._seq + 1), "ab")
+
+        self._stop = threading.Event()
+        self._committer = threading.Thread(target=self._commit_loop, name="store-journal-commit", daemon=True)
+        self._committer.start()
+        self._snapshotter = threading.Thread(target=self._snapshot_loop, name="store-journal-snapshot", daemon=True)
+        self._snapshotter.start()
+
+    # -- mutations -----------------------------------------------------------
+
+    def set_balance(self, employee_id: str, hours: int) -> None:
+        with self._lock:
+            super().set_balance(employee_id, hours)
+            seq = self._append({"op": "bal", "e": employee_id, "h": hours})
+        self._wait_durable(seq)
+
+    def add_request(self, employee_id: str, request: VacationRequest) -> None:
+        with self._lock:
+            super().add_request(employee_id, request)
+            seq = self._append({"op": "add", "e": employee_id, "r": _request_row(request)})
+        self._wait_durable(seq)
+
+    def remove_request(self, employee_id: str, request_id: str) -> Optional[VacationRequest]:
+        with self._lock:
+            removed = super().remove_request(employee_id, request_id)
+            if removed is None:
+                return None
+            seq = self._append({"op": "del", "e": employee_id, "id": request_id})
+        self._wait_durable(seq)
+        return removed
+
+    def refund_request(self, employee_id: str, request_id: str) -> Optional[Tuple[VacationRequest, int]]:
+        with self._lock:
+            refunded = super().refund_request(employee_id, request_id)
+            if refunded is None:
+                return None
+            seq = self._append({"op": "refund", "e": employee_id, "id": request_id})
+        self._wait_durable(seq)
+        return refunded
+
+    def bulk_load(
+        self,
+        balances: Dict[str, int],
+        requests: Iterable[VacationRequest],
+        teams: Optional[Dict[str, Optional[str]]] = None,
+    ) -> None:
+        requests = list(requests)
+        with self._lock:
+            super().bulk_load(balances, requests, teams)
+            record = {"op": "bulk", "b": balances, "r": [_request_row(r) for r in requests]}
+            if teams:
+                record["t"] = teams
+            seq = self._append(record)
+        self._wait_durable(seq)
+
+    def set_team(self, employee_id: str, team: Optional[str]) -> None:
+        with self._lock:
+            super().set_team(employee_id, team)
+            seq = self._append({"op": "team", "e": employee_id, "t": team})
+        self._wait_durable(seq)
+
+    def set_accrual_policy(self, employee_id: str, policy: Optional[AccrualPolicy]) -> None:
+        with self._lock:
+            super().set_accrual_policy(employee_id, policy)
+            seq = self._append({"op": "pol", "e": employee_id, "p": _policy_row(policy)})
+        self._wait_durable(seq)
+
+    def post_accruals(self, previous: Optional[int], through: int, accrue: Accrue) -> Optional[Dict[str, int]]:
+        with self._lock:
+            balances = super().post_accruals(previous, through, accrue)
+            if balances is None:
+                return None
+            seq = self._append({"op": "acc", "b": balances, "through": through})
+        self._wait_durable(seq)
+        return balances
+
+    def _append(self, record: dict) -> int:
+        # Caller holds _lock.
+        self._seq += 1
+        record["s"] = self._seq
+        self._pending.append(_encode(record))
+        self._has_work.notify()
+        return self._seq
+
+    def _wait_durable(self, seq: int) -> None:
+        if not self.wait_for_commit:
+            return
+        with self._lock:
+            while self._durable_seq < seq and not self._closed:
+                self._committed.wait()
+
+    # -- group commit --------------------------------------------------------
+
+    def _commit_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._has_work.wait()
+                if self._closed and not self._pending:
+                    return
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._io_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                seq = self._seq
+            if batch:
+                self._segment.write(b"".join(batch))
+                self._segment.flush()
+                os.fsync(self._segment.fileno())
+            with self._lock:
+                self._durable_seq = max(self._durable_seq, seq)
+                self._committed.notify_all()
+
+    # -- snapshots -----------------------------------------------------------
+
+    def _snapshot_loop(self) -> None:
+        while not self._stop.wait(self.snapshot_interval):
+            try:
+                self.snapshot()
+            except Exception:
+                logger.exception("store_snapshot_failed directory=%s", self.directory)
+
+    def snapshot(self) -> None:
+        """Write a full snapshot, start a new segment and drop older ones."""
+        with self._io_lock:
+            with self._lock:
+                seq = self._seq
+                if seq == self._snapshot_seq:
+                    return
+                balances = dict(self.employee_id_to_balance)
+                teams = dict(self.employee_id_to_team)
+                policies = {e: _policy_row(p) for e, p in self.employee_id_to_accrual_policy.items()}
+                accrued_through = self.accrued_through_ordinal
+                requests = {e: list(reqs) for e, reqs in self.employee_id_to_requests.items()}
+                batch, self._pending = self._pending, []
+            # Seal the current segment and start the next one at seq + 1.
+            if batch:
+                self._segment.write(b"".join(batch))
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._segment.close()
+            self._segment = open(self._segment_path(seq + 1), "ab")
+            with self._lock:
+                self._durable_seq = max(self._durable_seq, seq)
+                self._committed.notify_all()
+
+        state = {
+            "seq": seq,
+            "balances": balances,
+            "teams": teams,
+            "policies": policies,
+            "accruedThrough": accrued_through,
+            "requests": {e: [_request_row(r) for r in reqs] for e, reqs in requests.items()},
+        }
+        path = os.path.join(self.directory, _SNAPSHOT_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(state, separators=(",", ":")).encode())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        _fsync_dir(self.directory)
+        self._snapshot_seq = seq
+
+        for first_seq, name in self._segments():
+            if first_seq <= seq:
+                os.remove(os.path.join(self.directory, name))
+        logger.info("store_snapshot_written seq=%s employees=%s", seq, len(balances))
+
+    # -- recovery ------------------------------------------------------------
+
+    def _segment_path(self, first_seq: int) -> str:
+        return os.path.join(self.directory, f"{_SEGMENT_PREFIX}{first_seq:020d}{_SEGMENT_SUFFIX}")
+
+    def _segments(self) -> List[tuple]:
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                found.append((int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]), name))
+        return sorted(found)
+
+    def _recover(self) -> None:
+        path = os.path.join(self.directory, _SNAPSHOT_FILE)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                state = json.loads(f.read())
+            InMemoryStore.bulk_load(
+                self,
+                state["balances"],
+                [VacationRequest(*row) for rows in state["requests"].values() for row in rows],
+                # Snapshots written before team assignments existed have no "teams"
+                state.get("teams"),
+            )
+            # Nor do those written before accrual policies were stored
+            for employee_id, row in state.get("policies", {}).items():
+                InMemoryStore.set_accrual_policy(self, employee_id, AccrualPolicy(*row))
+            self.accrued_through_ordinal = state.get("accruedThrough")
+            self._seq = self._snapshot_seq = state["seq"]
+
+        replayed = 0
+        for _, name in self._segments():
+            segment_path = os.path.join(self.directory, name)
+            good_bytes = 0
+            torn = False
+            with open(segment_path, "rb") as f:
+                for line in f:
+                    try:
+                        # A line without its newline was cut short even if it parses
+                        record = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        record = None
+                    if record is None:
+                        # A torn final write from a crash; nothing after it was acknowledged.
+                        torn = True
+                        break
+                    good_bytes += len(line)
+                    if record["s"] <= self._seq:
+                        continue
+                    self._apply(record)
+                    self._seq = record["s"]
+                    replayed += 1
+            if torn:
+                # New records may be appended to this very segment; they must not land on the torn line
+                os.truncate(segment_path, good_bytes)
+                logger.warning("store_journal_truncated segment=%s bytes=%s", name, good_bytes)
+        self._durable_seq = self._seq
+        if self._seq:
+            logger.info(
+                "store_recovered directory=%s snapshot_seq=%s replayed=%s",
+                self.directory, self._snapshot_seq, replayed,
+            )
+
+    def _apply(self, record: Dict) -> None:
+        op = record["op"]
+        if op == "bal":
+            InMemoryStore.set_balance(self, record["e"], record["h"])
+        elif op == "add":
+            InMemoryStore.add_request(self, record["e"], VacationRequest(*record["r"]))
+        elif op == "del":
+            InMemoryStore.remove_request(self, record["e"], record["id"])
+        elif op == "refund":
+            InMemoryStore.refund_request(self, record["e"], record["id"])
+        elif op == "bulk":
+            InMemoryStore.bulk_load(self, record["b"], [VacationRequest(*row) for row in record["r"]], record.get("t"))
+        elif op == "team":
+            InMemoryStore.set_team(self, record["e"], record["t"])
+        elif op == "pol":
+            row = record["p"]
+            InMemoryStore.set_accrual_policy(self, record["e"], None if row is None else AccrualPolicy(*row))
+        elif op == "acc":
+            balances = record["b"]
+            InMemoryStore.post_accruals(self, self.accrued_through_ordinal, record["through"], lambda _: balances)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._snapshotter.join()
+        with self._lock:
+            self._closed = True
+            self._has_work.notify_all()
+        self._committer.join()
+        self._flush()
+        self._segment.close()
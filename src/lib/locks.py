@@ -0,0 +1,61 @@
+from __future__ import annotations
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, List
+
+import anyio
+
+
+class StripedLock:
+    """A fixed set of locks selected by hashing a key.
+
+    Work on the same key is serialized while different keys usually land on
+    different stripes and proceed in parallel, without keeping one lock per
+    key alive forever. Plain ``threading.Lock`` stripes are used so sync
+    handlers on the threadpool and async handlers on the event loop exclude
+    each other.
+    """
+
+    def __init__(self, stripes: int = 64) -> None:
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(stripes)]
+
+    def _stripe(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        lock = self._stripe(key)
+        lock.acquire()
+        try:
+            yield
+        finally:
+            lock.release()
+
+    @contextmanager
+    def hold_all(self) -> Iterator[None]:
+        """Hold every stripe, for work that must exclude all per-key writers at once."""
+        # Always acquired in index order, so two holders cannot deadlock
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+    @asynccontextmanager
+    async def hold_async(self, key: str) -> AsyncIterator[None]:
+        """Like ``hold`` but waits for a contended stripe off the event loop."""
+        lock = self._stripe(key)
+        if not lock.acquire(blocking=False):
+            # Not cancellable: once the worker thread owns the lock we must
+            # reach the ``finally`` below to release it.
+            await anyio.to_thread.run_sync(lock.acquire)
+        try:
+            yield
+        finally:
+            lock.release()
+
+
+# Serializes balance check-and-deduct per employee.
+employee_locks = StripedLock()
@@ -1,14 +1,115 @@
+import atexit
 import logging
+import os
+import queue
+import random
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional, TextIO
 
+LOG_LEVEL_ENV = "LOG_LEVEL"
+LOG_BODY_SAMPLE_RATE_ENV = "LOG_BODY_SAMPLE_RATE"
+LOG_BODY_MAX_PER_SECOND_ENV = "LOG_BODY_MAX_PER_SECOND"
 
-def setup_logging() -> None:
-    handler = logging.StreamHandler(sys.stdout)
+_listener: Optional[QueueListener] = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue records untouched so message formatting happens on the listener thread.
+
+    The stock ``prepare`` formats the message (and any traceback) on the
+    calling thread; that is the expensive part we want off the event loop.
+    Log arguments must therefore not be mutated after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(stream: Optional[TextIO] = None) -> None:
+    """Route all logging through a queue drained by a background writer thread."""
+    global _listener
+    handler = logging.StreamHandler(stream or sys.stdout)
     formatter = logging.Formatter(
         fmt="%(asctime)s %(levelname)s %(name)s %(message)s",
         datefmt="%Y-%m-%dT%H:%M:%S%z",
     )
     handler.setFormatter(formatter)
+
+    if _listener is not None:
+        _listener.stop()
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _listener = QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+
     root = logging.getLogger()
-    root.setLevel(logging.INFO)
-    root.handlers = [handler]
+    root.setLevel(os.getenv(LOG_LEVEL_ENV, "INFO").upper())
+    root.handlers = [_DeferredQueueHandler(records)]
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class _Event:
+    """``event key=value ...`` rendered only when a handler formats the record."""
+
+    __slots__ = ("name", "fields")
+
+    def __init__(self, name: str, fields: dict) -> None:
+        self.name = name
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return " ".join([self.name, *(f"{k}={v}" for k, v in self.fields.items())])
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, **fields: Any) -> None:
+    if logger.isEnabledFor(level):
+        logger.log(level, _Event(event, fields))
+
+
+class BodySampler:
+    """Decides which request bodies get dumped: a random sample, capped per second."""
+
+    def __init__(self, rate: float, max_per_second: int) -> None:
+        self.rate = rate
+        self.max_per_second = max_per_second
+        self._second = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.rate <= 0 or self.max_per_second <= 0:
+            return False
+        if self.rate < 1 and random.random() >= self.rate:
+            return False
+        now = int(time.monotonic())
+        with self._lock:
+            if now != self._second:
+                self._second, self._count = now, 0
+            if self._count >= self.max_per_second:
+                return False
+            self._count += 1
+        return True
+
+
+body_sampler = BodySampler(
+    float(os.getenv(LOG_BODY_SAMPLE_RATE_ENV, "1.0")),
+    int(os.getenv(LOG_BODY_MAX_PER_SECOND_ENV, "10")),
+)
+
+
+def log_body(logger: logging.Logger, event: str, body: Any) -> None:
+    """Dump a raw request body at INFO, subject to ``body_sampler``."""
+    if logger.isEnabledFor(logging.INFO) and body_sampler.allow():
+        logger.info("%s body=%s", event, body)
@@ -0,0 +1,221 @@
+"""In-process metrics rendered in the Prometheus text format.
+
+Counters, gauges and histograms keep one shard per thread, so recording is
+a plain dict update on thread-local state with no lock; ``render()`` sums
+the shards. Gauges whose value lives elsewhere (store sizes) are read
+through callbacks at scrape time.
+"""
+from __future__ import annotations
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    """Per-thread state; each thread only ever writes to its own shard."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _snapshots(self) -> List[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.copy() runs without releasing the GIL, so each copy is consistent
+        return [s.copy() for s in shards]
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[_Labels, float]:
+        totals: Dict[_Labels, float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values().items())
+        ]
+
+
+class Gauge(Counter):
+    """Up/down value (e.g. requests in flight); shards hold deltas that sum to the value."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class CallbackGauge:
+    """Gauge read from ``callback() -> {labels: value}`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...],
+        callback: Callable[[], Dict[_Labels, float]],
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.callback().items())
+        ]
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # [per-bucket counts (last is +Inf), sum]
+            state = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def values(self) -> Dict[_Labels, Tuple[List[int], float]]:
+        totals: Dict[_Labels, Tuple[List[int], float]] = {}
+        for shard in self._snapshots():
+            for labels, (counts, total) in shard.items():
+                merged = totals.get(labels)
+                if merged is None:
+                    totals[labels] = (list(counts), total)
+                else:
+                    totals[labels] = ([a + b for a, b in zip(merged[0], counts)], merged[1] + total)
+        return totals
+
+    def samples(self) -> List[str]:
+        lines = []
+        bounds = [*self.buckets, float("inf")]
+        for labels, (counts, total) in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "vacationmcp_http_request_duration_seconds",
+    "REST and MCP HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+http_requests_in_flight = registry.gauge(
+    "vacationmcp_http_requests_in_flight",
+    "HTTP requests currently being handled.",
+)
+mcp_tool_duration = registry.histogram(
+    "vacationmcp_mcp_tool_duration_seconds",
+    "MCP tool call latency by tool name and outcome.",
+    ("tool", "outcome"),
+)
+vacation_requests_decided = registry.counter(
+    "vacationmcp_vacation_requests_total",
+    "Vacation requests decided, by status and decline reason.",
+    ("status", "reason"),
+)
+rate_limit_rejections = registry.counter(
+    "vacationmcp_rate_limit_rejections_total",
+    "Requests rejected by a rate limiter.",
+    ("limiter",),
+)
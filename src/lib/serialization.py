@@ -0,0 +1,22 @@
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON-native content (dicts, lists, str, numbers, None) to compact UTF-8 bytes."""
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded by pydantic-core's Rust serializer.
+
+    Returning one from a route skips FastAPI's ``response_model`` validation
+    and ``jsonable_encoder`` pass, so the content must already be JSON-native
+    and match the declared schema. The route's ``response_model`` still
+    documents it in OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -0,0 +1,465 @@
+from __future__ import annotations
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from src.lib.accrual import AccrualPolicy
+from src.lib.store import Accrue, Decide, RequestFilter, VacationRequest
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS balances (
+        employee_id TEXT PRIMARY KEY,
+        hours INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS requests (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        employee_id TEXT NOT NULL,
+        start_date TEXT NOT NULL,
+        end_date TEXT NOT NULL,
+        total_days INTEGER NOT NULL,
+        total_hours INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        reason TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_requests_employee_start ON requests (employee_id, start_date)",
+    "CREATE INDEX IF NOT EXISTS idx_requests_employee_seq ON requests (employee_id, seq)",
+    """
+    CREATE TABLE IF NOT EXISTS teams (
+        employee_id TEXT PRIMARY KEY,
+        team TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_teams_team ON teams (team)",
+    # Absence queries: approved requests ending on or after the range start
+    "CREATE INDEX IF NOT EXISTS idx_requests_status_end ON requests (status, end_date)",
+    # Per-employee versions for conditional GETs, bumped by triggers so every writer
+    # (including other worker processes) is counted
+    """
+    CREATE TABLE IF NOT EXISTS versions (
+        employee_id TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS accrual_policies (
+        employee_id TEXT PRIMARY KEY,
+        hours_per_month REAL NOT NULL,
+        cap_hours REAL NOT NULL,
+        carry_over_hours REAL
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "INSERT OR IGNORE INTO meta (key, value) VALUES ('version_epoch', lower(hex(randomblob(6))))",
+) + tuple(
+    f"CREATE TRIGGER IF NOT EXISTS bump_version_{table}_{event.lower()} AFTER {event} ON {table} BEGIN "
+    f"INSERT INTO versions (employee_id, version) VALUES ({row}.employee_id, 1) "
+    "ON CONFLICT (employee_id) DO UPDATE SET version = version + 1; END"
+    for table in ("balances", "requests", "teams")
+    for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+)
+
+# Statements are kept as module constants so every pooled connection reuses
+# its compiled form from sqlite3's per-connection statement cache.
+_SELECT_BALANCE = "SELECT hours FROM balances WHERE employee_id = ?"
+_ALL_BALANCES = "SELECT employee_id, hours FROM balances"
+_UPSERT_BALANCE = (
+    "INSERT INTO balances (employee_id, hours) VALUES (?, ?) "
+    "ON CONFLICT (employee_id) DO UPDATE SET hours = excluded.hours"
+)
+# Relative, so a concurrent writer's change is kept rather than overwritten
+_ADD_TO_BALANCE = (
+    "INSERT INTO balances (employee_id, hours) VALUES (?, ?) "
+    "ON CONFLICT (employee_id) DO UPDATE SET hours = hours + excluded.hours"
+)
+_INSERT_REQUEST = (
+    "INSERT INTO requests (id, employee_id, start_date, end_date, total_days, total_hours, status, reason) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SELECT_REQUESTS = (
+    "SELECT id, employee_id, start_date, end_date, total_days, total_hours, status, reason "
+    "FROM requests WHERE employee_id = ? ORDER BY seq"
+)
+_PAGE_REQUESTS = (
+    "SELECT seq, id, employee_id, start_date, end_date, total_days, total_hours, status, reason "
+    "FROM requests WHERE employee_id = ?1 AND seq > ?2 "
+    "AND (?3 IS NULL OR status = ?3) AND (?4 IS NULL OR start_date <= ?4) AND (?5 IS NULL OR end_date >= ?5) "
+    "ORDER BY seq LIMIT ?6"
+)
+_SELECT_REQUEST = (
+    "SELECT id, employee_id, start_date, end_date, total_days, total_hours, status, reason "
+    "FROM requests WHERE employee_id = ? AND id = ?"
+)
+_UPSERT_TEAM = (
+    "INSERT INTO teams (employee_id, team) VALUES (?, ?) "
+    "ON CONFLICT (employee_id) DO UPDATE SET team = excluded.team"
+)
+_DELETE_TEAM = "DELETE FROM teams WHERE employee_id = ?"
+_SELECT_TEAM = "SELECT team FROM teams WHERE employee_id = ?"
+_ABSENTEES = (
+    "SELECT r.id, r.employee_id, r.start_date, r.end_date, r.total_days, r.total_hours, r.status, r.reason, t.team "
+    "FROM requests r LEFT JOIN teams t ON t.employee_id = r.employee_id "
+    "WHERE r.status = 'Approved' AND r.end_date >= ?1 AND r.start_date <= ?2 AND (?3 IS NULL OR t.team = ?3) "
+    "ORDER BY r.employee_id, r.start_date"
+)
+_UPSERT_POLICY = (
+    "INSERT INTO accrual_policies (employee_id, hours_per_month, cap_hours, carry_over_hours) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (employee_id) DO UPDATE SET hours_per_month = excluded.hours_per_month, "
+    "cap_hours = excluded.cap_hours, carry_over_hours = excluded.carry_over_hours"
+)
+_DELETE_POLICY = "DELETE FROM accrual_policies WHERE employee_id = ?"
+_SELECT_POLICY = "SELECT hours_per_month, cap_hours, carry_over_hours FROM accrual_policies WHERE employee_id = ?"
+_ALL_POLICIES = "SELECT employee_id, hours_per_month, cap_hours, carry_over_hours FROM accrual_policies"
+_SELECT_ACCRUED_THROUGH = "SELECT value FROM meta WHERE key = 'accrued_through'"
+_UPSERT_ACCRUED_THROUGH = (
+    "INSERT INTO meta (key, value) VALUES ('accrued_through', ?) "
+    "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+)
+_SELECT_VERSION = "SELECT version FROM versions WHERE employee_id = ?"
+_ANY_ROWS = "SELECT EXISTS (SELECT 1 FROM balances) OR EXISTS (SELECT 1 FROM requests)"
+_COUNTS = "SELECT (SELECT COUNT(*) FROM balances), (SELECT COUNT(*) FROM requests)"
+_DELETE_REQUEST = "DELETE FROM requests WHERE employee_id = ? AND id = ?"
+# Booked ranges are disjoint, so only the latest range starting on or before
+# the queried end date can overlap; the (employee_id, start_date) index
+# answers this with one seek.
+_LATEST_BOOKED_END = (
+    "SELECT end_date FROM requests "
+    "WHERE employee_id = ? AND start_date <= ? AND status != 'Declined' "
+    "ORDER BY start_date DESC LIMIT 1"
+)
+
+
+class _ConnectionPool:
+    """Fixed-size pool of SQLite connections shared across threads."""
+
+    def __init__(self, path: str, size: int) -> None:
+        self._path = path
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._size = size
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._path,
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = len(self._all) < self._size
+                if grow:
+                    conn = self._connect()
+                    self._all.append(conn)
+            if not grow:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+
+
+class SQLiteStore:
+    """SQLite-backed store (WAL mode) with the same surface as ``InMemoryStore``.
+
+    WAL lets several uvicorn workers share one database file: readers never
+    block the single writer, and data survives restarts and deploys.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, pool_size: int = 8) -> None:
+        self.path = path
+        self._pool = _ConnectionPool(path, pool_size)
+        with self._pool.connection() as conn:
+            for ddl in _SCHEMA:
+                conn.execute(ddl)
+            self.version_epoch = conn.execute("SELECT value FROM meta WHERE key = 'version_epoch'").fetchone()[0]
+
+    @staticmethod
+    def _row_to_request(row: tuple) -> VacationRequest:
+        return VacationRequest(*row)
+
+    def get_balance(self, employee_id: str) -> int:
+        with self._pool.connection() as conn:
+            row = conn.execute(_SELECT_BALANCE, (employee_id,)).fetchone()
+        return row[0] if row else 0
+
+    def get_balances(self, employee_ids: List[str]) -> Dict[str, int]:
+        balances = dict.fromkeys(employee_ids, 0)
+        unique = list(balances)
+        with self._pool.connection() as conn:
+            # Stay below SQLite's host-parameter limit
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                sql = f"SELECT employee_id, hours FROM balances WHERE employee_id IN ({','.join('?' * len(chunk))})"
+                balances.update(conn.execute(sql, chunk).fetchall())
+        return balances
+
+    def all_balances(self) -> Dict[str, int]:
+        with self._pool.connection() as conn:
+            return dict(conn.execute(_ALL_BALANCES).fetchall())
+
+    def set_balance(self, employee_id: str, hours: int) -> None:
+        with self._pool.connection() as conn:
+            conn.execute(_UPSERT_BALANCE, (employee_id, hours))
+
+    def add_request(self, employee_id: str, request: VacationRequest) -> None:
+        with self._pool.connection() as conn:
+            conn.execute(
+                _INSERT_REQUEST,
+                (
+                    request.id,
+                    employee_id,
+                    request.start_date,
+                    request.end_date,
+                    request.total_days,
+                    request.total_hours,
+                    request.status,
+                    request.reason,
+                ),
+            )
+
+    def remove_request(self, employee_id: str, request_id: str) -> Optional[VacationRequest]:
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(_SELECT_REQUEST, (employee_id, request_id)).fetchone()
+                if row is not None:
+                    conn.execute(_DELETE_REQUEST, (employee_id, request_id))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self._row_to_request(row) if row else None
+
+    def has_overlap(self, employee_id: str, start_ordinal: int, end_ordinal: int) -> bool:
+        with self._pool.connection() as conn:
+            return self._has_overlap(conn, employee_id, start_ordinal, end_ordinal)
+
+    @staticmethod
+    def _has_overlap(conn: sqlite3.Connection, employee_id: str, start_ordinal: int, end_ordinal: int) -> bool:
+        end_iso = date.fromordinal(end_ordinal).isoformat()
+        row = conn.execute(_LATEST_BOOKED_END, (employee_id, end_iso)).fetchone()
+        return row is not None and date.fromisoformat(row[0]).toordinal() >= start_ordinal
+
+    def approve(self, employee_id: str, decide: Decide) -> int:
+        with self._pool.connection() as conn:
+            # Holds the write lock from the balance read to the insert, so no other worker
+            # process can spend the same hours or book the same days in between
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(_SELECT_BALANCE, (employee_id,)).fetchone()
+                balance, approved = decide(
+                    row[0] if row else 0,
+                    lambda start, end: self._has_overlap(conn, employee_id, start, end),
+                )
+                if approved:
+                    conn.execute(_UPSERT_BALANCE, (employee_id, balance))
+                    conn.executemany(
+                        _INSERT_REQUEST,
+                        (
+                            (r.id, r.employee_id, r.start_date, r.end_date, r.total_days, r.total_hours, r.status, r.reason)
+                            for r in approved
+                        ),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return balance
+
+    def refund_request(self, employee_id: str, request_id: str) -> Optional[Tuple[VacationRequest, int]]:
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(_SELECT_REQUEST, (employee_id, request_id)).fetchone()
+                if row is not None:
+                    conn.execute(_DELETE_REQUEST, (employee_id, request_id))
+                    conn.execute(_ADD_TO_BALANCE, (employee_id, row[5]))
+                    balance = conn.execute(_SELECT_BALANCE, (employee_id,)).fetchone()[0]
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return (self._row_to_request(row), balance) if row else None
+
+    def booked_ranges(self, employee_ids: List[str]) -> Dict[str, List[Tuple[int, int]]]:
+        ranges: Dict[str, List[Tuple[int, int]]] = {e: [] for e in employee_ids}
+        unique = list(ranges)
+        fromiso = date.fromisoformat
+        with self._pool.connection() as conn:
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                sql = (
+                    "SELECT employee_id, start_date, end_date FROM requests "
+                    f"WHERE employee_id IN ({','.join('?' * len(chunk))}) AND status != 'Declined'"
+                )
+                for employee_id, start, end in conn.execute(sql, chunk):
+                    ranges[employee_id].append((fromiso(start).toordinal(), fromiso(end).toordinal()))
+        return ranges
+
+    def existing_request_ids(self, requests: Iterable[Tuple[str, str]]) -> Set[str]:
+        unique = list({request_id for _, request_id in requests})
+        existing = set()
+        with self._pool.connection() as conn:
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                sql = f"SELECT id FROM requests WHERE id IN ({','.join('?' * len(chunk))})"
+                existing.update(row[0] for row in conn.execute(sql, chunk))
+        return existing
+
+    def bulk_load(
+        self,
+        balances: Dict[str, int],
+        requests: Iterable[VacationRequest],
+        teams: Optional[Dict[str, Optional[str]]] = None,
+    ) -> None:
+        teams = teams or {}
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(_UPSERT_BALANCE, balances.items())
+                conn.executemany(_UPSERT_TEAM, ((e, t) for e, t in teams.items() if t is not None))
+                conn.executemany(_DELETE_TEAM, ((e,) for e, t in teams.items() if t is None))
+                conn.executemany(
+                    _INSERT_REQUEST,
+                    (
+                        (r.id, r.employee_id, r.start_date, r.end_date, r.total_days, r.total_hours, r.status, r.reason)
+                        for r in requests
+                    ),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def set_team(self, employee_id: str, team: Optional[str]) -> None:
+        with self._pool.connection() as conn:
+            if team is None:
+                conn.execute(_DELETE_TEAM, (employee_id,))
+            else:
+                conn.execute(_UPSERT_TEAM, (employee_id, team))
+
+    def get_team(self, employee_id: str) -> Optional[str]:
+        with self._pool.connection() as conn:
+            row = conn.execute(_SELECT_TEAM, (employee_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_accrual_policy(self, employee_id: str) -> Optional[AccrualPolicy]:
+        with self._pool.connection() as conn:
+            row = conn.execute(_SELECT_POLICY, (employee_id,)).fetchone()
+        return AccrualPolicy(*row) if row else None
+
+    def set_accrual_policy(self, employee_id: str, policy: Optional[AccrualPolicy]) -> None:
+        with self._pool.connection() as conn:
+            if policy is None:
+                conn.execute(_DELETE_POLICY, (employee_id,))
+            else:
+                conn.execute(
+                    _UPSERT_POLICY,
+                    (employee_id, policy.hours_per_month, policy.cap_hours, policy.carry_over_hours),
+                )
+
+    def accrual_policies(self) -> Dict[str, AccrualPolicy]:
+        with self._pool.connection() as conn:
+            rows = conn.execute(_ALL_POLICIES).fetchall()
+        return {row[0]: AccrualPolicy(*row[1:]) for row in rows}
+
+    def accrued_through(self) -> Optional[int]:
+        with self._pool.connection() as conn:
+            row = conn.execute(_SELECT_ACCRUED_THROUGH).fetchone()
+        return int(row[0]) if row else None
+
+    def post_accruals(self, previous: Optional[int], through: int, accrue: Accrue) -> Optional[Dict[str, int]]:
+        with self._pool.connection() as conn:
+            # The write lock makes the marker check, the balance read and the writes one
+            # step across workers, so no approval elsewhere spends hours in between
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(_SELECT_ACCRUED_THROUGH).fetchone()
+                if (int(row[0]) if row else None) != previous:
+                    conn.execute("ROLLBACK")
+                    return None
+                balances = accrue(dict(conn.execute(_ALL_BALANCES).fetchall()))
+                conn.executemany(_UPSERT_BALANCE, balances.items())
+                conn.execute(_UPSERT_ACCRUED_THROUGH, (str(through),))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return balances
+
+    def absentees(
+        self, start_ordinal: int, end_ordinal: int, team: Optional[str] = None,
+    ) -> List[Tuple[VacationRequest, Optional[str]]]:
+        params = (date.fromordinal(start_ordinal).isoformat(), date.fromordinal(end_ordinal).isoformat(), team)
+        with self._pool.connection() as conn:
+            rows = conn.execute(_ABSENTEES, params).fetchall()
+        return [(self._row_to_request(r[:8]), r[8]) for r in rows]
+
+    def version(self, employee_id: str) -> int:
+        with self._pool.connection() as conn:
+            row = conn.execute(_SELECT_VERSION, (employee_id,)).fetchone()
+        return row[0] if row else 0
+
+    def list_requests(self, employee_id: str) -> List[VacationRequest]:
+        with self._pool.connection() as conn:
+            rows = conn.execute(_SELECT_REQUESTS, (employee_id,)).fetchall()
+        return [self._row_to_request(r) for r in rows]
+
+    def page_requests(
+        self,
+        employee_id: str,
+        after_seq: int = 0,
+        limit: int = 100,
+        filters: Optional[RequestFilter] = None,
+    ) -> Tuple[List[VacationRequest], Optional[int]]:
+        f = filters or RequestFilter()
+        params = (
+            employee_id,
+            after_seq,
+            f.status,
+            date.fromordinal(f.end_ordinal).isoformat() if f.end_ordinal is not None else None,
+            date.fromordinal(f.start_ordinal).isoformat() if f.start_ordinal is not None else None,
+            limit + 1,
+        )
+        with self._pool.connection() as conn:
+            rows = conn.execute(_PAGE_REQUESTS, params).fetchall()
+        next_seq = rows[limit - 1][0] if len(rows) > limit else None
+        return [self._row_to_request(r[1:]) for r in rows[:limit]], next_seq
+
+    def is_empty(self) -> bool:
+        with self._pool.connection() as conn:
+            return not conn.execute(_ANY_ROWS).fetchone()[0]
+
+    def counts(self) -> Tuple[int, int]:
+        with self._pool.connection() as conn:
+            employees, requests = conn.execute(_COUNTS).fetchone()
+        return employees, requests
+
+    def close(self) -> None:
+        self._pool.close()
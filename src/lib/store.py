@@ -1,36 +1,697 @@
 from __future__ import annotations
+import os
+import sys
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
-from typing import Dict, List
+from datetime import date
+from enum import IntEnum
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Set, Tuple
+
+from src.lib.accrual import AccrualPolicy
+
+STORE_BACKEND_ENV = "STORE_BACKEND"
+STORE_PATH_ENV = "STORE_PATH"
+STORE_SNAPSHOT_INTERVAL_ENV = "STORE_SNAPSHOT_INTERVAL"
+
+
+class RequestStatus(IntEnum):
+    Pending = 0
+    Approved = 1
+    Declined = 2
+
+
+_STATUS_BY_NAME = {s.name: s for s in RequestStatus}
+# Date ordinals are ~739000, outside CPython's small-int cache; share one int object per distinct date.
+_ORDINALS: Dict[int, int] = {}
+
+
+def _pack_uuid(value: str) -> bytes | str:
+    """16 raw bytes for a canonical lowercase uuid string, otherwise the string unchanged."""
+    if len(value) == 36 and value[8] == "-":
+        try:
+            raw = uuid.UUID(value).bytes
+        except ValueError:
+            return value
+        if _format_uuid(raw) == value:
+            return raw
+    return value
+
+
+def _format_uuid(raw: bytes) -> str:
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _pack_date(value: str) -> int | str:
+    """Ordinal for any date ``date.fromisoformat`` accepts, otherwise the string unchanged (declined bad input).
+
+    Other ISO forms (``20300304``, ``2030-W10-1``) read back as ``YYYY-MM-DD``.
+    """
+    try:
+        ordinal = date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return value
+    return _ORDINALS.setdefault(ordinal, ordinal)
 
 
-@dataclass
 class VacationRequest:
-    id: str
-    employee_id: str
-    start_date: str  # ISO date
-    end_date: str    # ISO date
-    total_days: int
-    total_hours: int
-    status: str
-    reason: str | None = None
+    """A stored vacation request in a compact form.
+
+    Same constructor and attributes as the former dataclass, but slotted: the
+    id is kept as 16 raw bytes, dates as day ordinals and the status as a
+    ``RequestStatus``. Strings are only produced when read at the API edge.
+    Values that do not fit (non-uuid ids, unparsable dates on declined
+    requests) are kept verbatim.
+    """
+
+    __slots__ = ("_id", "employee_id", "_start", "_end", "total_days", "total_hours", "_status", "reason")
+
+    def __init__(
+        self,
+        id: str,
+        employee_id: str,
+        start_date: str,
+        end_date: str,
+        total_days: int,
+        total_hours: int,
+        status: str,
+        reason: str | None = None,
+    ) -> None:
+        self._id = _pack_uuid(id)
+        self.employee_id = sys.intern(employee_id)
+        self._start = _pack_date(start_date)
+        self._end = _pack_date(end_date)
+        self.total_days = total_days
+        self.total_hours = total_hours
+        self._status = _STATUS_BY_NAME.get(status, status)
+        self.reason = reason
+
+    @property
+    def id(self) -> str:
+        value = self._id
+        return _format_uuid(value) if type(value) is bytes else value
+
+    @id.setter
+    def id(self, value: str) -> None:
+        self._id = _pack_uuid(value)
+
+    @property
+    def start_date(self) -> str:
+        value = self._start
+        return date.fromordinal(value).isoformat() if type(value) is int else value
+
+    @start_date.setter
+    def start_date(self, value: str) -> None:
+        self._start = _pack_date(value)
+
+    @property
+    def end_date(self) -> str:
+        value = self._end
+        return date.fromordinal(value).isoformat() if type(value) is int else value
+
+    @end_date.setter
+    def end_date(self, value: str) -> None:
+        self._end = _pack_date(value)
+
+    @property
+    def start_ordinal(self) -> int:
+        """Start date as ``date.toordinal()``; ValueError if the stored date is not valid."""
+        value = self._start
+        if type(value) is not int:
+            raise ValueError(f"Invalid isoformat string: {value!r}")
+        return value
+
+    @property
+    def end_ordinal(self) -> int:
+        """End date as ``date.toordinal()``; ValueError if the stored date is not valid."""
+        value = self._end
+        if type(value) is not int:
+            raise ValueError(f"Invalid isoformat string: {value!r}")
+        return value
+
+    @property
+    def status(self) -> str:
+        value = self._status
+        return value.name if isinstance(value, RequestStatus) else value
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self._status = _STATUS_BY_NAME.get(value, value)
+
+    def _fields(self) -> tuple:
+        return (self.id, self.employee_id, self.start_date, self.end_date,
+                self.total_days, self.total_hours, self.status, self.reason)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VacationRequest):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # type: ignore[assignment]  # mutable, like the dataclass it replaces
+
+    def __repr__(self) -> str:
+        return (
+            f"VacationRequest(id={self.id!r}, employee_id={self.employee_id!r}, "
+            f"start_date={self.start_date!r}, end_date={self.end_date!r}, total_days={self.total_days!r}, "
+            f"total_hours={self.total_hours!r}, status={self.status!r}, reason={self.reason!r})"
+        )
+
+    def as_api_dict(self) -> Dict[str, object]:
+        """camelCase mapping matching the public ``VacationRequest`` schema."""
+        return {
+            "id": self.id,
+            "employeeId": self.employee_id,
+            "startDate": self.start_date,
+            "endDate": self.end_date,
+            "totalDays": self.total_days,
+            "totalHours": self.total_hours,
+            "status": self.status,
+            "reason": self.reason,
+        }
+
+
+@dataclass(frozen=True)
+class RequestFilter:
+    """Optional page filters: date range (ordinals, inclusive overlap) and status."""
+
+    start_ordinal: Optional[int] = None
+    end_ordinal: Optional[int] = None
+    status: Optional[str] = None
+
+    def matches(self, request: VacationRequest) -> bool:
+        if self.status is not None and request.status != self.status:
+            return False
+        if self.end_ordinal is not None and request.start_ordinal > self.end_ordinal:
+            return False
+        if self.start_ordinal is not None and request.end_ordinal < self.start_ordinal:
+            return False
+        return True
+
+
+# approve()'s decision callback: (balance, has_overlap(start, end)) -> (new balance, approved requests)
+Decide = Callable[[int, Callable[[int, int], bool]], Tuple[int, List[VacationRequest]]]
+# post_accruals()' callback: every stored balance -> the balances accrual changes
+Accrue = Callable[[Dict[str, int]], Dict[str, int]]
+
+
+class Store(Protocol):
+    """Storage surface used by ``BalanceService`` and ``RequestService``."""
+
+    # True when calls may block on I/O (disk, fsync); async callers then run them off the event loop
+    blocking: bool
+    # Changes whenever versions may restart from lower numbers (a new in-memory store), so (epoch, version) never repeats
+    version_epoch: str
+
+    def get_balance(self, employee_id: str) -> int: ...
+
+    def get_balances(self, employee_ids: List[str]) -> Dict[str, int]: ...
+
+    def all_balances(self) -> Dict[str, int]:
+        """Every stored balance, for whole-company reports."""
+        ...
+
+    def set_balance(self, employee_id: str, hours: int) -> None: ...
+
+    def add_request(self, employee_id: str, request: VacationRequest) -> None: ...
+
+    def remove_request(self, employee_id: str, request_id: str) -> Optional[VacationRequest]: ...
+
+    def has_overlap(self, employee_id: str, start_ordinal: int, end_ordinal: int) -> bool: ...
+
+    def approve(self, employee_id: str, decide: Decide) -> int:
+        """Decide against the employee's current state and store the outcome as one write.
+
+        ``decide(balance, has_overlap)`` gets the stored balance and an overlap
+        check on stored requests, and returns the new balance with the requests
+        it approved; both are written together (one transaction or journal
+        record). Returns the new balance. In-process backends rely on the
+        caller holding the employee's lock; SQLite also excludes other processes.
+        """
+        ...
+
+    def refund_request(self, employee_id: str, request_id: str) -> Optional[Tuple[VacationRequest, int]]:
+        """Remove a request and credit its hours back as one write; (request, new balance) or None if not found."""
+        ...
+
+    def booked_ranges(self, employee_ids: List[str]) -> Dict[str, List[Tuple[int, int]]]:
+        """Each employee's non-declined ``(start, end)`` ordinals, one entry per id (empty when none)."""
+        ...
+
+    def existing_request_ids(self, requests: Iterable[Tuple[str, str]]) -> Set[str]:
+        """Ids among ``(employee_id, request_id)`` pairs that are already stored and cannot be added again.
+
+        SQLite ids are unique across employees; the in-memory store keys
+        requests by employee, so only that employee's ids count there.
+        """
+        ...
+
+    def bulk_load(
+        self,
+        balances: Dict[str, int],
+        requests: Iterable[VacationRequest],
+        teams: Optional[Dict[str, Optional[str]]] = None,
+    ) -> None: ...
+
+    def set_team(self, employee_id: str, team: Optional[str]) -> None: ...
+
+    def get_team(self, employee_id: str) -> Optional[str]: ...
+
+    def version(self, employee_id: str) -> int:
+        """Counter bumped by every mutation of the employee's balance, requests or team; 0 if never written."""
+        ...
+
+    def get_accrual_policy(self, employee_id: str) -> Optional[AccrualPolicy]:
+        """The employee's own policy; None when it follows the default."""
+        ...
+
+    def set_accrual_policy(self, employee_id: str, policy: Optional[AccrualPolicy]) -> None: ...
+
+    def accrual_policies(self) -> Dict[str, AccrualPolicy]: ...
+
+    def accrued_through(self) -> Optional[int]:
+        """Ordinal of the day accruals were last posted through; None before the first posting."""
+        ...
+
+    def post_accruals(self, previous: Optional[int], through: int, accrue: Accrue) -> Optional[Dict[str, int]]:
+        """Write the balances ``accrue`` derives from the stored ones and move ``accrued_through`` to ``through``, atomically.
+
+        Returns the changed balances. Does nothing and returns None unless
+        ``accrued_through`` is still ``previous``, so concurrent posters (other
+        workers) credit a month once; no deduction lands between the read
+        ``accrue`` sees and the write.
+        """
+        ...
+
+    def absentees(
+        self, start_ordinal: int, end_ordinal: int, team: Optional[str] = None,
+    ) -> List[Tuple[VacationRequest, Optional[str]]]:
+        """Approved requests overlapping [start, end] with their employee's team, by employee then start date.
+
+        ``team`` restricts the result to that team's members.
+        """
+        ...
+
+    def list_requests(self, employee_id: str) -> List[VacationRequest]: ...
+
+    def page_requests(
+        self,
+        employee_id: str,
+        after_seq: int = 0,
+        limit: int = 100,
+        filters: Optional[RequestFilter] = None,
+    ) -> Tuple[List[VacationRequest], Optional[int]]:
+        """Up to ``limit`` requests in insertion order after cursor ``after_seq``.
+
+        Returns the page and the cursor for the next one (None when exhausted).
+        """
+        ...
+
+    def is_empty(self) -> bool: ...
+
+    def counts(self) -> Tuple[int, int]:
+        """(employees with a balance, stored requests), for metrics."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class EmployeeIntervalIndex:
+    """One employee's booked date ranges, sorted by start ordinal.
+
+    Booked ranges never overlap (``RequestService`` declines overlapping
+    requests), so the ends are sorted as well and an overlap query only has to
+    look at the last range starting on or before the queried end date.
+    ``ids`` holds each request's packed id (raw uuid bytes or the id string).
+    """
+
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self) -> None:
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.ids: List[bytes | str] = []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, start_ordinal: int, end_ordinal: int, request_id: bytes | str) -> None:
+        i = bisect_right(self.starts, start_ordinal)
+        self.starts.insert(i, start_ordinal)
+        self.ends.insert(i, end_ordinal)
+        self.ids.insert(i, request_id)
+
+    def extend(self, entries: List[Tuple[int, int, bytes | str]]) -> None:
+        """Merge many ``(start, end, id)`` entries with one sort instead of per-entry inserts."""
+        merged = sorted([*zip(self.starts, self.ends, self.ids), *entries], key=lambda e: e[0])
+        self.starts = [e[0] for e in merged]
+        self.ends = [e[1] for e in merged]
+        self.ids = [e[2] for e in merged]
+
+    def remove(self, start_ordinal: int, request_id: bytes | str) -> bool:
+        i = bisect_left(self.starts, start_ordinal)
+        while i < len(self.starts) and self.starts[i] == start_ordinal:
+            if self.ids[i] == request_id:
+                del self.starts[i], self.ends[i], self.ids[i]
+                return True
+            i += 1
+        return False
+
+    def overlaps(self, start_ordinal: int, end_ordinal: int) -> bool:
+        i = bisect_right(self.starts, end_ordinal)
+        return i > 0 and self.ends[i - 1] >= start_ordinal
+
+
+class AbsenceIndex:
+    """Approved requests bucketed by calendar day, company-wide and per team.
+
+    ``days[ordinal]`` and ``team_days[(team, ordinal)]`` map each employee out
+    on that day to the request covering it; approved ranges of one employee
+    never overlap, so there is at most one per employee. A query touches only
+    the buckets of the days asked for, so its cost follows the number of
+    absentees rather than the headcount.
+    """
+
+    __slots__ = ("days", "team_days")
+
+    def __init__(self) -> None:
+        self.days: Dict[int, Dict[str, VacationRequest]] = {}
+        self.team_days: Dict[Tuple[str, int], Dict[str, VacationRequest]] = {}
+
+    def add(self, request: VacationRequest, team: Optional[str]) -> None:
+        employee_id = request.employee_id
+        for day in range(request.start_ordinal, request.end_ordinal + 1):
+            self._add(self.days, day, employee_id, request)
+            if team is not None:
+                self._add(self.team_days, (team, day), employee_id, request)
+
+    def remove(self, request: VacationRequest, team: Optional[str]) -> None:
+        employee_id = request.employee_id
+        for day in range(request.start_ordinal, request.end_ordinal + 1):
+            self._remove(self.days, day, employee_id, request)
+            if team is not None:
+                self._remove(self.team_days, (team, day), employee_id, request)
+
+    @staticmethod
+    def _add(buckets: dict, key: object, employee_id: str, request: VacationRequest) -> None:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = {}
+        bucket[employee_id] = request
+
+    @staticmethod
+    def _remove(buckets: dict, key: object, employee_id: str, request: VacationRequest) -> None:
+        bucket = buckets.get(key)
+        if bucket is not None and bucket.get(employee_id) is request:
+            del bucket[employee_id]
+            if not bucket:
+                del buckets[key]
+
+    def query(self, start_ordinal: int, end_ordinal: int, team: Optional[str] = None) -> List[VacationRequest]:
+        """Requests overlapping [start, end], ordered by employee then start date."""
+        if team is None:
+            get, keys = self.days.get, range(start_ordinal, end_ordinal + 1)
+        else:
+            get, keys = self.team_days.get, [(team, day) for day in range(start_ordinal, end_ordinal + 1)]
+        if start_ordinal == end_ordinal:
+            bucket = get(keys[0])
+            # Copy first: writers on other threads may be resizing the bucket
+            return sorted(list(bucket.values()), key=_employee_id) if bucket else []
+        found: Dict[bytes | str, VacationRequest] = {}
+        for key in keys:
+            bucket = get(key)
+            if bucket:
+                for request in list(bucket.values()):
+                    found[request._id] = request
+        return sorted(found.values(), key=_employee_and_start)
+
+
+def _employee_id(request: VacationRequest) -> str:
+    return request.employee_id
+
+
+def _employee_and_start(request: VacationRequest) -> tuple:
+    return request.employee_id, request._start
+
+
+def _is_booked(request: VacationRequest) -> bool:
+    return request._status is not RequestStatus.Declined
+
+
+def _is_absence(request: VacationRequest) -> bool:
+    return request._status is RequestStatus.Approved
 
 
 @dataclass
 class InMemoryStore:
+    blocking = False
+
     employee_id_to_balance: Dict[str, int] = field(default_factory=dict)
     employee_id_to_requests: Dict[str, List[VacationRequest]] = field(default_factory=dict)
+    employee_id_to_index: Dict[str, EmployeeIntervalIndex] = field(default_factory=dict)
+    # Insertion sequence numbers parallel to employee_id_to_requests; page cursors point into these
+    employee_id_to_seqs: Dict[str, List[int]] = field(default_factory=dict)
+    last_request_seq: int = 0
+    employee_id_to_team: Dict[str, str] = field(default_factory=dict)
+    absences: AbsenceIndex = field(default_factory=AbsenceIndex)
+    employee_id_to_version: Dict[str, int] = field(default_factory=dict)
+    # Versions restart with the process, so ETags carry a per-process epoch
+    version_epoch: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    _version_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    employee_id_to_accrual_policy: Dict[str, AccrualPolicy] = field(default_factory=dict)
+    accrued_through_ordinal: Optional[int] = None
+
+    def _bump(self, employee_id: str) -> None:
+        # Not every writer holds the employee's lock (imports, team changes); a lost bump would let a stale ETag match
+        with self._version_lock:
+            versions = self.employee_id_to_version
+            versions[employee_id] = versions.get(employee_id, 0) + 1
+
+    def version(self, employee_id: str) -> int:
+        return self.employee_id_to_version.get(employee_id, 0)
 
     def get_balance(self, employee_id: str) -> int:
         return self.employee_id_to_balance.get(employee_id, 0)
 
+    def get_balances(self, employee_ids: List[str]) -> Dict[str, int]:
+        balances = self.employee_id_to_balance
+        return {e: balances.get(e, 0) for e in employee_ids}
+
+    def all_balances(self) -> Dict[str, int]:
+        return self.employee_id_to_balance.copy()
+
     def set_balance(self, employee_id: str, hours: int) -> None:
         self.employee_id_to_balance[employee_id] = hours
+        self._bump(employee_id)
 
     def add_request(self, employee_id: str, request: VacationRequest) -> None:
         self.employee_id_to_requests.setdefault(employee_id, []).append(request)
+        self._bump(employee_id)
+        self.last_request_seq += 1
+        self.employee_id_to_seqs.setdefault(employee_id, []).append(self.last_request_seq)
+        if _is_booked(request):
+            index = self.employee_id_to_index.get(employee_id)
+            if index is None:
+                index = self.employee_id_to_index[employee_id] = EmployeeIntervalIndex()
+            index.add(request.start_ordinal, request.end_ordinal, request._id)
+        if _is_absence(request):
+            self.absences.add(request, self.employee_id_to_team.get(employee_id))
+
+    def remove_request(self, employee_id: str, request_id: str) -> Optional[VacationRequest]:
+        requests = self.employee_id_to_requests.get(employee_id, [])
+        packed_id = _pack_uuid(request_id)
+        for i, request in enumerate(requests):
+            if request._id == packed_id:
+                del requests[i]
+                del self.employee_id_to_seqs[employee_id][i]
+                self._bump(employee_id)
+                index = self.employee_id_to_index.get(employee_id)
+                if index is not None and _is_booked(request):
+                    index.remove(request.start_ordinal, packed_id)
+                if _is_absence(request):
+                    self.absences.remove(request, self.employee_id_to_team.get(employee_id))
+                return request
+        return None
+
+    def has_overlap(self, employee_id: str, start_ordinal: int, end_ordinal: int) -> bool:
+        index = self.employee_id_to_index.get(employee_id)
+        return index is not None and index.overlaps(start_ordinal, end_ordinal)
+
+    def approve(self, employee_id: str, decide: Decide) -> int:
+        index = self.employee_id_to_index.get(employee_id)
+        balance, approved = decide(
+            self.employee_id_to_balance.get(employee_id, 0),
+            lambda start, end: index is not None and index.overlaps(start, end),
+        )
+        if approved:
+            # Through bulk_load so a journal writes the balance and requests as one record
+            self.bulk_load({employee_id: balance}, approved)
+        return balance
+
+    def refund_request(self, employee_id: str, request_id: str) -> Optional[Tuple[VacationRequest, int]]:
+        request = InMemoryStore.remove_request(self, employee_id, request_id)
+        if request is None:
+            return None
+        balance = self.employee_id_to_balance.get(employee_id, 0) + request.total_hours
+        self.employee_id_to_balance[employee_id] = balance
+        return request, balance
+
+    def booked_ranges(self, employee_ids: List[str]) -> Dict[str, List[Tuple[int, int]]]:
+        ranges: Dict[str, List[Tuple[int, int]]] = {}
+        for employee_id in employee_ids:
+            index = self.employee_id_to_index.get(employee_id)
+            ranges[employee_id] = list(zip(index.starts, index.ends)) if index is not None else []
+        return ranges
+
+    def existing_request_ids(self, requests: Iterable[Tuple[str, str]]) -> Set[str]:
+        stored: Dict[str, set] = {}
+        existing = set()
+        for employee_id, request_id in requests:
+            ids = stored.get(employee_id)
+            if ids is None:
+                ids = stored[employee_id] = {r._id for r in self.employee_id_to_requests.get(employee_id, ())}
+            if _pack_uuid(request_id) in ids:
+                existing.add(request_id)
+        return existing
+
+    def bulk_load(
+        self,
+        balances: Dict[str, int],
+        requests: Iterable[VacationRequest],
+        teams: Optional[Dict[str, Optional[str]]] = None,
+    ) -> None:
+        """Load imported data, building each touched employee's index with one sort."""
+        self.employee_id_to_balance.update(balances)
+        touched = set(balances)
+        for employee_id, team in (teams or {}).items():
+            self._assign_team(employee_id, team)
+        booked: Dict[str, List[Tuple[int, int, bytes | str]]] = {}
+        employee_id_to_team = self.employee_id_to_team
+        for request in requests:
+            employee_id = request.employee_id
+            touched.add(employee_id)
+            self.employee_id_to_requests.setdefault(employee_id, []).append(request)
+            self.last_request_seq += 1
+            self.employee_id_to_seqs.setdefault(employee_id, []).append(self.last_request_seq)
+            if _is_booked(request):
+                booked.setdefault(employee_id, []).append((request.start_ordinal, request.end_ordinal, request._id))
+            if _is_absence(request):
+                self.absences.add(request, employee_id_to_team.get(employee_id))
+        for employee_id, entries in booked.items():
+            index = self.employee_id_to_index.get(employee_id)
+            if index is None:
+                index = self.employee_id_to_index[employee_id] = EmployeeIntervalIndex()
+            index.extend(entries)
+        # One bump per employee, whatever the number of rows
+        for employee_id in touched:
+            self._bump(employee_id)
+
+    def set_team(self, employee_id: str, team: Optional[str]) -> None:
+        self._assign_team(employee_id, team)
+
+    def _assign_team(self, employee_id: str, team: Optional[str]) -> None:
+        """Assign ``employee_id`` to ``team`` (None removes it), moving its absences to the team's buckets."""
+        old = self.employee_id_to_team.get(employee_id)
+        if team == old:
+            return
+        for request in self.employee_id_to_requests.get(employee_id, []):
+            if _is_absence(request):
+                self.absences.remove(request, old)
+                self.absences.add(request, team)
+        if team is None:
+            del self.employee_id_to_team[employee_id]
+        else:
+            self.employee_id_to_team[employee_id] = sys.intern(team)
+        self._bump(employee_id)
+
+    def get_team(self, employee_id: str) -> Optional[str]:
+        return self.employee_id_to_team.get(employee_id)
+
+    def get_accrual_policy(self, employee_id: str) -> Optional[AccrualPolicy]:
+        return self.employee_id_to_accrual_policy.get(employee_id)
+
+    def set_accrual_policy(self, employee_id: str, policy: Optional[AccrualPolicy]) -> None:
+        if policy is None:
+            self.employee_id_to_accrual_policy.pop(employee_id, None)
+        else:
+            self.employee_id_to_accrual_policy[employee_id] = policy
+
+    def accrual_policies(self) -> Dict[str, AccrualPolicy]:
+        return self.employee_id_to_accrual_policy.copy()
+
+    def accrued_through(self) -> Optional[int]:
+        return self.accrued_through_ordinal
+
+    def post_accruals(self, previous: Optional[int], through: int, accrue: Accrue) -> Optional[Dict[str, int]]:
+        if self.accrued_through_ordinal != previous:
+            return None
+        balances = accrue(dict(self.employee_id_to_balance))
+        self.employee_id_to_balance.update(balances)
+        for employee_id in balances:
+            self._bump(employee_id)
+        self.accrued_through_ordinal = through
+        return balances
+
+    def absentees(
+        self, start_ordinal: int, end_ordinal: int, team: Optional[str] = None,
+    ) -> List[Tuple[VacationRequest, Optional[str]]]:
+        requests = self.absences.query(start_ordinal, end_ordinal, team)
+        if team is not None:
+            return [(r, team) for r in requests]
+        teams = self.employee_id_to_team
+        return [(r, teams.get(r.employee_id)) for r in requests]
 
     def list_requests(self, employee_id: str) -> List[VacationRequest]:
         return list(self.employee_id_to_requests.get(employee_id, []))
 
+    def page_requests(
+        self,
+        employee_id: str,
+        after_seq: int = 0,
+        limit: int = 100,
+        filters: Optional[RequestFilter] = None,
+    ) -> Tuple[List[VacationRequest], Optional[int]]:
+        requests = self.employee_id_to_requests.get(employee_id)
+        if not requests:
+            return [], None
+        seqs = self.employee_id_to_seqs[employee_id]
+        page: List[VacationRequest] = []
+        for i in range(bisect_right(seqs, after_seq), len(requests)):
+            request = requests[i]
+            if filters is None or filters.matches(request):
+                if len(page) == limit:
+                    return page, seqs[i - 1]
+                page.append(request)
+        return page, None
+
+    def is_empty(self) -> bool:
+        return not self.employee_id_to_balance and not self.employee_id_to_requests
+
+    def counts(self) -> Tuple[int, int]:
+        return len(self.employee_id_to_balance), sum(len(r) for r in list(self.employee_id_to_requests.values()))
+
+    def close(self) -> None:
+        pass
+
+
+def create_store(backend: Optional[str] = None, path: Optional[str] = None) -> Store:
+    """Build the store selected by ``STORE_BACKEND`` (``memory``, ``journal`` or ``sqlite``)."""
+    backend = (backend or os.getenv(STORE_BACKEND_ENV) or "memory").strip().lower()
+    if backend == "memory":
+        return InMemoryStore()
+    if backend == "journal":
+        from src.lib.journal import JournaledStore
+
+        return JournaledStore(
+            path or os.getenv(STORE_PATH_ENV) or "data",
+            snapshot_interval=float(os.getenv(STORE_SNAPSHOT_INTERVAL_ENV) or 300),
+        )
+    if backend == "sqlite":
+        from src.lib.sqlite_store import SQLiteStore
+
+        return SQLiteStore(path or os.getenv(STORE_PATH_ENV) or "vacation.db")
+    raise ValueError(f"Unknown store backend: {backend}")
+
 
-store = InMemoryStore()
+store: Store = create_store()
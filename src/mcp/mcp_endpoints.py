@@ -1,132 +1,124 @@
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Request, Body
-from src.mcp.tools import check_vacation_balance, request_vacation, list_vacation_requests
-from datetime import date, timedelta
+import time
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Request, Body, Response
+from fastapi.responses import StreamingResponse
+from pydantic_core import from_json
+from src.lib.etag import etag_matches
+from src.lib.logging import log_body, log_event
+from src.lib.metrics import mcp_tool_duration
+from src.lib.serialization import FastJSONResponse
+from src.middleware.rate_limit import check_employee_rate_limit, rate_limit_mcp_client
+from src.mcp.registry import UnknownToolError, tool_registry
+from src.mcp.sessions import (
+    SERVER_STREAM,
+    SESSION_HEADER,
+    SSE_KEEPALIVE_SECONDS,
+    SSE_MEDIA_TYPE,
+    replay_stream,
+    server_stream,
+    session_manager,
+)
 
 logger = logging.getLogger("vacationmcp")
 
 # Create MCP router
-mcp_router = APIRouter(prefix="/mcp", tags=["MCP"])
-
-# MCP tools registry (stored in OpenAI Function Calling format compatible structure)
-MCP_TOOLS = [
-    {
-        "name": "check_vacation_balance",
-        "description": "Check available vacation hours for an employee (0-120 hours). Returns the number of hours available.",
-        "inputSchema": {
-            "type": "object",
-            "properties": {
-                "employee_id": {
-                    "type": "string",
-                    "description": "Employee identifier (e.g., 'alice', 'bob')"
-                }
-            },
-            "required": ["employee_id"]
-        }
-    },
-    {
-        "name": "request_vacation",
-        "description": "Request vacation time off. Validates balance and dates. Returns status (Approved/Declined) and reason if declined.",
-        "inputSchema": {
-            "type": "object",
-            "properties": {
-                "employee_id": {
-                    "type": "string",
-                    "description": "Employee identifier"
-                },
-                "start_date": {
-                    "type": "string",
-                    "description": "Start date in ISO format (YYYY-MM-DD), weekdays only"
-                },
-                "end_date": {
-                    "type": "string",
-                    "description": "End date in ISO format (YYYY-MM-DD), weekdays only"
-                }
-            },
-            "required": ["employee_id", "start_date", "end_date"]
-        }
-    },
-    {
-        "name": "list_vacation_requests",
-        "description": "List all vacation requests for an employee. Returns a list of requests with status, dates, and hours.",
-        "inputSchema": {
-            "type": "object",
-            "properties": {
-                "employee_id": {
-                    "type": "string",
-                    "description": "Employee identifier"
-                }
-            },
-            "required": ["employee_id"]
-        }
+mcp_router = APIRouter(prefix="/mcp", tags=["MCP"], dependencies=[Depends(rate_limit_mcp_client)])
+
+# MCP tools registry (stored in OpenAI Function Calling format compatible structure),
+# derived from the shared tool declarations
+MCP_TOOLS = tool_registry.schemas()
+
+
+_JSON_SCHEMA_DIALECT = "https://json-schema.org/draft/2020-12/schema"
+
+
+def _normalized_schema(tool: dict) -> dict:
+    """Copy a tool's inputSchema with the JSON schema keys clients expect."""
+    input_schema = tool["inputSchema"].copy()
+    input_schema.setdefault("$schema", _JSON_SCHEMA_DIALECT)
+    input_schema.setdefault("additionalProperties", False)
+    return input_schema
+
+
+def _build_tools_listing() -> tuple:
+    """Encode the OpenAI Agent Builder tools listing once.
+
+    Only the ``mcpl_`` id differs between responses, so the body is kept as the
+    bytes before and after the id hex, plus a strong ETag over the catalogue.
+    """
+    listing = {
+        "type": "mcp_list_tools",
+        "server_label": "vacation-mcp",
+        "tools": [
+            {
+                "name": tool["name"],
+                "description": tool["description"],
+                "input_schema": _normalized_schema(tool),
+                "annotations": None,
+            }
+            for tool in MCP_TOOLS
+        ],
     }
-]
+    encoded = json.dumps(listing, separators=(",", ":")).encode()
+    prefix = b'{"id":"mcpl_'
+    suffix = b'",' + encoded[1:]
+    etag = '"' + hashlib.sha256(encoded).hexdigest()[:32] + '"'
+    return prefix, suffix, etag
+
+
+_TOOLS_LISTING_PREFIX, _TOOLS_LISTING_SUFFIX, _TOOLS_LISTING_ETAG = _build_tools_listing()
+
+# Tools list in MCP JSON-RPC expected format (inputSchema, annotations object)
+_MCP_TOOLS_RESULT = {
+    "tools": [
+        {
+            "name": tool["name"],
+            "description": tool["description"],
+            "inputSchema": _normalized_schema(tool),
+            "annotations": {},
+        }
+        for tool in MCP_TOOLS
+    ]
+}
 
 
 @mcp_router.get("/tools")
-async def list_tools():
+async def list_tools(request: Request):
     """List available MCP tools in OpenAI Agent Builder format."""
-    return _get_tools_response()
+    return _get_tools_response(request)
 
 @mcp_router.post("/tools")
-async def list_tools_post(request: Optional[dict] = Body(None)):
+async def list_tools_post(request: Request):
     """Handle POST request to list tools (for MCP protocol)."""
-    return _get_tools_response()
+    return _get_tools_response(request)
 
-def _get_tools_response():
-    """Helper function to generate tools response in MCP format."""
-    import uuid
-    
-    # Convert to OpenAI Agent Builder MCP format
-    mcp_tools = []
-    for tool in MCP_TOOLS:
-        # Ensure input_schema has the required JSON schema format
-        input_schema = tool["inputSchema"].copy()
-        if "$schema" not in input_schema:
-            input_schema["$schema"] = "https://json-schema.org/draft/2020-12/schema"
-        if "additionalProperties" not in input_schema:
-            input_schema["additionalProperties"] = False
-        
-        mcp_tools.append({
-            "name": tool["name"],
-            "description": tool["description"],
-            "input_schema": input_schema,
-            "annotations": None
-        })
-    
-    response = {
-        "id": f"mcpl_{uuid.uuid4().hex}",
-        "type": "mcp_list_tools",
-        "server_label": "vacation-mcp",
-        "tools": mcp_tools
-    }
-    logger.info("list_tools called, returning %d tools", len(mcp_tools))
-    return response
+def _get_tools_response(request: Request) -> Response:
+    """Serve the pre-encoded tools listing, or 304 if the client's copy is current."""
+    headers = {"ETag": _TOOLS_LISTING_ETAG}
+    if etag_matches(request.headers.get("if-none-match"), _TOOLS_LISTING_ETAG):
+        return Response(status_code=304, headers=headers)
+    body = _TOOLS_LISTING_PREFIX + uuid.uuid4().hex.encode() + _TOOLS_LISTING_SUFFIX
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 def _get_mcp_tools_result():
-    """Generate tools list in MCP JSON-RPC expected format (inputSchema, annotations object)."""
-    tools = []
-    for tool in MCP_TOOLS:
-        input_schema = tool["inputSchema"].copy()
-        if "$schema" not in input_schema:
-            input_schema["$schema"] = "https://json-schema.org/draft/2020-12/schema"
-        if "additionalProperties" not in input_schema:
-            input_schema["additionalProperties"] = False
-        tools.append({
-            "name": tool["name"],
-            "description": tool["description"],
-            "inputSchema": input_schema,
-            "annotations": {}
-        })
-    return {"tools": tools}
+    """Tools list in MCP JSON-RPC expected format; built once at import."""
+    return _MCP_TOOLS_RESULT
 
 
 @mcp_router.post("/tools/call")
 async def call_tool(request: dict = Body(...)):
     """Handle MCP tool calls."""
-    logger.info("MCP tool call received: %s", request)
+    return FastJSONResponse(await _execute_tool_call(request))
+
+
+async def _execute_tool_call(request: dict) -> dict:
+    """Dispatch one tool call and return the MCP result payload."""
+    log_body(logger, "mcp_tool_call_received", request)
     
     # Handle different MCP request formats
     # Format 1: Direct format { "name": "...", "arguments": {...} }
@@ -158,7 +150,7 @@ async def call_tool(request: dict = Body(...)):
                 or {}
             )
     
-    logger.info("Extracted tool_name=%s, arguments=%s", tool_name, arguments)
+    log_event(logger, "mcp_tool_call_parsed", logging.DEBUG, tool=tool_name, arguments=arguments)
     
     if not tool_name:
         logger.warning("No tool name in request. Full request: %s", request)
@@ -173,131 +165,26 @@ async def call_tool(request: dict = Body(...)):
             "isError": True
         }
     
-    def _iso_from_natural(s: str) -> str:
-        v = (s or "").strip().lower()
-        if not v:
-            return v
-        today = date.today()
-        if v in ("today",):
-            d = today
-        elif v in ("tomorrow",):
-            d = today + timedelta(days=1)
-        else:
-            # assume ISO already
-            return s
-        # if weekend, roll to Monday
-        if d.weekday() == 5:
-            d = d + timedelta(days=2)
-        elif d.weekday() == 6:
-            d = d + timedelta(days=1)
-        return d.isoformat()
+    limited_employee = arguments.get("employee_id") or arguments.get("employeeId")
+    # A non-string id cannot be a limiter key; the tool's argument binding rejects it
+    if limited_employee and isinstance(limited_employee, str):
+        check_employee_rate_limit(limited_employee)
 
+    started = time.perf_counter()
+    outcome = "ok"
     try:
-        if tool_name == "check_vacation_balance":
-            employee_id = arguments.get("employee_id")
-            if not employee_id:
-                raise HTTPException(status_code=400, detail="employee_id is required")
-            
-            hours = check_vacation_balance(employee_id)
-            logger.info("mcp_tool_called tool=check_vacation_balance employee_id=%s hours=%s", employee_id, hours)
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Employee {employee_id} has {hours} hours of vacation available."
-                    }
-                ]
-            }
-        
-        elif tool_name == "request_vacation":
-            employee_id = arguments.get("employee_id") or arguments.get("employeeId")
-            # accept snake_case and camelCase, and single day under "date" or "day"
-            start_date = (
-                arguments.get("start_date")
-                or arguments.get("startDate")
-                or arguments.get("date")
-                or arguments.get("day")
-            )
-            end_date = (
-                arguments.get("end_date")
-                or arguments.get("endDate")
-                or start_date
-            )
-
-            # support natural language like "tomorrow"
-            if start_date:
-                start_date = _iso_from_natural(start_date)
-            if end_date:
-                end_date = _iso_from_natural(end_date)
-            
-            if not all([employee_id, start_date, end_date]):
-                raise HTTPException(
-                    status_code=400,
-                    detail="employee_id, start_date, and end_date are all required"
-                )
-            
-            result = request_vacation(employee_id, start_date, end_date)
-            logger.info(
-                "mcp_tool_called tool=request_vacation employee_id=%s start=%s end=%s status=%s",
-                employee_id, start_date, end_date, result.get("status")
-            )
-            
-            status_text = f"Vacation request {result.get('id', 'created')}: Status is {result['status']}"
-            if result.get("reason"):
-                status_text += f". Reason: {result['reason']}"
-            
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": status_text
-                    }
-                ]
-            }
-        
-        elif tool_name == "list_vacation_requests":
-            employee_id = arguments.get("employee_id")
-            if not employee_id:
-                raise HTTPException(status_code=400, detail="employee_id is required")
-            
-            requests_list = list_vacation_requests(employee_id)
-            logger.info("mcp_tool_called tool=list_vacation_requests employee_id=%s count=%s", employee_id, len(requests_list))
-            
-            if not requests_list:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"No vacation requests found for employee {employee_id}"
-                        }
-                    ]
-                }
-            
-            # Format the response nicely
-            formatted = [f"Vacation requests for {employee_id}:"]
-            for req in requests_list:
-                formatted.append(
-                    f"  - Request {req['id']}: {req['startDate']} to {req['endDate']} "
-                    f"({req['totalDays']} days, {req['totalHours']} hours) - Status: {req['status']}"
-                )
-                if req.get("reason"):
-                    formatted.append(f"    Reason: {req['reason']}")
-            
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": "\n".join(formatted)
-                    }
-                ]
-            }
-        
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown tool: {tool_name}")
-    
+        tool = tool_registry.get(tool_name)
+        bound, text = await tool.call(arguments)
+        log_event(logger, "mcp_tool_called", tool=tool_name, **bound)
+        return {"content": [{"type": "text", "text": text}]}
+    except (UnknownToolError, ValueError) as e:
+        outcome = "invalid"
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
+        outcome = "invalid"
         raise
     except Exception as e:
+        outcome = "error"
         logger.exception("mcp_tool_error tool=%s error=%s", tool_name, str(e))
         return {
             "content": [
@@ -308,49 +195,117 @@ async def call_tool(request: dict = Body(...)):
             ],
             "isError": True
         }
+    finally:
+        # Unknown names share one label to keep metric cardinality bounded
+        label = tool_name if tool_name in tool_registry else "unknown"
+        mcp_tool_duration.observe(time.perf_counter() - started, label, outcome)
 
 
 @mcp_router.get("/")
-async def mcp_root():
-    """MCP root endpoint - return tools list in OpenAI Agent Builder format."""
-    import uuid
-    
-    # Convert to OpenAI Agent Builder MCP format
-    mcp_tools = []
-    for tool in MCP_TOOLS:
-        # Ensure input_schema has the required JSON schema format
-        input_schema = tool["inputSchema"].copy()
-        if "$schema" not in input_schema:
-            input_schema["$schema"] = "https://json-schema.org/draft/2020-12/schema"
-        if "additionalProperties" not in input_schema:
-            input_schema["additionalProperties"] = False
-        
-        mcp_tools.append({
-            "name": tool["name"],
-            "description": tool["description"],
-            "input_schema": input_schema,
-            "annotations": None
-        })
-    
-    logger.info("mcp_root endpoint called, returning %d tools", len(mcp_tools))
-    return {
-        "id": f"mcpl_{uuid.uuid4().hex}",
-        "type": "mcp_list_tools",
-        "server_label": "vacation-mcp",
-        "tools": mcp_tools
-    }
+async def mcp_root(request: Request):
+    """MCP root endpoint - return tools list in OpenAI Agent Builder format.
+
+    Clients accepting ``text/event-stream`` instead get the session's
+    server-to-client SSE stream (streamable HTTP transport).
+    """
+    if SSE_MEDIA_TYPE in request.headers.get("accept", ""):
+        return _open_server_stream(request)
+    return _get_tools_response(request)
 
 # Support non-slash path to avoid redirects from "/mcp" -> "/mcp/"
 @mcp_router.get("")
-async def mcp_root_noslash():
-    return await mcp_root()
+async def mcp_root_noslash(request: Request):
+    return await mcp_root(request)
 
 @mcp_router.post("/")
 async def mcp_root_post(request: Request):
     """Handle POST /mcp/ - execute tool calls or handle MCP protocol messages."""
+    session = None
+    session_id = request.headers.get(SESSION_HEADER)
+    if session_id:
+        session = session_manager.get(session_id)
+        if session is None:
+            return _session_not_found()
+    result = await _handle_root_post(request)
+    if isinstance(result, Response):
+        return result
+    if session is not None and SSE_MEDIA_TYPE in request.headers.get("accept", ""):
+        # Answer on an SSE stream whose events the session keeps for resumption
+        messages = result if isinstance(result, list) else [result]
+        events = session.record(session.new_stream(), messages)
+        return StreamingResponse(replay_stream(events), media_type=SSE_MEDIA_TYPE, headers=_SSE_HEADERS)
+    return FastJSONResponse(result)
+
+
+@mcp_router.delete("/")
+async def mcp_root_delete(request: Request):
+    """End a streamable HTTP session."""
+    session_id = request.headers.get(SESSION_HEADER)
+    if not session_id:
+        raise HTTPException(status_code=400, detail=f"Missing {SESSION_HEADER} header")
+    if not session_manager.delete(session_id):
+        return _session_not_found()
+    logger.info("mcp_session_closed sessions=%s", len(session_manager))
+    return Response(status_code=204)
+
+
+@mcp_router.delete("")
+async def mcp_root_delete_noslash(request: Request):
+    return await mcp_root_delete(request)
+
+
+_SUPPORTED_PROTOCOL_VERSIONS = ("2025-03-26", "2024-11-05")
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _initialize_result(params: dict) -> dict:
+    # Echo the client's protocol version when we speak it, else offer our oldest
+    requested = (params or {}).get("protocolVersion")
+    version = requested if requested in _SUPPORTED_PROTOCOL_VERSIONS else _SUPPORTED_PROTOCOL_VERSIONS[-1]
+    return {
+        "protocolVersion": version,
+        "serverInfo": {"name": "vacation-mcp", "version": "1.0.0"},
+        "capabilities": {"tools": {}},
+    }
+
+
+def _session_not_found() -> Response:
+    return FastJSONResponse(
+        {"jsonrpc": "2.0", "id": None, "error": {"code": -32001, "message": "Session not found"}},
+        status_code=404,
+    )
+
+
+def _open_server_stream(request: Request) -> Response:
+    session_id = request.headers.get(SESSION_HEADER)
+    if not session_id:
+        raise HTTPException(status_code=400, detail=f"Missing {SESSION_HEADER} header")
+    session = session_manager.get(session_id)
+    if session is None:
+        return _session_not_found()
+    last_event_id = 0
+    raw_last = request.headers.get("last-event-id")
+    if raw_last:
+        try:
+            last_event_id = int(raw_last)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+        stream = session.stream_of(last_event_id)
+        if stream is not None and stream != SERVER_STREAM:
+            # Resuming an interrupted POST response stream: replay what followed, then end
+            events = session.events_after(stream, last_event_id)
+            return StreamingResponse(replay_stream(events), media_type=SSE_MEDIA_TYPE, headers=_SSE_HEADERS)
+    return StreamingResponse(
+        server_stream(session, last_event_id, SSE_KEEPALIVE_SECONDS),
+        media_type=SSE_MEDIA_TYPE,
+        headers=_SSE_HEADERS,
+    )
+
+
+async def _handle_root_post(request: Request):
     try:
         # Parse JSON body, handling empty body gracefully
-        body = await request.json()
+        body = from_json(await request.body())
     except Exception as e:
         # If no body or invalid JSON, return tools list (common for connection tests)
         logger.info("mcp_root_post called with empty/invalid body: %s", str(e))
@@ -360,28 +315,60 @@ async def mcp_root_post(request: Request):
             "error": {"code": -32700, "message": "Parse error"}
         }
     
-    logger.info("mcp_root_post called with request: %s", body)
-    
+    log_body(logger, "mcp_root_post_received", body)
+
+    if isinstance(body, list):
+        if not body:
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+        responses = await _handle_rpc_batch(body)
+        if not responses:
+            # Batch of notifications only: nothing to return
+            return Response(status_code=202)
+        return responses
+
     # Use the parsed body
     request_data = body if body else {}
     
     # If empty body, invalid request
-    if not request_data:
+    if not request_data or not isinstance(request_data, dict):
         return {
             "jsonrpc": "2.0",
             "error": {"code": -32600, "message": "Invalid Request"}
         }
-    
+
+    method = request_data.get("method")
+    if method == "initialize":
+        session = session_manager.create()
+        logger.info("mcp_session_created sessions=%s", len(session_manager))
+        return FastJSONResponse(
+            {"jsonrpc": "2.0", "id": request_data.get("id"), "result": _initialize_result(request_data.get("params"))},
+            headers={SESSION_HEADER: session.id},
+        )
+    if "id" not in request_data and isinstance(method, str) and method.startswith("notifications/"):
+        # Client notifications (e.g. notifications/initialized) need no reply
+        return Response(status_code=202)
+
+    return await _handle_rpc_message(request_data)
+
+
+async def _handle_rpc_message(request_data: dict) -> dict:
+    """Execute one JSON-RPC message; HTTP errors from tool dispatch propagate."""
     req_id = request_data.get("id")
     method = request_data.get("method")
 
     # Check if this is an MCP protocol initialization or other message
     if method:
         params = request_data.get("params", {})
-        
+        if params is None:
+            params = {}
+        if not isinstance(params, dict) or (
+            method == "tools/call" and not isinstance(params.get("arguments", {}), dict)
+        ):
+            return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32602, "message": "Invalid params"}}
+
         # Handle MCP protocol methods
         if method == "tools/call":
-            result = await call_tool({"name": params.get("name"), "arguments": params.get("arguments", {})})
+            result = await _execute_tool_call({"name": params.get("name"), "arguments": params.get("arguments", {})})
             return {"jsonrpc": "2.0", "id": req_id, "result": result}
         elif method == "tools/list":
             # Return tools list in MCP JSON-RPC expected format
@@ -389,15 +376,7 @@ async def mcp_root_post(request: Request):
             return {"jsonrpc": "2.0", "id": req_id, "result": tools_result}
         elif method == "initialize":
             # MCP initialization - return server capabilities
-            return {
-                "jsonrpc": "2.0",
-                "id": req_id,
-                "result": {
-                    "protocolVersion": "2024-11-05",
-                    "serverInfo": {"name": "vacation-mcp", "version": "1.0.0"},
-                    "capabilities": {"tools": {}}
-                }
-            }
+            return {"jsonrpc": "2.0", "id": req_id, "result": _initialize_result(params)}
         else:
             logger.warning("Unknown MCP method: %s", method)
             return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32601, "message": f"Method not found: {method}"}}
@@ -405,6 +384,58 @@ async def mcp_root_post(request: Request):
     # If no method field, invalid JSON-RPC request
     return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32600, "message": "Invalid Request"}}
 
+
+def _batch_group_key(position: int, message) -> tuple:
+    """Calls for the same employee share a key and run in order; everything else runs alone."""
+    if isinstance(message, dict) and message.get("method") == "tools/call":
+        params = message.get("params")
+        arguments = params.get("arguments") if isinstance(params, dict) else None
+        if isinstance(arguments, dict):
+            employee_id = arguments.get("employee_id") or arguments.get("employeeId")
+            if employee_id and isinstance(employee_id, str):
+                return ("employee", employee_id)
+    # Malformed entries run alone and get their own error response
+    return ("entry", position)
+
+
+async def _handle_rpc_batch_entry(message) -> dict:
+    if not isinstance(message, dict) or not message:
+        return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+    try:
+        return await _handle_rpc_message(message)
+    except HTTPException as e:
+        # Argument problems are invalid params; anything else (e.g. 429) is a server error
+        code = -32602 if e.status_code == 400 else -32000
+        return {"jsonrpc": "2.0", "id": message.get("id"), "error": {"code": code, "message": str(e.detail)}}
+    except Exception:
+        # One broken entry must not fail the rest of the batch
+        logger.exception("mcp_batch_entry_failed id=%s", message.get("id"))
+        return {"jsonrpc": "2.0", "id": message.get("id"), "error": {"code": -32603, "message": "Internal error"}}
+
+
+async def _handle_rpc_batch(messages: list) -> list:
+    """Run a JSON-RPC batch: groups run concurrently, entries within a group in order.
+
+    Responses keep the request order; notifications (entries without an id) get none.
+    """
+    groups: dict = {}
+    for position, message in enumerate(messages):
+        groups.setdefault(_batch_group_key(position, message), []).append(position)
+
+    results: list = [None] * len(messages)
+
+    async def run_group(positions: list) -> None:
+        for position in positions:
+            results[position] = await _handle_rpc_batch_entry(messages[position])
+
+    await asyncio.gather(*(run_group(positions) for positions in groups.values()))
+    logger.info("mcp_batch_handled entries=%d groups=%d", len(messages), len(groups))
+    return [
+        result
+        for message, result in zip(messages, results)
+        if not (isinstance(message, dict) and message and "id" not in message)
+    ]
+
 # Support non-slash path to avoid redirects from "/mcp" -> "/mcp/"
 @mcp_router.post("")
 async def mcp_root_post_noslash(request: Request):
@@ -0,0 +1,355 @@
+"""Declarative MCP tool registry shared by the FastAPI /mcp routes and the FastMCP server.
+
+Each tool is declared once: its handler, parameters (JSON schema fragment,
+accepted aliases, defaults, normalizer) and the formatter that turns the
+handler's result into tool output text. Argument lookup plans are compiled
+when a tool is registered, so a call is one dict lookup for the tool plus
+one pass over its declared parameters, whatever the number of tools.
+"""
+from __future__ import annotations
+import inspect
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Annotated, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import Field
+
+from src.mcp.tools import (
+    DEFAULT_TOOL_PAGE_SIZE,
+    check_vacation_balance_async,
+    format_absences,
+    format_requests_page,
+    list_vacation_requests_page_async,
+    projected_balance_async,
+    request_vacation_async,
+    who_is_out_async,
+)
+
+_PYTHON_TYPES = {"string": str, "integer": int}
+
+
+class UnknownToolError(LookupError):
+    pass
+
+
+class ToolArgumentError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ToolParam:
+    name: str
+    schema: Dict[str, Any]
+    required: bool = False
+    # Other argument names clients use for this parameter, tried in order after ``name``
+    aliases: Tuple[str, ...] = ()
+    # Parameter whose (normalized) value fills this one when it is absent
+    default_from: Optional[str] = None
+    normalize: Optional[Callable[[Any], Any]] = None
+
+
+@dataclass(frozen=True)
+class Tool:
+    name: str
+    description: str
+    params: Tuple[ToolParam, ...]
+    handler: Callable[..., Any]
+    # (bound arguments, handler result) -> tool output text
+    formatter: Callable[[Dict[str, Any], Any], str]
+    is_async: bool = field(init=False)
+    _plan: Tuple[Tuple[str, Tuple[str, ...], Optional[str], Optional[Callable[[Any], Any]]], ...] = field(
+        init=False, repr=False,
+    )
+    _required: Tuple[str, ...] = field(init=False, repr=False)
+    _strings: frozenset = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "is_async", inspect.iscoroutinefunction(self.handler))
+        object.__setattr__(self, "_plan", tuple(
+            (p.name, (p.name, *p.aliases), p.default_from, p.normalize) for p in self.params
+        ))
+        object.__setattr__(self, "_required", tuple(p.name for p in self.params if p.required))
+        object.__setattr__(self, "_strings", frozenset(p.name for p in self.params if p.schema.get("type") == "string"))
+
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {p.name: p.schema for p in self.params},
+            "required": [p.name for p in self.params if p.required],
+        }
+
+    def bind(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Map raw client arguments onto the declared parameters.
+
+        ToolArgumentError if any required are missing or a string parameter gets another type.
+        """
+        bound: Dict[str, Any] = {}
+        for name, keys, default_from, normalize in self._plan:
+            value = None
+            for key in keys:
+                value = arguments.get(key)
+                if value:
+                    break
+            if value and name in self._strings and not isinstance(value, str):
+                raise ToolArgumentError(f"{name} must be a string")
+            if not value and default_from is not None:
+                value = bound.get(default_from)
+            elif value and normalize is not None:
+                value = normalize(value)
+            if value is not None and value != "":
+                bound[name] = value
+        missing = [name for name in self._required if name not in bound]
+        if missing:
+            if len(missing) == 1:
+                raise ToolArgumentError(f"{missing[0]} is required")
+            raise ToolArgumentError(f"{', '.join(missing[:-1])}, and {missing[-1]} are all required")
+        return bound
+
+    async def call(self, arguments: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """Bind, run the handler and format; returns (bound arguments, output text)."""
+        bound = self.bind(arguments)
+        result = self.handler(**bound)
+        if self.is_async:
+            result = await result
+        return bound, self.formatter(bound, result)
+
+    def as_function(self) -> Callable[..., Any]:
+        """An async function with this tool's typed signature, for FastMCP's ``add_tool``."""
+        parameters = []
+        for p in self.params:
+            annotation = _PYTHON_TYPES.get(p.schema.get("type"), Any)
+            if not p.required:
+                annotation = Optional[annotation]
+            annotation = Annotated[annotation, Field(description=p.schema.get("description"))]
+            if p.required:
+                parameters.append(inspect.Parameter(p.name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation))
+            else:
+                parameters.append(inspect.Parameter(
+                    p.name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation, default=None,
+                ))
+
+        async def run(**arguments: Any) -> str:
+            _, text = await self.call({k: v for k, v in arguments.items() if v is not None})
+            return text
+
+        run.__name__ = self.name
+        run.__doc__ = self.description
+        run.__signature__ = inspect.Signature(parameters, return_annotation=str)  # type: ignore[attr-defined]
+        return run
+
+
+class ToolRegistry:
+    def __init__(self) -> None:
+        self._tools: Dict[str, Tool] = {}
+
+    def register(self, tool: Tool) -> Tool:
+        if tool.name in self._tools:
+            raise ValueError(f"Tool already registered: {tool.name}")
+        self._tools[tool.name] = tool
+        return tool
+
+    def __iter__(self) -> Iterator[Tool]:
+        return iter(self._tools.values())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._tools
+
+    def get(self, name: str) -> Tool:
+        try:
+            return self._tools[name]
+        except KeyError:
+            raise UnknownToolError(f"Unknown tool: {name}") from None
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        """Tool declarations as ``{name, description, inputSchema}`` dicts."""
+        return [{"name": t.name, "description": t.description, "inputSchema": t.input_schema} for t in self]
+
+
+def iso_from_natural(value: str) -> str:
+    """Resolve "today"/"tomorrow" to an ISO date, rolled forward off weekends; other values pass through."""
+    v = (value or "").strip().lower()
+    if not v:
+        return v
+    today = date.today()
+    if v == "today":
+        d = today
+    elif v == "tomorrow":
+        d = today + timedelta(days=1)
+    else:
+        # assume ISO already
+        return value
+    # if weekend, roll to Monday
+    if d.weekday() == 5:
+        d = d + timedelta(days=2)
+    elif d.weekday() == 6:
+        d = d + timedelta(days=1)
+    return d.isoformat()
+
+
+def _format_balance(args: Dict[str, Any], hours: int) -> str:
+    return f"Employee {args['employee_id']} has {hours} hours of vacation available."
+
+
+def _format_projection(args: Dict[str, Any], result: Dict[str, Any]) -> str:
+    return (
+        f"Employee {args['employee_id']} is projected to have {result['projectedHours']:g} hours of vacation "
+        f"available on {args['as_of_date']} ({result['hoursAvailable']} hours available now)."
+    )
+
+
+def _format_request_result(args: Dict[str, Any], result: Dict[str, Any]) -> str:
+    text = f"Vacation request {result.get('id', 'created')}: Status is {result['status']}"
+    if result.get("reason"):
+        text += f". Reason: {result['reason']}"
+    if result.get("replayed"):
+        text += " (result of an earlier call with the same idempotency_key)"
+    return text
+
+
+def _format_page(args: Dict[str, Any], page: Dict[str, Any]) -> str:
+    return format_requests_page(args["employee_id"], page)
+
+
+def _format_absences(args: Dict[str, Any], absences: List[Dict[str, Any]]) -> str:
+    return format_absences(args["start_date"], args["end_date"], args.get("team"), absences)
+
+
+async def _list_page(employee_id: str, limit: int = DEFAULT_TOOL_PAGE_SIZE, **filters: Any) -> Dict[str, Any]:
+    return await list_vacation_requests_page_async(employee_id, limit=limit, **filters)
+
+
+_EMPLOYEE_ID = ToolParam(
+    "employee_id", {"type": "string", "description": "Employee identifier"}, required=True, aliases=("employeeId",),
+)
+
+tool_registry = ToolRegistry()
+
+tool_registry.register(Tool(
+    name="check_vacation_balance",
+    description="Check available vacation hours for an employee (0-120 hours). Returns the number of hours available.",
+    params=(
+        ToolParam(
+            "employee_id",
+            {"type": "string", "description": "Employee identifier (e.g., 'alice', 'bob')"},
+            required=True,
+            aliases=("employeeId",),
+        ),
+    ),
+    handler=check_vacation_balance_async,
+    formatter=_format_balance,
+))
+
+tool_registry.register(Tool(
+    name="request_vacation",
+    description="Request vacation time off. Validates balance and dates. Returns status (Approved/Declined) and reason if declined.",
+    params=(
+        _EMPLOYEE_ID,
+        ToolParam(
+            "start_date",
+            {"type": "string", "description": "Start date in ISO format (YYYY-MM-DD), weekdays only"},
+            required=True,
+            aliases=("startDate", "date", "day"),
+            normalize=iso_from_natural,
+        ),
+        ToolParam(
+            "end_date",
+            {"type": "string", "description": "End date in ISO format (YYYY-MM-DD), weekdays only"},
+            required=True,
+            aliases=("endDate",),
+            default_from="start_date",
+            normalize=iso_from_natural,
+        ),
+        ToolParam(
+            "idempotency_key",
+            {
+                "type": "string",
+                "maxLength": 255,
+                "description": "Optional unique key for this request; retrying with the same key returns the original result",
+            },
+            aliases=("idempotencyKey",),
+        ),
+    ),
+    handler=request_vacation_async,
+    formatter=_format_request_result,
+))
+
+tool_registry.register(Tool(
+    name="list_vacation_requests",
+    description=(
+        "List vacation requests for an employee, oldest first, one page at a time. "
+        "Returns requests with status, dates, and hours, plus a cursor when more pages exist."
+    ),
+    params=(
+        _EMPLOYEE_ID,
+        ToolParam(
+            "limit",
+            {"type": "integer", "minimum": 1, "maximum": 1000, "description": "Maximum requests to return (default 50)"},
+            normalize=int,
+        ),
+        ToolParam("cursor", {"type": "string", "description": "Cursor from a previous call to fetch the next page"}),
+        ToolParam(
+            "from_date",
+            {"type": "string", "description": "Only requests ending on or after this ISO date (YYYY-MM-DD)"},
+            aliases=("fromDate",),
+        ),
+        ToolParam(
+            "to_date",
+            {"type": "string", "description": "Only requests starting on or before this ISO date (YYYY-MM-DD)"},
+            aliases=("toDate",),
+        ),
+        ToolParam(
+            "status",
+            {"type": "string", "enum": ["Pending", "Approved", "Declined"], "description": "Only requests with this status"},
+        ),
+    ),
+    handler=_list_page,
+    formatter=_format_page,
+))
+
+tool_registry.register(Tool(
+    name="who_is_out",
+    description=(
+        "List employees with approved vacation on a date or in a date range, optionally for one team. "
+        "Use it to check team coverage before approving or planning time off."
+    ),
+    params=(
+        ToolParam(
+            "start_date",
+            {"type": "string", "description": "Date, or first day of the range, in ISO format (YYYY-MM-DD)"},
+            required=True,
+            aliases=("startDate", "date", "from_date", "fromDate"),
+            normalize=iso_from_natural,
+        ),
+        ToolParam(
+            "end_date",
+            {"type": "string", "description": "Last day of the range in ISO format (YYYY-MM-DD); defaults to start_date"},
+            aliases=("endDate", "to_date", "toDate"),
+            default_from="start_date",
+            normalize=iso_from_natural,
+        ),
+        ToolParam("team", {"type": "string", "description": "Only members of this team or group"}, aliases=("group",)),
+    ),
+    handler=who_is_out_async,
+    formatter=_format_absences,
+))
+
+tool_registry.register(Tool(
+    name="projected_balance",
+    description=(
+        "Project an employee's vacation balance on a future date, including monthly accrual, "
+        "the accrual cap and year-end carry-over limits."
+    ),
+    params=(
+        _EMPLOYEE_ID,
+        ToolParam(
+            "as_of_date",
+            {"type": "string", "description": "Future date in ISO format (YYYY-MM-DD)"},
+            required=True,
+            aliases=("asOfDate", "as_of", "asOf", "date"),
+            normalize=iso_from_natural,
+        ),
+    ),
+    handler=projected_balance_async,
+    formatter=_format_projection,
+))
@@ -0,0 +1,206 @@
+"""Sessions and server-sent event streams for the MCP streamable HTTP transport.
+
+A session is created by ``initialize`` and named by the ``Mcp-Session-Id``
+header on later requests. Each session numbers every SSE event it emits
+on POST response streams and keeps the most recent ones, so a client that
+reconnects with ``Last-Event-ID`` gets the responses it missed. Sessions idle
+longer than the TTL are dropped, and the least recently used session is
+evicted beyond ``max_sessions``.
+
+The server sends no requests or notifications of its own, so the standalone
+GET stream only carries keep-alive comments until the session ends.
+"""
+from __future__ import annotations
+import asyncio
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Iterable, List, Optional, Tuple
+
+from src.lib.serialization import dumps
+
+SESSION_HEADER = "Mcp-Session-Id"
+SSE_MEDIA_TYPE = "text/event-stream"
+# Stream id of the standalone GET stream; POST streams are "post-<n>"
+SERVER_STREAM = "server"
+
+MCP_SESSION_TTL_ENV = "MCP_SESSION_TTL_SECONDS"
+MCP_MAX_SESSIONS_ENV = "MCP_MAX_SESSIONS"
+MCP_SSE_KEEPALIVE_ENV = "MCP_SSE_KEEPALIVE_SECONDS"
+MCP_SSE_HISTORY_ENV = "MCP_SSE_HISTORY"
+
+_KEEPALIVE = b": keep-alive\n\n"
+
+
+def format_event(event_id: int, payload: bytes) -> bytes:
+    return b"id: %d\nevent: message\ndata: %s\n\n" % (event_id, payload)
+
+
+class Session:
+    def __init__(self, session_id: str, history: int) -> None:
+        self.id = session_id
+        self.last_seen = time.monotonic()
+        self.closed = False
+        self._lock = threading.Lock()
+        self._next_event_id = 1
+        self._next_stream = 1
+        # (event id, stream id, encoded message)
+        self._events: Deque[Tuple[int, str, bytes]] = deque(maxlen=history)
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def touch(self) -> None:
+        self.last_seen = time.monotonic()
+
+    def new_stream(self) -> str:
+        with self._lock:
+            stream = f"post-{self._next_stream}"
+            self._next_stream += 1
+        return stream
+
+    def record(self, stream: str, messages: Iterable[dict]) -> List[Tuple[int, bytes]]:
+        """Number and keep ``messages`` for ``stream``; wakes GET-stream readers."""
+        recorded = []
+        with self._lock:
+            for message in messages:
+                event_id = self._next_event_id
+                self._next_event_id += 1
+                payload = dumps(message)
+                self._events.append((event_id, stream, payload))
+                recorded.append((event_id, payload))
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        return recorded
+
+    def stream_of(self, event_id: int) -> Optional[str]:
+        with self._lock:
+            for eid, stream, _ in self._events:
+                if eid == event_id:
+                    return stream
+        return None
+
+    def events_after(self, stream: str, event_id: int) -> List[Tuple[int, bytes]]:
+        with self._lock:
+            return self._events_after(stream, event_id)
+
+    def _events_after(self, stream: str, event_id: int) -> List[Tuple[int, bytes]]:
+        # Caller holds _lock
+        return [(eid, payload) for eid, s, payload in self._events if eid > event_id and s == stream]
+
+    async def wait(self, stream: str, event_id: int, timeout: float) -> List[Tuple[int, bytes]]:
+        """Events on ``stream`` after ``event_id``; when there are none yet, first sleeps until
+        something is recorded, the session closes, or ``timeout`` elapses."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (loop, future)
+        with self._lock:
+            # Checked under the lock ``record`` appends under, so no event lands between the check and the wait
+            events = self._events_after(stream, event_id)
+            if events or self.closed:
+                return events
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # Timed out or the client went away: recorders must not wake a loop that may be gone
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        return self.events_after(stream, event_id)
+
+    def close(self) -> None:
+        self.closed = True
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class SessionManager:
+    def __init__(self, ttl: float = 3600.0, max_sessions: int = 10_000, history: int = 1000) -> None:
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.history = history
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self) -> Session:
+        session = Session(secrets.token_urlsafe(24), self.history)
+        expired = []
+        with self._lock:
+            self._sessions[session.id] = session
+            cutoff = time.monotonic() - self.ttl
+            while self._sessions:
+                oldest = next(iter(self._sessions.values()))
+                if len(self._sessions) <= self.max_sessions and oldest.last_seen >= cutoff:
+                    break
+                expired.append(self._sessions.popitem(last=False)[1])
+        for old in expired:
+            old.close()
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if session.last_seen < time.monotonic() - self.ttl:
+                del self._sessions[session_id]
+                expired = session
+            else:
+                self._sessions.move_to_end(session_id)
+                session.touch()
+                return session
+        expired.close()
+        return None
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+
+async def server_stream(session: Session, last_event_id: int, keepalive: float) -> AsyncIterator[bytes]:
+    """The standalone GET stream: keep-alive comments until the session ends.
+
+    It would also carry server-initiated messages recorded on ``SERVER_STREAM``;
+    none are sent today. An open stream counts as session activity, so the
+    session does not expire under it.
+    """
+    while not session.closed:
+        session.touch()
+        events = await session.wait(SERVER_STREAM, last_event_id, keepalive)
+        if events:
+            for event_id, payload in events:
+                yield format_event(event_id, payload)
+            last_event_id = events[-1][0]
+        elif not session.closed:
+            yield _KEEPALIVE
+
+
+async def replay_stream(events: List[Tuple[int, bytes]]) -> AsyncIterator[bytes]:
+    for event_id, payload in events:
+        yield format_event(event_id, payload)
+
+
+session_manager = SessionManager(
+    ttl=float(os.getenv(MCP_SESSION_TTL_ENV, "3600")),
+    max_sessions=int(os.getenv(MCP_MAX_SESSIONS_ENV, "10000")),
+    history=int(os.getenv(MCP_SSE_HISTORY_ENV, "1000")),
+)
+SSE_KEEPALIVE_SECONDS = float(os.getenv(MCP_SSE_KEEPALIVE_ENV, "15"))
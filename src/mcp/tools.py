@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from src.services.availability_service import AvailabilityService
 from src.services.balance_service import BalanceService
 from src.services.request_service import RequestService
 
@@ -9,24 +10,104 @@ def check_vacation_balance(employee_id: str) -> int:
     return BalanceService.get_balance_hours(employee_id)
 
 
+async def check_vacation_balance_async(employee_id: str) -> int:
+    """Async variant of ``check_vacation_balance`` for event-loop callers."""
+    return await BalanceService.get_balance_hours_async(employee_id)
+
+
+async def projected_balance_async(employee_id: str, as_of_date: str) -> Dict[str, Any]:
+    """Hours available now and projected on ``as_of_date`` with accrual. Raises ValueError on bad input."""
+    hours, projected = await BalanceService.project_balance_hours_async(employee_id, as_of_date)
+    return {"hoursAvailable": hours, "projectedHours": projected}
+
+
 def request_vacation(employee_id: str, start_date: str, end_date: str) -> dict:
     """Request vacation; returns {status, reason?, id?}."""
     req, ok, reason = RequestService.create_request(employee_id, start_date, end_date)
     return {"status": req.status, "reason": req.reason, "id": req.id}
 
 
+async def request_vacation_async(
+    employee_id: str, start_date: str, end_date: str, idempotency_key: Optional[str] = None,
+) -> dict:
+    """Async variant of ``request_vacation``; a repeated ``idempotency_key`` returns the original result."""
+    (req, ok, reason), replayed = await RequestService.create_request_idempotent_async(
+        employee_id, start_date, end_date, idempotency_key,
+    )
+    return {"status": req.status, "reason": req.reason, "id": req.id, "replayed": replayed}
+
+
 def list_vacation_requests(employee_id: str) -> List[Dict[str, Any]]:
     items = RequestService.list_requests(employee_id)
-    return [
-        {
-            "id": i.id,
-            "employeeId": i.employee_id,
-            "startDate": i.start_date,
-            "endDate": i.end_date,
-            "totalDays": i.total_days,
-            "totalHours": i.total_hours,
-            "status": i.status,
-            "reason": i.reason,
-        }
-        for i in items
-    ]
+    return [i.as_api_dict() for i in items]
+
+
+# Default page size for the MCP tool, small enough to keep LLM context manageable
+DEFAULT_TOOL_PAGE_SIZE = 50
+
+
+def list_vacation_requests_page(
+    employee_id: str,
+    limit: int = DEFAULT_TOOL_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    status: Optional[str] = None,
+) -> Dict[str, Any]:
+    """One page of requests; returns {requests, nextCursor}. Raises ValueError on bad input."""
+    filters = RequestService.build_filter(from_date, to_date, status)
+    items, next_cursor = RequestService.page_requests(employee_id, cursor, limit, filters)
+    return {"requests": [i.as_api_dict() for i in items], "nextCursor": next_cursor}
+
+
+async def list_vacation_requests_page_async(
+    employee_id: str,
+    limit: int = DEFAULT_TOOL_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    status: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Async variant of ``list_vacation_requests_page`` for event-loop callers."""
+    filters = RequestService.build_filter(from_date, to_date, status)
+    items, next_cursor = await RequestService.page_requests_async(employee_id, cursor, limit, filters)
+    return {"requests": [i.as_api_dict() for i in items], "nextCursor": next_cursor}
+
+
+def format_requests_page(employee_id: str, page: Dict[str, Any]) -> str:
+    """Render a page from ``list_vacation_requests_page`` as tool output text."""
+    requests_list = page["requests"]
+    if not requests_list:
+        return f"No vacation requests found for employee {employee_id}"
+
+    # Format the response nicely
+    formatted = [f"Vacation requests for {employee_id}:"]
+    for req in requests_list:
+        formatted.append(
+            f"  - Request {req['id']}: {req['startDate']} to {req['endDate']} "
+            f"({req['totalDays']} days, {req['totalHours']} hours) - Status: {req['status']}"
+        )
+        if req.get("reason"):
+            formatted.append(f"    Reason: {req['reason']}")
+    if page["nextCursor"]:
+        formatted.append(f"More requests available; call again with cursor={page['nextCursor']}")
+    return "\n".join(formatted)
+
+
+async def who_is_out_async(start_date: str, end_date: Optional[str] = None, team: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Employees with approved vacation overlapping [start_date, end_date]. Raises ValueError on bad input."""
+    absences = await AvailabilityService.who_is_out_async(start_date, end_date, team)
+    return [AvailabilityService.absence_dict(a) for a in absences]
+
+
+def format_absences(start_date: str, end_date: str, team: Optional[str], absences: List[Dict[str, Any]]) -> str:
+    """Render ``who_is_out_async`` results as tool output text."""
+    period = start_date if start_date == end_date else f"{start_date} to {end_date}"
+    scope = f" in team {team}" if team else ""
+    if not absences:
+        return f"Nobody{scope} is out on {period}"
+    formatted = [f"Out{scope} on {period} ({len(absences)}):"]
+    for a in absences:
+        member = f" [{a['team']}]" if a["team"] and not team else ""
+        formatted.append(f"  - {a['employeeId']}{member}: {a['startDate']} to {a['endDate']} ({a['totalDays']} days)")
+    return "\n".join(formatted)
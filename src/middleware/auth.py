@@ -1,33 +1,16 @@
 import os
-import time
-from collections import defaultdict, deque
-from typing import Deque, DefaultDict
 from fastapi import HTTPException, status, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from src.middleware.rate_limit import check_api_key_rate_limit
+
 API_KEY_ENV = "API_KEY"
 
 # OAuth2 Bearer token security scheme
 security = HTTPBearer()
 
-# naive in-memory rate limiter: 60 requests per 60 seconds per API key
-_WINDOW_SECONDS = 60
-_MAX_REQUESTS = 60
-_key_to_hits: DefaultDict[str, Deque[float]] = defaultdict(deque)
-
-
-def _check_rate_limit(key: str) -> None:
-    now = time.time()
-    q = _key_to_hits[key]
-    # drop old
-    while q and now - q[0] > _WINDOW_SECONDS:
-        q.popleft()
-    if len(q) >= _MAX_REQUESTS:
-        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Rate limit exceeded")
-    q.append(now)
-
 
-def require_api_key(credentials: HTTPAuthorizationCredentials = Security(security)) -> None:
+async def require_api_key(credentials: HTTPAuthorizationCredentials = Security(security)) -> None:
     """
     OAuth2 Bearer token authentication.
     Expects Authorization header: 'Bearer <API_KEY>'
@@ -42,4 +25,4 @@ def require_api_key(credentials: HTTPAuthorizationCredentials = Security(securit
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    _check_rate_limit(token)
+    check_api_key_rate_limit(token)
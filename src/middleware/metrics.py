@@ -0,0 +1,41 @@
+import time
+
+from src.lib.metrics import http_request_duration, http_requests_in_flight
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording in-flight requests and latency per route template.
+
+    Latency covers the whole response, including streamed bodies. Paths that
+    match no route share the ``unmatched`` label so scanners cannot blow up
+    label cardinality.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path_format", None) or "unmatched",
+                str(status_code),
+            )
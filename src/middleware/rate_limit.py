@@ -0,0 +1,154 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request, status
+
+from src.lib.metrics import rate_limit_rejections
+
+
+@dataclass(frozen=True)
+class Quota:
+    per_minute: float
+    burst: int
+
+    @property
+    def interval(self) -> float:
+        return 60.0 / self.per_minute
+
+    @property
+    def tolerance(self) -> float:
+        return (self.burst - 1) * self.interval
+
+
+class GCRALimiter:
+    """Generic cell rate algorithm limiter with O(1) state per key.
+
+    Each key stores only its theoretical arrival time (TAT). Keys live in an
+    LRU map capped at ``max_keys``; the least recently seen (idle) keys are
+    evicted first, which at worst grants an evicted key a fresh burst.
+    """
+
+    def __init__(
+        self,
+        default: Optional[Quota],
+        quotas: Optional[Dict[str, Optional[Quota]]] = None,
+        max_keys: int = 10_000,
+        name: str = "default",
+    ) -> None:
+        self.name = name
+        self.default = default
+        # A None override exempts that key, whatever the default
+        self.quotas: Dict[str, Optional[Quota]] = dict(quotas or {})
+        self.max_keys = max_keys
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """Take one token for ``key``; return 0.0 if allowed, else seconds to wait."""
+        quota = self.quotas.get(key, self.default)
+        if quota is None:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            tat = self._tat.get(key, now)
+            allow_at = tat - quota.tolerance
+            if now < allow_at:
+                self._tat.move_to_end(key)
+                return allow_at - now
+            self._tat[key] = max(tat, now) + quota.interval
+            self._tat.move_to_end(key)
+            if len(self._tat) > self.max_keys:
+                self._tat.popitem(last=False)
+        return 0.0
+
+
+def _env_quota(rate_env: str, burst_env: str, default_rate: Optional[float]) -> Optional[Quota]:
+    rate = os.getenv(rate_env)
+    per_minute = float(rate) if rate else default_rate
+    if not per_minute:
+        return None
+    burst = os.getenv(burst_env)
+    return Quota(per_minute=per_minute, burst=int(burst) if burst else max(1, int(per_minute)))
+
+
+def _env_quotas(env: str) -> Dict[str, Optional[Quota]]:
+    """Parse ``key=per_minute[/burst],...`` overrides; a rate of 0 makes that key unlimited.
+
+    Raises ValueError naming ``env`` for a malformed entry, so a typo fails at
+    startup instead of on the first request.
+    """
+    quotas: Dict[str, Optional[Quota]] = {}
+    for item in (os.getenv(env) or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, value = item.partition("=")
+        rate, _, burst = value.partition("/")
+        try:
+            if not sep or not key.strip():
+                raise ValueError
+            per_minute = float(rate)
+            burst_size = int(burst) if burst else max(1, int(per_minute))
+        except (OverflowError, ValueError):
+            raise ValueError(f"{env}: malformed entry {item!r}; expected key=per_minute[/burst]") from None
+        if not 0 <= per_minute < float("inf") or burst_size < 1:
+            raise ValueError(f"{env}: entry {item!r} needs a rate of 0 (unlimited) or more and a burst of 1 or more")
+        quotas[key.strip()] = Quota(per_minute=per_minute, burst=burst_size) if per_minute else None
+    return quotas
+
+
+# Per API key (authenticated REST routes): 60 requests per minute by default.
+api_key_limiter = GCRALimiter(
+    _env_quota("RATE_LIMIT_PER_MINUTE", "RATE_LIMIT_BURST", 60),
+    _env_quotas("RATE_LIMIT_KEY_QUOTAS"),
+    name="api_key",
+)
+# Per employee_id across REST and MCP: off unless configured.
+employee_limiter = GCRALimiter(
+    _env_quota("EMPLOYEE_RATE_LIMIT_PER_MINUTE", "EMPLOYEE_RATE_LIMIT_BURST", None),
+    _env_quotas("EMPLOYEE_RATE_LIMIT_QUOTAS"),
+    name="employee",
+)
+# Per client address on the unauthenticated /mcp routes.
+mcp_client_limiter = GCRALimiter(
+    _env_quota("MCP_RATE_LIMIT_PER_MINUTE", "MCP_RATE_LIMIT_BURST", 600),
+    name="mcp_client",
+)
+
+
+def _enforce(limiter: GCRALimiter, key: str) -> None:
+    retry_after = limiter.acquire(key)
+    if retry_after:
+        rate_limit_rejections.inc(limiter.name)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+
+def check_api_key_rate_limit(key: str) -> None:
+    _enforce(api_key_limiter, key)
+
+
+def check_employee_rate_limit(employee_id: str) -> None:
+    _enforce(employee_limiter, employee_id)
+
+
+async def rate_limit_mcp_client(request: Request) -> None:
+    """Router dependency for the public /mcp routes, keyed by client address.
+
+    Behind a proxy the address is only the caller's when uvicorn trusts that
+    proxy's X-Forwarded-For (FORWARDED_ALLOW_IPS); otherwise every caller shares the proxy's quota.
+    """
+    client = request.client
+    _enforce(mcp_client_limiter, client.host if client else "unknown")
@@ -6,6 +6,11 @@ class BalanceResponse(BaseModel):
     hoursAvailable: int = Field(ge=0, le=120)
 
 
+class EmployeeBalance(BaseModel):
+    employeeId: str
+    hoursAvailable: int = Field(ge=0, le=120)
+
+
 class CreateRequest(BaseModel):
     employeeId: str
     startDate: str  # ISO date
@@ -18,6 +23,10 @@ class RequestResponse(BaseModel):
     reason: Optional[str] = None
 
 
+class BatchRequestResult(RequestResponse):
+    employeeId: str
+
+
 class VacationRequest(BaseModel):
     id: str
     employeeId: str
@@ -27,3 +36,33 @@ class VacationRequest(BaseModel):
     totalHours: int
     status: Literal["Pending", "Approved", "Declined"]
     reason: Optional[str] = None
+
+
+class Absence(BaseModel):
+    employeeId: str
+    team: Optional[str] = None
+    requestId: str
+    startDate: str
+    endDate: str
+    totalDays: int
+
+
+class TeamAssignment(BaseModel):
+    team: Optional[str] = Field(None, description="Team or group name; null or blank removes the assignment")
+
+
+class EmployeeTeam(BaseModel):
+    employeeId: str
+    team: Optional[str] = None
+
+
+class AccrualPolicyModel(BaseModel):
+    hoursPerMonth: float = Field(ge=0, le=120, description="Hours accrued on the first of each month")
+    capHours: float = Field(120, ge=0, le=120, description="Accrual stops at this balance")
+    carryOverHours: Optional[float] = Field(None, ge=0, description="Balance kept into a new year; null keeps it all")
+
+
+class ProjectedBalance(BaseModel):
+    employeeId: str
+    hoursAvailable: int = Field(ge=0, le=120)
+    projectedHours: float = Field(ge=0, le=120)
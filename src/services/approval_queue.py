@@ -0,0 +1,144 @@
+"""Queued approval: requests are accepted as Pending and decided in batches.
+
+``ApprovalQueue.submit`` records a Pending request and returns at once. A
+worker coroutine on the queue's own event loop (a daemon thread, started on
+first use) takes whatever has accumulated, up to ``max_batch`` requests,
+groups it by employee and hands each group to ``decide`` in submission
+order. Decided requests stay visible to ``status`` for ``result_ttl``
+seconds; ``wait`` lets a caller on any event loop block until a decision.
+
+Pending requests are held in process memory: a restart drops any that were
+not yet decided.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from src.lib.cache import TTLCache
+from src.lib.store import VacationRequest
+
+logger = logging.getLogger("vacationmcp")
+
+# Marks the end of the queue on close
+_STOP = None
+
+PROCESSING_FAILED_REASON = "Could not be processed; please resubmit"
+
+
+class ApprovalQueueFull(RuntimeError):
+    """Too many requests are already waiting for a decision."""
+
+
+class ApprovalQueue:
+    def __init__(
+        self,
+        decide: Callable[[str, List[VacationRequest]], None],
+        max_batch: int = 500,
+        max_pending: int = 100_000,
+        result_ttl: float = 3600.0,
+    ) -> None:
+        self.decide = decide
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.decided: TTLCache[VacationRequest] = TTLCache(max_pending, result_ttl)
+        self._pending: Dict[str, VacationRequest] = {}
+        self._futures: Dict[str, "Future[VacationRequest]"] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._serve, args=(ready,), name="approval-worker", daemon=True)
+            self._thread.start()
+        ready.wait()
+
+    def submit(self, request: VacationRequest) -> None:
+        """Queue a Pending ``request``; ApprovalQueueFull when ``max_pending`` are already waiting."""
+        self.start()
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                raise ApprovalQueueFull("Too many vacation requests are awaiting a decision; retry shortly")
+            self._pending[request.id] = request
+            self._futures[request.id] = Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, request)
+
+    def status(self, request_id: str) -> Optional[VacationRequest]:
+        """The request while pending or recently decided; None once forgotten or if never queued."""
+        request = self._pending.get(request_id)
+        if request is None:
+            request = self.decided.get(request_id)
+        return request
+
+    async def wait(self, request_id: str, timeout: float) -> Optional[VacationRequest]:
+        """Like ``status`` but, for a pending request, first waits up to ``timeout`` seconds for its decision."""
+        future = self._futures.get(request_id)
+        if future is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.status(request_id)
+
+    def close(self) -> None:
+        """Decide everything already queued, then stop the worker."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, _STOP)
+        thread.join()
+
+    def _serve(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        ready.set()
+        try:
+            loop.run_until_complete(self._run())
+        finally:
+            loop.close()
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            stop = any(r is _STOP for r in batch)
+            requests = [r for r in batch if r is not _STOP]
+            if requests:
+                self._process(requests)
+            if stop:
+                return
+
+    def _process(self, batch: List[VacationRequest]) -> None:
+        # Runs on the worker loop's thread, so the store calls below do not stall request handlers
+        by_employee: Dict[str, List[VacationRequest]] = {}
+        for request in batch:
+            by_employee.setdefault(request.employee_id, []).append(request)
+        for employee_id, requests in by_employee.items():
+            try:
+                self.decide(employee_id, requests)
+            except Exception:
+                logger.exception("approval_batch_failed employee_id=%s count=%s", employee_id, len(requests))
+                # decide() may have approved some before failing; none of them can be trusted as stored
+                for request in requests:
+                    request.status = "Declined"
+                    request.reason = PROCESSING_FAILED_REASON
+        with self._lock:
+            for request in batch:
+                self.decided.set(request.id, request)
+                del self._pending[request.id]
+                self._futures.pop(request.id).set_result(request)
+        logger.info("approval_batch_decided count=%s employees=%s", len(batch), len(by_employee))
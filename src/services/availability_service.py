@@ -0,0 +1,66 @@
+from __future__ import annotations
+from datetime import date
+from typing import List, Optional, Tuple
+
+from src.lib.async_store import async_store
+from src.lib.store import VacationRequest, store
+
+# Longest range one absence query may span
+MAX_ABSENCE_RANGE_DAYS = 366
+MAX_TEAM_NAME_LENGTH = 100
+
+Absence = Tuple[VacationRequest, Optional[str]]
+
+
+class AvailabilityService:
+    @staticmethod
+    def parse_range(from_iso: str, to_iso: Optional[str] = None) -> Tuple[int, int]:
+        """Inclusive ordinal range for [from, to] (``to`` defaults to ``from``); ValueError on bad input."""
+        try:
+            start = date.fromisoformat(from_iso).toordinal()
+            end = date.fromisoformat(to_iso).toordinal() if to_iso else start
+        except (TypeError, ValueError):
+            raise ValueError("Dates must be ISO formatted (YYYY-MM-DD)") from None
+        if end < start:
+            raise ValueError("End date must be on or after the start date")
+        if end - start >= MAX_ABSENCE_RANGE_DAYS:
+            raise ValueError(f"Date range must span at most {MAX_ABSENCE_RANGE_DAYS} days")
+        return start, end
+
+    @staticmethod
+    def normalize_team(team: Optional[str]) -> Optional[str]:
+        """Trimmed team name, None for blank; ValueError when too long."""
+        team = (team or "").strip()
+        if len(team) > MAX_TEAM_NAME_LENGTH:
+            raise ValueError(f"team must be at most {MAX_TEAM_NAME_LENGTH} characters")
+        return team or None
+
+    @staticmethod
+    def who_is_out(from_iso: str, to_iso: Optional[str] = None, team: Optional[str] = None) -> List[Absence]:
+        """Approved requests overlapping [from, to], optionally for one team, with each employee's team."""
+        start, end = AvailabilityService.parse_range(from_iso, to_iso)
+        return store.absentees(start, end, AvailabilityService.normalize_team(team))
+
+    @staticmethod
+    async def who_is_out_async(from_iso: str, to_iso: Optional[str] = None, team: Optional[str] = None) -> List[Absence]:
+        start, end = AvailabilityService.parse_range(from_iso, to_iso)
+        return await async_store.absentees(start, end, AvailabilityService.normalize_team(team))
+
+    @staticmethod
+    async def set_team_async(employee_id: str, team: Optional[str]) -> Optional[str]:
+        """Assign ``employee_id`` to ``team`` (blank clears it); returns the stored team."""
+        team = AvailabilityService.normalize_team(team)
+        await async_store.set_team(employee_id, team)
+        return team
+
+    @staticmethod
+    def absence_dict(absence: Absence) -> dict:
+        request, team = absence
+        return {
+            "employeeId": request.employee_id,
+            "team": team,
+            "requestId": request.id,
+            "startDate": request.start_date,
+            "endDate": request.end_date,
+            "totalDays": request.total_days,
+        }
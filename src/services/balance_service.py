@@ -1,6 +1,25 @@
 from __future__ import annotations
-from typing import Optional
+import logging
+import os
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from src.lib.accrual import MAX_PROJECTION_DAYS, AccrualEngine, AccrualPolicy, accrual_engine
+from src.lib.async_store import async_store
+from src.lib.locks import employee_locks
 from src.lib.store import store
+from src.services.change_feed import change_feed
+
+logger = logging.getLogger("vacationmcp")
+
+ACCRUAL_POST_INTERVAL_ENV = "ACCRUAL_POST_INTERVAL_SECONDS"
+
+
+def _parse_as_of(as_of_iso: str) -> date:
+    try:
+        return date.fromisoformat(as_of_iso)
+    except (TypeError, ValueError):
+        raise ValueError("Projection date must be ISO formatted (YYYY-MM-DD)") from None
 
 
 class BalanceService:
@@ -14,8 +33,138 @@ class BalanceService:
             hours = 120
         return hours
 
+    @staticmethod
+    def get_balances_hours(employee_ids: List[str]) -> Dict[str, int]:
+        # Same 0..120 bounds as get_balance_hours, one store round trip
+        return {e: max(0, min(120, h)) for e, h in store.get_balances(employee_ids).items()}
+
+    @staticmethod
+    async def get_balance_hours_async(employee_id: str) -> int:
+        return max(0, min(120, await async_store.get_balance(employee_id)))
+
+    @staticmethod
+    async def get_balances_hours_async(employee_ids: List[str]) -> Dict[str, int]:
+        return {e: max(0, min(120, h)) for e, h in (await async_store.get_balances(employee_ids)).items()}
+
     @staticmethod
     def seed_balance(employee_id: str, hours: int) -> None:
         # Helper for demos/tests
         bounded = max(0, min(120, hours))
         store.set_balance(employee_id, bounded)
+        change_feed.publish("balance.set", employee_id, hoursAvailable=bounded)
+
+    @staticmethod
+    def set_accrual_policy(employee_id: str, policy: Optional[AccrualPolicy]) -> None:
+        # None returns the employee to the default policy. Approvals, posting and
+        # projections all read the store copy, so every worker sees it at once.
+        store.set_accrual_policy(employee_id, policy)
+
+    @staticmethod
+    async def set_accrual_policy_async(employee_id: str, policy: Optional[AccrualPolicy]) -> None:
+        await async_store.set_accrual_policy(employee_id, policy)
+
+    @staticmethod
+    def post_accruals(today: Optional[date] = None) -> Dict[str, int]:
+        """Credit every accrual day since the last posting through ``today`` to stored balances.
+
+        Returns the balances that changed. The first call only records
+        ``today``: balances seeded before then are taken as already accrued.
+        Posting is idempotent, and when another worker posts the same days
+        first this one writes nothing.
+        """
+        today = today or date.today()
+        # Excludes every check-and-deduct, so no approval reads a balance mid-posting
+        with employee_locks.hold_all():
+            previous = store.accrued_through()
+            if previous is None:
+                store.post_accruals(None, today.toordinal(), lambda balances: {})
+                return {}
+            if today.toordinal() <= previous:
+                return {}
+            engine = _engine_for(store.accrual_policies())
+
+            def accrue(balances: Dict[str, int]) -> Dict[str, int]:
+                # Runs inside the store's write transaction, on balances no other worker can change
+                projected = dict(balances)
+                start = date.fromordinal(previous)
+                while start < today:
+                    end = min(today, start + timedelta(days=MAX_PROJECTION_DAYS))
+                    projected = dict(zip(projected, engine.project(projected, end, start).tolist()))
+                    start = end
+                return {e: round(h) for e, h in projected.items() if round(h) != balances[e]}
+
+            changed = store.post_accruals(previous, today.toordinal(), accrue)
+            if changed is None:
+                return {}
+        for employee_id, hours in changed.items():
+            change_feed.publish("balance.accrued", employee_id, hoursAvailable=max(0, min(120, hours)))
+        if changed:
+            logger.info("accruals_posted through=%s employees=%s", today.isoformat(), len(changed))
+        return changed
+
+    @staticmethod
+    async def project_balance_hours_async(employee_id: str, as_of_iso: str) -> Tuple[int, float]:
+        """(hours available now, hours projected on ``as_of_iso``); ValueError on a bad date."""
+        as_of = _parse_as_of(as_of_iso)
+        hours = await async_store.get_balance(employee_id)
+        policy = await async_store.get_accrual_policy(employee_id)
+        projected = _engine_for({employee_id: policy} if policy else {}).project_one(employee_id, hours, as_of)
+        return max(0, min(120, hours)), max(0.0, round(projected, 2))
+
+    @staticmethod
+    async def project_balances_async(as_of_iso: str, employee_ids: Optional[List[str]] = None) -> List[dict]:
+        """Current and projected hours for ``employee_ids`` (every stored balance when None), in one array pass."""
+        as_of = _parse_as_of(as_of_iso)
+        if employee_ids is None:
+            balances = await async_store.all_balances()
+        else:
+            balances = await async_store.get_balances(employee_ids)
+        engine = _engine_for(await async_store.accrual_policies())
+        projected = engine.project(balances, as_of).round(2).clip(min=0.0)
+        return [
+            {"employeeId": e, "hoursAvailable": max(0, min(120, h)), "projectedHours": p}
+            for e, h, p in zip(balances, balances.values(), projected.tolist())
+        ]
+
+
+class AccrualPoster:
+    """Daemon thread that calls ``BalanceService.post_accruals`` every ``interval`` seconds."""
+
+    def __init__(self, interval: float = 3600.0) -> None:
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="accrual-poster", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                BalanceService.post_accruals()
+            except Exception:
+                logger.exception("accrual_post_failed")
+            if self._stop.wait(self.interval):
+                return
+
+
+def _engine_for(policies: Dict[str, AccrualPolicy]) -> AccrualEngine:
+    # Built per call from the store's policies: one set in another worker applies here at once
+    engine = AccrualEngine(accrual_engine.default_policy, capacity=len(policies) + 1)
+    for employee_id, policy in policies.items():
+        engine.set_policy(employee_id, policy)
+    return engine
+
+
+accrual_poster = AccrualPoster(float(os.getenv(ACCRUAL_POST_INTERVAL_ENV, "3600")))
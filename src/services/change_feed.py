@@ -0,0 +1,220 @@
+"""In-process change feed of vacation-request and balance events.
+
+``RequestService`` and ``BalanceService`` publish an event for each mutation
+they make, numbered by a sequence that only grows. The newest ``retention``
+events are kept in a ring buffer, so a subscriber can resume after any
+sequence still retained.
+
+Subscribers read the shared buffer at their own pace instead of draining a
+queue of their own: publishing never blocks on, or buffers for, a slow
+consumer, and a stream only advances as fast as its socket accepts writes. A
+subscriber that falls more than ``retention`` events behind has missed some;
+its stream ends with a ``feed.reset`` event and it must resync from the list
+endpoints before subscribing again.
+
+Sequences restart with the process. Event ids are ``<epoch>-<seq>`` so a
+client resuming with an id from an earlier process is detected rather than
+silently skipped ahead.
+
+Publishing is thread-safe: waiting streams are woken through their own event
+loop, so the approval worker and threadpool handlers publish too.
+"""
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import uuid
+import weakref
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from src.lib.serialization import dumps
+
+CHANGE_FEED_RETENTION_ENV = "CHANGE_FEED_RETENTION"
+CHANGE_FEED_MAX_SUBSCRIBERS_ENV = "CHANGE_FEED_MAX_SUBSCRIBERS"
+CHANGE_FEED_KEEPALIVE_ENV = "CHANGE_FEED_KEEPALIVE_SECONDS"
+
+# Events written per chunk, so a far-behind subscriber catches up in bounded steps
+STREAM_BATCH_SIZE = 500
+
+_SSE_KEEPALIVE = b": keep-alive\n\n"
+
+
+class ChangeFeedGap(LookupError):
+    """Events after the requested sequence are no longer retained (or came from an earlier process)."""
+
+
+class ChangeFeedFull(RuntimeError):
+    """Too many subscribers are already connected."""
+
+
+class ChangeFeed:
+    def __init__(self, retention: int = 100_000, max_subscribers: int = 1000) -> None:
+        self.retention = retention
+        self.max_subscribers = max_subscribers
+        self.epoch = uuid.uuid4().hex[:8]
+        self.subscribers = 0
+        self.closed = False
+        # Slot seq % retention holds (seq, type, encoded event)
+        self._ring: List[Optional[Tuple[int, str, bytes]]] = [None] * retention
+        self._last_seq = 0
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def publish(self, event_type: str, employee_id: str, **fields) -> int:
+        """Append an event and wake waiting subscribers; returns its sequence number."""
+        at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        with self._lock:
+            seq = self._last_seq + 1
+            event = {
+                "id": f"{self.epoch}-{seq}", "seq": seq, "type": event_type,
+                "employeeId": employee_id, "at": at, **fields,
+            }
+            self._ring[seq % self.retention] = (seq, event_type, dumps(event))
+            self._last_seq = seq
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        return seq
+
+    def parse_cursor(self, cursor: str) -> int:
+        """Sequence from an event id (``<epoch>-<seq>``) or a bare sequence number.
+
+        Raises ValueError when malformed and ``ChangeFeedGap`` for an id from another epoch.
+        """
+        epoch, _, seq = cursor.strip().rpartition("-")
+        if epoch and epoch != self.epoch:
+            raise ChangeFeedGap("Event id is from an earlier feed; resync and subscribe again")
+        try:
+            after = int(seq)
+        except ValueError:
+            raise ValueError("Invalid change feed cursor") from None
+        if after < 0:
+            raise ValueError("Invalid change feed cursor")
+        return after
+
+    def check_resume(self, after: int) -> None:
+        """Raise ``ChangeFeedGap`` unless every event after ``after`` is still retained."""
+        last = self._last_seq
+        if after > last:
+            raise ChangeFeedGap("Sequence is ahead of the feed; resync and subscribe again")
+        if after < last - self.retention:
+            raise ChangeFeedGap("Events after this sequence are no longer retained; resync and subscribe again")
+
+    def events_after(self, after: int, limit: int = STREAM_BATCH_SIZE) -> List[Tuple[int, str, bytes]]:
+        """Up to ``limit`` retained events following ``after``, oldest first."""
+        with self._lock:
+            return self._events_after(after, limit)
+
+    def _events_after(self, after: int, limit: int) -> List[Tuple[int, str, bytes]]:
+        # Caller holds _lock
+        self.check_resume(after)
+        ring, size = self._ring, self.retention
+        return [ring[seq % size] for seq in range(after + 1, min(self._last_seq, after + limit) + 1)]
+
+    async def wait(self, after: int, timeout: float, limit: int = STREAM_BATCH_SIZE) -> List[Tuple[int, str, bytes]]:
+        """Like ``events_after``, but when there are none yet first sleeps until something is
+        published, the feed closes, or ``timeout`` elapses."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (loop, future)
+        with self._lock:
+            # Checked under the lock ``publish`` appends under, so no event lands between the check and the wait
+            events = self._events_after(after, limit)
+            if events or self.closed:
+                return events
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # Timed out or the subscriber went away: publishers must not wake a loop that may be gone
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        return self.events_after(after, limit)
+
+    def reserve(self) -> None:
+        """Take a subscriber slot; ChangeFeedFull when all ``max_subscribers`` are taken."""
+        with self._lock:
+            if self.subscribers >= self.max_subscribers:
+                raise ChangeFeedFull("Too many change feed subscribers; retry shortly")
+            self.subscribers += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self.subscribers -= 1
+
+    def close(self) -> None:
+        """End every open stream."""
+        self.closed = True
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def format_sse(seq: int, event_type: str, payload: bytes, epoch: str) -> bytes:
+    return b"id: %s-%d\nevent: %s\ndata: %s\n\n" % (epoch.encode(), seq, event_type.encode(), payload)
+
+
+def feed_stream(feed: ChangeFeed, after: int, sse: bool, keepalive: float) -> AsyncIterator[bytes]:
+    """Events after ``after``, then live ones, as SSE or NDJSON; ends with ``feed.reset`` on a gap.
+
+    Reserves a subscriber slot up front (ChangeFeedFull when none is left), so
+    concurrent connects cannot overshoot ``max_subscribers``; the slot is freed
+    when the stream ends or is dropped unread. Idle streams get a keep-alive
+    comment (SSE) or ``heartbeat`` line (NDJSON) every ``keepalive`` seconds.
+    """
+    feed.reserve()
+    released = threading.Event()
+
+    def release() -> None:
+        if not released.is_set():
+            released.set()
+            feed.release()
+
+    stream = _feed_events(feed, after, sse, keepalive, release)
+    # A generator that is never started never runs its ``finally``
+    weakref.finalize(stream, release)
+    return stream
+
+
+async def _feed_events(
+    feed: ChangeFeed, after: int, sse: bool, keepalive: float, release: Callable[[], None],
+) -> AsyncIterator[bytes]:
+    try:
+        while not feed.closed:
+            try:
+                events = await feed.wait(after, keepalive)
+            except ChangeFeedGap as e:
+                reset = dumps({"type": "feed.reset", "seq": after, "reason": str(e)})
+                yield format_sse(after, "feed.reset", reset, feed.epoch) if sse else reset + b"\n"
+                return
+            if events:
+                if sse:
+                    yield b"".join(format_sse(seq, t, payload, feed.epoch) for seq, t, payload in events)
+                else:
+                    yield b"\n".join(payload for _, _, payload in events) + b"\n"
+                after = events[-1][0]
+            elif not feed.closed:
+                yield _SSE_KEEPALIVE if sse else dumps({"type": "heartbeat", "seq": after}) + b"\n"
+    finally:
+        release()
+
+
+change_feed = ChangeFeed(
+    retention=int(os.getenv(CHANGE_FEED_RETENTION_ENV, "100000")),
+    max_subscribers=int(os.getenv(CHANGE_FEED_MAX_SUBSCRIBERS_ENV, "1000")),
+)
+CHANGE_FEED_KEEPALIVE_SECONDS = float(os.getenv(CHANGE_FEED_KEEPALIVE_ENV, "15"))
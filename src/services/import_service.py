@@ -0,0 +1,288 @@
+"""Streaming bulk import of balances and historical vacation requests.
+
+Input is JSONL or CSV, one record per line:
+
+    {"type": "balance", "employeeId": "alice", "hours": 80}
+    {"type": "request", "employeeId": "alice", "startDate": "2024-03-04", "endDate": "2024-03-08",
+     "status": "Approved", "id": "optional", "reason": "optional"}
+    {"type": "team", "employeeId": "alice", "team": "platform"}
+
+CSV files use the same field names as a header row
+(``type,employeeId,hours,startDate,endDate,status,id,reason,team``); quoted fields may span lines.
+Request rows must be Approved or Declined: Pending requests are only accepted through the API,
+where the approval queue decides them.
+
+Usage:
+    python -m src.services.import_service data.jsonl [--format csv]
+"""
+from __future__ import annotations
+import argparse
+import csv
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from src.lib.date_utils import count_weekdays_ordinals
+from src.lib.store import EmployeeIntervalIndex, Store, VacationRequest, store
+
+logger = logging.getLogger("vacationmcp")
+
+IMPORT_FORMATS = ("jsonl", "csv")
+# Pending rows are not importable: only requests submitted through the API reach the approval queue
+_STATUSES = ("Approved", "Declined")
+_MAX_REPORTED_ERRORS = 20
+# Stands in for a line that is not JSON, so its rejection is reported in line order
+_INVALID_JSON = object()
+
+# A validated record: ("balance", employee_id, hours), ("team", employee_id, team) or a VacationRequest
+_Record = Union[Tuple[str, str, int], Tuple[str, str, str], VacationRequest]
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    balances: int = 0
+    requests: int = 0
+    teams: int = 0
+    rejected: int = 0
+    elapsed_seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "balances": self.balances,
+            "requests": self.requests,
+            "teams": self.teams,
+            "rejected": self.rejected,
+            "elapsedSeconds": round(self.elapsed_seconds, 3),
+            "rowsPerSecond": round(self.rows_per_second),
+            "errors": self.errors,
+        }
+
+
+class BulkImporter:
+    """Validates streamed rows and loads them into the store in chunks.
+
+    Rows flow through generators (parse -> chunk -> validate) and each chunk
+    goes to ``store.bulk_load`` so per-employee indexes are built with one
+    sort rather than one insert per row. Requests overlapping an earlier
+    imported or stored request for the same employee are rejected, as are
+    requests reusing an id that was already imported or stored. Before a
+    chunk is validated, the stored ranges of the employees it introduces and
+    the stored ids it reuses are fetched with one store call each, so these
+    checks never cost a query per row. Meant for initial loads; it does not
+    take the per-employee request locks.
+    """
+
+    def __init__(self, fmt: str = "jsonl", target: Optional[Store] = None, chunk_size: int = 50_000) -> None:
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.fmt = fmt
+        self.target = target if target is not None else store
+        self.chunk_size = chunk_size
+        self.report = ImportReport()
+        self._csv_header: Optional[List[str]] = None
+        # A CSV record whose quoted field is still open, and the line it began on
+        self._csv_partial: Optional[str] = None
+        self._csv_partial_line_no = 0
+        self._line_no = 0
+        # Stored and imported booked ranges, per employee, for overlap checks across chunks
+        self._booked: Dict[str, EmployeeIntervalIndex] = {}
+        # Explicit ids imported so far, and those of the current chunk already in the store
+        self._ids: Set[str] = set()
+        self._stored_ids: Set[str] = set()
+        self._started = time.perf_counter()
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Import a run of complete lines; may be called repeatedly."""
+        rows = self._parse(lines)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self._prefetch(chunk)
+            self._load(list(self._validate(chunk)))
+
+    def finish(self) -> ImportReport:
+        if self._csv_partial is not None:
+            self.report.rows += 1
+            self._reject(self._csv_partial_line_no, "unterminated quoted field")
+            self._csv_partial = None
+        self.report.elapsed_seconds = time.perf_counter() - self._started
+        logger.info(
+            "bulk_import_finished rows=%s balances=%s requests=%s teams=%s rejected=%s rows_per_second=%.0f",
+            self.report.rows, self.report.balances, self.report.requests, self.report.teams, self.report.rejected,
+            self.report.rows_per_second,
+        )
+        return self.report
+
+    def _reject(self, line_no: int, message: str) -> None:
+        self.report.rejected += 1
+        if len(self.report.errors) < _MAX_REPORTED_ERRORS:
+            self.report.errors.append(f"line {line_no}: {message}")
+
+    def _parse(self, lines: Iterable[str]) -> Iterator[Tuple[int, object]]:
+        for line in lines:
+            self._line_no += 1
+            if self.fmt == "jsonl":
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = _INVALID_JSON
+                line_no = self._line_no
+            else:
+                # A quoted field may hold newlines: gather lines (across feed calls) until the quotes balance
+                line = line.rstrip("\r\n")
+                if self._csv_partial is None:
+                    if not line.strip():
+                        continue
+                    self._csv_partial_line_no = self._line_no
+                    record = line
+                else:
+                    record = self._csv_partial + "\n" + line
+                if record.count('"') % 2:
+                    self._csv_partial = record
+                    continue
+                self._csv_partial = None
+                line_no = self._csv_partial_line_no
+                values = next(csv.reader([record]))
+                if self._csv_header is None:
+                    self._csv_header = [v.strip() for v in values]
+                    continue
+                row = {k: v for k, v in zip(self._csv_header, values) if v != ""}
+            self.report.rows += 1
+            yield line_no, row
+
+    def _prefetch(self, chunk: List[Tuple[int, object]]) -> None:
+        """Load what request rows in ``chunk`` are checked against from the store."""
+        requests = [
+            row for _, row in chunk
+            if isinstance(row, dict) and row.get("type") == "request" and isinstance(row.get("employeeId"), str)
+        ]
+        new_employees = list({row["employeeId"] for row in requests} - self._booked.keys())
+        for employee_id, ranges in self.target.booked_ranges(new_employees).items():
+            index = self._booked[employee_id] = EmployeeIntervalIndex()
+            index.extend([(start, end, "") for start, end in ranges])
+        self._stored_ids = self.target.existing_request_ids(
+            (row["employeeId"], str(row["id"])) for row in requests if row.get("id")
+        )
+
+    def _validate(self, rows: Iterable[Tuple[int, object]]) -> Iterator[_Record]:
+        fromiso = date.fromisoformat
+        for line_no, row in rows:
+            if row is _INVALID_JSON:
+                self._reject(line_no, "invalid JSON")
+                continue
+            if not isinstance(row, dict):
+                self._reject(line_no, "expected an object")
+                continue
+            kind = row.get("type")
+            employee_id = row.get("employeeId")
+            if not employee_id:
+                self._reject(line_no, "missing employeeId")
+                continue
+            if not isinstance(employee_id, str):
+                self._reject(line_no, "employeeId must be a string")
+                continue
+            try:
+                if kind == "balance":
+                    hours = int(row["hours"])
+                    yield ("balance", employee_id, max(0, min(120, hours)))
+                elif kind == "team":
+                    team = str(row["team"]).strip()
+                    if not team:
+                        raise ValueError("team must not be empty")
+                    yield ("team", employee_id, team)
+                elif kind == "request":
+                    request_id = str(row["id"]) if row.get("id") else None
+                    if request_id is not None and (request_id in self._ids or request_id in self._stored_ids):
+                        raise ValueError(f"duplicate request id {request_id!r}")
+                    start_iso, end_iso = row["startDate"], row["endDate"]
+                    start, end = fromiso(start_iso).toordinal(), fromiso(end_iso).toordinal()
+                    days = count_weekdays_ordinals(start, end)
+                    status = row.get("status") or "Approved"
+                    if status == "Pending":
+                        raise ValueError("Pending requests cannot be imported; submit them through the API to be decided")
+                    if status not in _STATUSES:
+                        raise ValueError(f"unknown status {status!r}")
+                    if status != "Declined" and not self._book(employee_id, start, end):
+                        raise ValueError("overlaps another request for this employee")
+                    if request_id is not None:
+                        self._ids.add(request_id)
+                    yield VacationRequest(
+                        id=request_id or str(uuid.uuid4()),
+                        employee_id=employee_id,
+                        start_date=start_iso,
+                        end_date=end_iso,
+                        total_days=days,
+                        total_hours=days * 8,
+                        status=status,
+                        reason=row.get("reason"),
+                    )
+                else:
+                    self._reject(line_no, f"unknown type {kind!r}")
+            except (KeyError, TypeError, ValueError) as e:
+                self._reject(line_no, str(e) if not isinstance(e, KeyError) else f"missing {e.args[0]}")
+
+    def _book(self, employee_id: str, start: int, end: int) -> bool:
+        # Seeded with the employee's stored ranges by _prefetch
+        booked = self._booked[employee_id]
+        if booked.overlaps(start, end):
+            return False
+        booked.add(start, end, "")
+        return True
+
+    def _load(self, chunk: List[_Record]) -> None:
+        balances: Dict[str, int] = {}
+        teams: Dict[str, Optional[str]] = {}
+        requests: List[VacationRequest] = []
+        for record in chunk:
+            if isinstance(record, VacationRequest):
+                requests.append(record)
+            elif record[0] == "team":
+                teams[record[1]] = record[2]
+            else:
+                balances[record[1]] = record[2]
+        self.target.bulk_load(balances, requests, teams)
+        self.report.balances += len(balances)
+        self.report.requests += len(requests)
+        self.report.teams += len(teams)
+
+
+def import_lines(lines: Iterable[str], fmt: str = "jsonl", target: Optional[Store] = None) -> ImportReport:
+    importer = BulkImporter(fmt, target)
+    importer.feed(lines)
+    return importer.finish()
+
+
+def main() -> None:
+    from src.lib.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Bulk import balances and historical vacation requests.")
+    parser.add_argument("path", help="JSONL or CSV file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+    args = parser.parse_args()
+
+    setup_logging()
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+    with open(args.path, encoding="utf-8", newline="") as f:
+        report = import_lines(f, fmt)
+    store.close()
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,194 @@
 from __future__ import annotations
+import base64
 import logging
+import math
+import os
 import uuid
 from datetime import date
-from typing import Tuple, List
+from typing import AsyncIterator, Callable, Dict, Iterator, Tuple, List, Optional
 
-from src.lib.date_utils import count_weekdays_inclusive
-from src.lib.store import store, VacationRequest
+from src.lib.accrual import MAX_PROJECTION_DAYS, AccrualPolicy, accrual_engine
+from src.lib.async_store import async_store
+from src.lib.cache import IdempotentCalls, TTLCache
+from src.lib.date_utils import count_weekdays_ordinals
+from src.lib.locks import employee_locks
+from src.lib.metrics import vacation_requests_decided
+from src.lib.serialization import dumps
+from src.lib.store import store, EmployeeIntervalIndex, RequestFilter, VacationRequest
+from src.services.approval_queue import PROCESSING_FAILED_REASON, ApprovalQueue
+from src.services.change_feed import change_feed
 
 logger = logging.getLogger("vacationmcp")
 
+MAX_PAGE_SIZE = 1000
+# Page size used when streaming a whole history
+STREAM_PAGE_SIZE = 500
 
-class RequestService:
-    @staticmethod
-    def _overlaps(a_start: date, a_end: date, b_start: date, b_end: date) -> bool:
-        return not (a_end < b_start or b_end < a_start)
+APPROVAL_MODE_ENV = "APPROVAL_MODE"
+APPROVAL_MAX_BATCH_ENV = "APPROVAL_MAX_BATCH"
+APPROVAL_MAX_PENDING_ENV = "APPROVAL_MAX_PENDING"
+APPROVAL_RESULT_TTL_ENV = "APPROVAL_RESULT_TTL_SECONDS"
+
+REQUEST_LIST_CACHE_MAX_ENTRIES_ENV = "REQUEST_LIST_CACHE_MAX_ENTRIES"
+
+IDEMPOTENCY_TTL_ENV = "IDEMPOTENCY_TTL_SECONDS"
+IDEMPOTENCY_MAX_KEYS_ENV = "IDEMPOTENCY_MAX_KEYS"
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# Completed create_request results by (employee_id, Idempotency-Key), shared by REST and MCP
+request_idempotency: IdempotentCalls[Tuple[VacationRequest, bool, Optional[str]]] = IdempotentCalls(
+    max_entries=int(os.getenv(IDEMPOTENCY_MAX_KEYS_ENV, "100000")),
+    ttl=float(os.getenv(IDEMPOTENCY_TTL_ENV, "86400")),
+)
+
+# Serialized request lists by employee_id, as (store version, JSON bytes); LRU-bounded, and an
+# entry goes stale when the employee's version moves on rather than after a TTL
+request_list_cache: TTLCache[Tuple[int, bytes]] = TTLCache(int(os.getenv(REQUEST_LIST_CACHE_MAX_ENTRIES_ENV, "10000")), math.inf)
 
+
+def _encode_cursor(seq: int) -> str:
+    return base64.urlsafe_b64encode(f"s{seq}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        if raw[:1] != "s":
+            raise ValueError
+        return int(raw[1:])
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor") from None
+
+
+class RequestService:
     @staticmethod
-    def _calc_days_hours(start_iso: str, end_iso: str) -> Tuple[int, int]:
-        days = count_weekdays_inclusive(start_iso, end_iso)
+    def _calc_days_hours(start_ordinal: int, end_ordinal: int) -> Tuple[int, int]:
+        days = count_weekdays_ordinals(start_ordinal, end_ordinal)
         hours = days * 8
         return days, hours
 
     @staticmethod
     def create_request(employee_id: str, start_iso: str, end_iso: str) -> Tuple[VacationRequest, bool, str | None]:
+        with employee_locks.hold(employee_id):
+            return RequestService._create_request_locked(employee_id, start_iso, end_iso)
+
+    @staticmethod
+    async def create_request_async(employee_id: str, start_iso: str, end_iso: str) -> Tuple[VacationRequest, bool, str | None]:
+        if async_store.blocking:
+            # One worker-thread hop for the whole locked check-and-deduct
+            return await async_store.run(RequestService.create_request, employee_id, start_iso, end_iso)
+        async with employee_locks.hold_async(employee_id):
+            return RequestService._create_request_locked(employee_id, start_iso, end_iso)
+
+    @staticmethod
+    async def submit_request_async(employee_id: str, start_iso: str, end_iso: str) -> Tuple[VacationRequest, bool, str | None]:
+        """Queue a request for the approval worker; it comes back Pending (or Declined for unusable dates).
+
+        Raises ``ApprovalQueueFull`` when too many requests are already waiting.
+        """
+        req = RequestService.prepare_request(employee_id, start_iso, end_iso)
+        if req.status == "Declined":
+            RequestService._publish("request.created", req)
+            return req, False, req.reason
+        # The worker decides under this lock too, so its request.decided event cannot overtake request.created
+        async with employee_locks.hold_async(employee_id):
+            approval_queue.submit(req)
+            RequestService._publish("request.created", req)
+        return req, False, None
+
+    @staticmethod
+    async def create_request_idempotent_async(
+        employee_id: str, start_iso: str, end_iso: str, idempotency_key: Optional[str], queued: bool = False,
+    ) -> Tuple[Tuple[VacationRequest, bool, str | None], bool]:
+        """``create_request_async`` (or ``submit_request_async`` when ``queued``) that returns the original result for a repeated key.
+
+        Returns ``(result, replayed)``. Raises ValueError for an over-long key and
+        ``IdempotencyKeyConflict`` when the key was used for different dates.
+        """
+        create = RequestService.submit_request_async if queued else RequestService.create_request_async
+        if not idempotency_key:
+            return await create(employee_id, start_iso, end_iso), False
+        if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            raise ValueError(f"Idempotency key longer than {MAX_IDEMPOTENCY_KEY_LENGTH} characters")
+        return await request_idempotency.run(
+            (employee_id, idempotency_key),
+            (start_iso, end_iso),
+            lambda: create(employee_id, start_iso, end_iso),
+        )
+
+    @staticmethod
+    async def get_request_async(employee_id: str, request_id: str, wait: float = 0.0) -> Optional[VacationRequest]:
+        """One of the employee's requests, queued or stored; ``wait`` seconds long-polls a pending decision."""
+        req = await approval_queue.wait(request_id, wait) if wait else approval_queue.status(request_id)
+        if req is not None:
+            return req if req.employee_id == employee_id else None
+        for req in await async_store.list_requests(employee_id):
+            if req.id == request_id:
+                return req
+        return None
+
+    @staticmethod
+    def create_requests(items: List[Tuple[str, str, str]]) -> List[Tuple[VacationRequest, bool, str | None]]:
+        """Create many ``(employee_id, start_iso, end_iso)`` requests in one pass.
+
+        Items are grouped by employee so each employee's lock is taken once and
+        their items are decided in submission order; results keep input order.
+        """
+        positions_by_employee: Dict[str, List[int]] = {}
+        for position, (employee_id, _, _) in enumerate(items):
+            positions_by_employee.setdefault(employee_id, []).append(position)
+
+        results: List[Tuple[VacationRequest, bool, str | None]] = [None] * len(items)  # type: ignore[list-item]
+        for employee_id, positions in positions_by_employee.items():
+            with employee_locks.hold(employee_id):
+                for position in positions:
+                    _, start_iso, end_iso = items[position]
+                    results[position] = RequestService._create_request_locked(employee_id, start_iso, end_iso)
+        return results
+
+    @staticmethod
+    async def create_requests_async(items: List[Tuple[str, str, str]]) -> List[Tuple[VacationRequest, bool, str | None]]:
+        if async_store.blocking:
+            return await async_store.run(RequestService.create_requests, items)
+        positions_by_employee: Dict[str, List[int]] = {}
+        for position, (employee_id, _, _) in enumerate(items):
+            positions_by_employee.setdefault(employee_id, []).append(position)
+        results: List[Tuple[VacationRequest, bool, str | None]] = [None] * len(items)  # type: ignore[list-item]
+        for employee_id, positions in positions_by_employee.items():
+            async with employee_locks.hold_async(employee_id):
+                for position in positions:
+                    _, start_iso, end_iso = items[position]
+                    results[position] = RequestService._create_request_locked(employee_id, start_iso, end_iso)
+        return results
+
+    @staticmethod
+    def _create_request_locked(employee_id: str, start_iso: str, end_iso: str) -> Tuple[VacationRequest, bool, str | None]:
+        # Caller holds the employee's lock; store.approve makes the check and deduction atomic across processes
+        req = RequestService.prepare_request(employee_id, start_iso, end_iso)
+        if req.status == "Declined":
+            RequestService._publish("request.created", req)
+            return req, False, req.reason
+        [(req, new_balance)] = RequestService._decide_and_store(employee_id, [req], isolate_failures=False)
+        if new_balance is None:
+            RequestService._publish("request.created", req)
+            return req, False, req.reason
+
+        # The balance goes below zero when spending hours that accrue later
+        RequestService._publish("request.created", req, new_balance)
+        logger.info("vacation_request_approved employee_id=%s id=%s hours=%s new_balance=%s", employee_id, req.id, req.total_hours, new_balance)
+        return req, True, None
+
+    @staticmethod
+    def prepare_request(employee_id: str, start_iso: str, end_iso: str) -> VacationRequest:
+        """A new request with its totals: Pending, or already Declined when the dates are unusable."""
         # Validate ranges and compute totals
         try:
-            total_days, total_hours = RequestService._calc_days_hours(start_iso, end_iso)
+            start_ordinal = date.fromisoformat(start_iso).toordinal()
+            end_ordinal = date.fromisoformat(end_iso).toordinal()
+            total_days, total_hours = RequestService._calc_days_hours(start_ordinal, end_ordinal)
         except ValueError as e:
-            reason = str(e)
-            req = VacationRequest(
+            vacation_requests_decided.inc("Declined", "invalid_dates")
+            return VacationRequest(
                 id=str(uuid.uuid4()),
                 employee_id=employee_id,
                 start_date=start_iso,
@@ -36,13 +196,12 @@ class RequestService:
                 total_days=0,
                 total_hours=0,
                 status="Declined",
-                reason=reason,
+                reason=str(e),
             )
-            return req, False, reason
 
         if total_days == 0:
-            reason = "No weekdays in requested range"
-            req = VacationRequest(
+            vacation_requests_decided.inc("Declined", "no_weekdays")
+            return VacationRequest(
                 id=str(uuid.uuid4()),
                 employee_id=employee_id,
                 start_date=start_iso,
@@ -50,64 +209,266 @@ class RequestService:
                 total_days=0,
                 total_hours=0,
                 status="Declined",
-                reason=reason,
-            )
-            return req, False, reason
-
-        # Check overlaps
-        for existing in store.list_requests(employee_id):
-            if RequestService._overlaps(
-                date.fromisoformat(start_iso),
-                date.fromisoformat(end_iso),
-                date.fromisoformat(existing.start_date),
-                date.fromisoformat(existing.end_date),
-            ):
-                reason = "Overlapping request exists"
-                req = VacationRequest(
-                    id=str(uuid.uuid4()),
-                    employee_id=employee_id,
-                    start_date=start_iso,
-                    end_date=end_iso,
-                    total_days=total_days,
-                    total_hours=total_hours,
-                    status="Declined",
-                    reason=reason,
-                )
-                return req, False, reason
-
-        # Check balance
-        current_balance = store.get_balance(employee_id)
-        if total_hours > current_balance:
-            reason = "Insufficient balance"
-            req = VacationRequest(
-                id=str(uuid.uuid4()),
-                employee_id=employee_id,
-                start_date=start_iso,
-                end_date=end_iso,
-                total_days=total_days,
-                total_hours=total_hours,
-                status="Declined",
-                reason=reason,
+                reason="No weekdays in requested range",
             )
-            return req, False, reason
 
-        # Approve and deduct
-        new_balance = current_balance - total_hours
-        store.set_balance(employee_id, new_balance)
-        req = VacationRequest(
+        return VacationRequest(
             id=str(uuid.uuid4()),
             employee_id=employee_id,
             start_date=start_iso,
             end_date=end_iso,
             total_days=total_days,
             total_hours=total_hours,
-            status="Approved",
-            reason=None,
+            status="Pending",
         )
-        store.add_request(employee_id, req)
-        logger.info("vacation_request_approved employee_id=%s id=%s hours=%s new_balance=%s", employee_id, req.id, total_hours, new_balance)
-        return req, True, None
+
+    @staticmethod
+    def _decide_locked(
+        req: VacationRequest,
+        balance: int,
+        has_overlap: Callable[[int, int], bool],
+        policy: AccrualPolicy,
+        booked: EmployeeIntervalIndex,
+    ) -> bool:
+        """Apply the overlap and balance rules to a Pending request, setting its status and reason.
+
+        ``has_overlap`` checks stored requests; ``booked`` holds ranges approved
+        earlier in the same batch and not stored yet. Declines are counted
+        here; the caller counts an approval once it is stored.
+        """
+        start_ordinal, end_ordinal = req.start_ordinal, req.end_ordinal
+        # Check overlaps
+        if has_overlap(start_ordinal, end_ordinal) or booked.overlaps(start_ordinal, end_ordinal):
+            req.status, req.reason = "Declined", "Overlapping request exists"
+            vacation_requests_decided.inc("Declined", "overlap")
+            return False
+
+        # Check balance; future-dated requests may also spend hours accrued by their start date
+        if req.total_hours > balance and not RequestService._covered_by_accrual(
+            policy, balance, start_ordinal, req.total_hours,
+        ):
+            req.status, req.reason = "Declined", "Insufficient balance"
+            vacation_requests_decided.inc("Declined", "insufficient_balance")
+            return False
+
+        req.status = "Approved"
+        return True
+
+    @staticmethod
+    def decide_pending(employee_id: str, pending: List[VacationRequest]) -> None:
+        """Decide one employee's queued requests in submission order with a single store write.
+
+        A request whose rules cannot be evaluated is declined on its own. If
+        the store write fails, nothing was stored, so every request in the
+        group is declined for resubmission rather than left looking approved.
+        """
+        with employee_locks.hold(employee_id):
+            try:
+                decided = RequestService._decide_and_store(employee_id, pending, isolate_failures=True)
+            except Exception:
+                logger.exception("approval_batch_failed employee_id=%s count=%s", employee_id, len(pending))
+                for req in pending:
+                    if req.status != "Declined":
+                        vacation_requests_decided.inc("Declined", "error")
+                    req.status, req.reason = "Declined", PROCESSING_FAILED_REASON
+                decided = [(req, None) for req in pending]
+            for req, balance_after in decided:
+                RequestService._publish("request.decided", req, balance_after)
+
+    @staticmethod
+    def _decide_and_store(
+        employee_id: str, pending: List[VacationRequest], isolate_failures: bool,
+    ) -> List[Tuple[VacationRequest, Optional[int]]]:
+        """Decide ``pending`` in order and store the approvals; returns (request, balance after it or None).
+
+        The caller holds the employee's lock. With ``isolate_failures`` a request
+        whose rules raise is declined on its own instead of failing the call.
+        """
+        # Read before the store transaction: the decision must not need a second connection
+        policy = store.get_accrual_policy(employee_id) or accrual_engine.default_policy
+        decided: List[Tuple[VacationRequest, Optional[int]]] = []
+
+        def decide(balance: int, has_overlap: Callable[[int, int], bool]) -> Tuple[int, List[VacationRequest]]:
+            booked = EmployeeIntervalIndex()
+            approved: List[VacationRequest] = []
+            for req in pending:
+                try:
+                    ok = RequestService._decide_locked(req, balance, has_overlap, policy, booked)
+                except Exception:
+                    if not isolate_failures:
+                        raise
+                    logger.exception("vacation_request_decide_failed employee_id=%s id=%s", employee_id, req.id)
+                    req.status, req.reason = "Declined", PROCESSING_FAILED_REASON
+                    vacation_requests_decided.inc("Declined", "error")
+                    ok = False
+                if ok:
+                    balance -= req.total_hours
+                    booked.add(req.start_ordinal, req.end_ordinal, req._id)
+                    approved.append(req)
+                    decided.append((req, balance))
+                else:
+                    decided.append((req, None))
+            return balance, approved
+
+        # Balance and approved requests land together (one transaction or journal record)
+        balance = store.approve(employee_id, decide)
+        approved_count = sum(1 for _, after in decided if after is not None)
+        if approved_count:
+            vacation_requests_decided.inc("Approved", "", amount=approved_count)
+            if len(pending) > 1:
+                logger.info(
+                    "vacation_requests_approved employee_id=%s count=%s new_balance=%s", employee_id, approved_count, balance,
+                )
+        return decided
+
+    @staticmethod
+    def _publish(event_type: str, req: VacationRequest, new_balance: Optional[int] = None) -> None:
+        # Change-feed events carry the balance (bounded as the API reports it) only when they changed it
+        if new_balance is None:
+            change_feed.publish(event_type, req.employee_id, request=req.as_api_dict())
+        else:
+            change_feed.publish(
+                event_type, req.employee_id, request=req.as_api_dict(), hoursAvailable=max(0, min(120, new_balance)),
+            )
+
+    @staticmethod
+    def _covered_by_accrual(policy: AccrualPolicy, current_balance: int, start_ordinal: int, total_hours: int) -> bool:
+        # ``policy`` is the stored one, so every worker decides alike; posting credits what this spends ahead
+        today = date.today().toordinal()
+        if start_ordinal <= today:
+            return False
+        as_of = date.fromordinal(min(start_ordinal, today + MAX_PROJECTION_DAYS))
+        return total_hours <= policy.project_one(current_balance, date.fromordinal(today), as_of)
+
+    @staticmethod
+    def cancel_request(employee_id: str, request_id: str) -> Optional[VacationRequest]:
+        """Remove an approved request and refund its hours; None if not found."""
+        with employee_locks.hold(employee_id):
+            return RequestService._cancel_request_locked(employee_id, request_id)
+
+    @staticmethod
+    async def cancel_request_async(employee_id: str, request_id: str) -> Optional[VacationRequest]:
+        if async_store.blocking:
+            return await async_store.run(RequestService.cancel_request, employee_id, request_id)
+        async with employee_locks.hold_async(employee_id):
+            return RequestService._cancel_request_locked(employee_id, request_id)
+
+    @staticmethod
+    def _cancel_request_locked(employee_id: str, request_id: str) -> Optional[VacationRequest]:
+        refunded = store.refund_request(employee_id, request_id)
+        if refunded is None:
+            return None
+        req, new_balance = refunded
+        RequestService._publish("request.cancelled", req, new_balance)
+        logger.info("vacation_request_cancelled employee_id=%s id=%s hours=%s new_balance=%s", employee_id, req.id, req.total_hours, new_balance)
+        return req
 
     @staticmethod
     def list_requests(employee_id: str) -> List[VacationRequest]:
         return store.list_requests(employee_id)
+
+    @staticmethod
+    async def list_requests_async(employee_id: str) -> List[VacationRequest]:
+        return await async_store.list_requests(employee_id)
+
+    @staticmethod
+    async def list_requests_json_async(employee_id: str, version: int) -> bytes:
+        """The employee's requests as a JSON array, serialized once per store version.
+
+        Read ``version`` before calling: a write racing with the read can then
+        only make the body newer than its version, never older.
+        """
+        cached = request_list_cache.get(employee_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        items = await async_store.list_requests(employee_id)
+        body = dumps([i.as_api_dict() for i in items])
+        request_list_cache.set(employee_id, (version, body))
+        return body
+
+    @staticmethod
+    def build_filter(from_iso: Optional[str] = None, to_iso: Optional[str] = None, status: Optional[str] = None) -> Optional[RequestFilter]:
+        """Filter for requests overlapping [from, to] and/or with the given status; ValueError on bad dates."""
+        if not (from_iso or to_iso or status):
+            return None
+        return RequestFilter(
+            start_ordinal=date.fromisoformat(from_iso).toordinal() if from_iso else None,
+            end_ordinal=date.fromisoformat(to_iso).toordinal() if to_iso else None,
+            status=status,
+        )
+
+    @staticmethod
+    def page_requests(
+        employee_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: Optional[RequestFilter] = None,
+    ) -> Tuple[List[VacationRequest], Optional[str]]:
+        """One page of requests in submission order plus the opaque cursor for the next page."""
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        after_seq = _decode_cursor(cursor) if cursor else 0
+        items, next_seq = store.page_requests(employee_id, after_seq, limit, filters)
+        return items, (_encode_cursor(next_seq) if next_seq is not None else None)
+
+    @staticmethod
+    async def page_requests_async(
+        employee_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: Optional[RequestFilter] = None,
+    ) -> Tuple[List[VacationRequest], Optional[str]]:
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        after_seq = _decode_cursor(cursor) if cursor else 0
+        items, next_seq = await async_store.page_requests(employee_id, after_seq, limit, filters)
+        return items, (_encode_cursor(next_seq) if next_seq is not None else None)
+
+    @staticmethod
+    def iter_requests(
+        employee_id: str,
+        cursor: Optional[str] = None,
+        filters: Optional[RequestFilter] = None,
+    ) -> Iterator[VacationRequest]:
+        """Iterate every matching request page by page, never holding the whole history.
+
+        The cursor is validated up front so a bad one raises ValueError here
+        rather than midway through a streamed response.
+        """
+        after_seq = _decode_cursor(cursor) if cursor else 0
+
+        def pages() -> Iterator[VacationRequest]:
+            next_seq: Optional[int] = after_seq
+            while next_seq is not None:
+                items, next_seq = store.page_requests(employee_id, next_seq, STREAM_PAGE_SIZE, filters)
+                yield from items
+
+        return pages()
+
+    @staticmethod
+    def iter_requests_async(
+        employee_id: str,
+        cursor: Optional[str] = None,
+        filters: Optional[RequestFilter] = None,
+    ) -> AsyncIterator[VacationRequest]:
+        """Async ``iter_requests``: pages are fetched without blocking the event loop."""
+        after_seq = _decode_cursor(cursor) if cursor else 0
+
+        async def pages() -> AsyncIterator[VacationRequest]:
+            next_seq: Optional[int] = after_seq
+            while next_seq is not None:
+                items, next_seq = await async_store.page_requests(employee_id, next_seq, STREAM_PAGE_SIZE, filters)
+                for item in items:
+                    yield item
+
+        return pages()
+
+
+# Decides requests submitted in queued mode (APPROVAL_MODE=queued or ``Prefer: respond-async``)
+approval_queue = ApprovalQueue(
+    RequestService.decide_pending,
+    max_batch=int(os.getenv(APPROVAL_MAX_BATCH_ENV, "500")),
+    max_pending=int(os.getenv(APPROVAL_MAX_PENDING_ENV, "100000")),
+    result_ttl=float(os.getenv(APPROVAL_RESULT_TTL_ENV, "3600")),
+)
+QUEUED_APPROVAL = os.getenv(APPROVAL_MODE_ENV, "sync").strip().lower() == "queued"
@@ -0,0 +1,5 @@
+import os
+
+# Tests share one API key across many REST calls; keep the per-key quota out of the way.
+os.environ.setdefault("API_KEY", "devkey")
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "100000")
@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.accrual import AccrualEngine, AccrualPolicy, accrual_dates
+from src.lib.store import InMemoryStore, store
+from src.services import balance_service
+from src.services.balance_service import BalanceService
+from src.services.change_feed import change_feed
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey"}
+
+
+def setup_module(module):
+    BalanceService.seed_balance("accrue-amy", 0)
+    BalanceService.seed_balance("accrue-bo", 40)
+
+
+def _first_weekday_of_month(months_ahead: int) -> date:
+    today = date.today()
+    month = today.month - 1 + months_ahead
+    d = date(today.year + month // 12, month % 12 + 1, 1)
+    while d.weekday() >= 5:
+        d += timedelta(days=1)
+    return d
+
+
+def test_accrual_dates_are_month_starts_after_today():
+    days = list(accrual_dates(date(2030, 11, 15), date(2031, 2, 1)))
+    assert days == [date(2030, 12, 1), date(2031, 1, 1), date(2031, 2, 1)]
+    assert list(accrual_dates(date(2030, 11, 1), date(2030, 11, 30))) == []
+
+
+def test_projection_applies_rate_cap_and_carry_over():
+    engine = AccrualEngine()
+    engine.set_policy("steady", AccrualPolicy(hours_per_month=8))
+    engine.set_policy("capped", AccrualPolicy(hours_per_month=10, cap_hours=100))
+    engine.set_policy("carry", AccrualPolicy(hours_per_month=8, carry_over_hours=40))
+    balances = {"steady": 16, "capped": 95, "carry": 60, "default": 30, "over-cap": 150}
+    projected = engine.project(balances, date(2031, 2, 15), today=date(2030, 11, 20))
+    # Accrual on Dec 1, Jan 1 and Feb 1; carry-over trims to 40 before the January accrual
+    assert projected.tolist() == [40.0, 100.0, 56.0, 30.0, 150.0]
+    assert engine.get_policy("nobody") == AccrualPolicy()
+
+    engine.set_policy("carry", None)
+    assert engine.project_one("carry", 60, date(2031, 2, 15), today=date(2030, 11, 20)) == 60.0
+    with pytest.raises(ValueError, match="past"):
+        engine.project(balances, date(2030, 1, 1), today=date(2030, 11, 20))
+    with pytest.raises(ValueError):
+        AccrualPolicy(hours_per_month=-1)
+
+
+def test_policy_columns_grow():
+    engine = AccrualEngine(capacity=2)
+    for i in range(10):
+        engine.set_policy(f"e{i}", AccrualPolicy(hours_per_month=i))
+    projected = engine.project({f"e{i}": 0 for i in range(10)}, date(2031, 1, 1), today=date(2030, 12, 31))
+    np.testing.assert_array_equal(projected, np.arange(10, dtype=float))
+
+
+def test_future_requests_can_spend_projected_accrual():
+    resp = client.put("/employees/accrue-amy/accrual-policy", json={"hoursPerMonth": 8}, headers=AUTH)
+    assert resp.status_code == 200
+    start = _first_weekday_of_month(3)
+    body = {"employeeId": "accrue-amy", "startDate": start.isoformat(), "endDate": start.isoformat()}
+    assert client.post("/vacation-requests", json=body, headers=AUTH).json()["status"] == "Approved"
+    # 3 accruals by then, 8 hours already spent
+    week = {"employeeId": "accrue-amy", "startDate": (start + timedelta(days=7)).isoformat(),
+            "endDate": (start + timedelta(days=11)).isoformat()}
+    declined = client.post("/vacation-requests", json=week, headers=AUTH).json()
+    assert declined["status"] == "Declined"
+    assert declined["reason"] == "Insufficient balance"
+
+
+def test_policies_are_stored_for_every_worker():
+    client.put("/employees/accrue-cy/accrual-policy", json={"hoursPerMonth": 6, "carryOverHours": 24}, headers=AUTH)
+    assert store.get_accrual_policy("accrue-cy") == AccrualPolicy(hours_per_month=6, carry_over_hours=24)
+
+
+def test_posting_credits_accrual_spent_ahead(monkeypatch):
+    fresh = InMemoryStore()
+    monkeypatch.setattr(balance_service, "store", fresh)
+    fresh.set_accrual_policy("ahead", AccrualPolicy(hours_per_month=8, carry_over_hours=40))
+    fresh.set_accrual_policy("capped", AccrualPolicy(hours_per_month=8, cap_hours=100))
+    # A future-dated approval spent three months of accrual ahead of time
+    fresh.bulk_load({"ahead": -24, "capped": 96, "idle": 30}, [])
+
+    # The first run only records where posting starts
+    assert BalanceService.post_accruals(date(2030, 10, 15)) == {}
+    assert fresh.get_balance("ahead") == -24
+
+    start = change_feed.last_seq
+    assert BalanceService.post_accruals(date(2031, 1, 2)) == {"ahead": 0, "capped": 100}
+    assert fresh.all_balances() == {"ahead": 0, "capped": 100, "idle": 30}
+    assert [t for _, t, _ in change_feed.events_after(start)] == ["balance.accrued", "balance.accrued"]
+
+    # Posting again for days already credited changes nothing
+    assert BalanceService.post_accruals(date(2031, 1, 20)) == {}
+    assert fresh.accrued_through() == date(2031, 1, 20).toordinal()
+
+
+def test_posting_applies_carry_over_before_january_accrual(monkeypatch):
+    fresh = InMemoryStore()
+    monkeypatch.setattr(balance_service, "store", fresh)
+    fresh.set_accrual_policy("carry", AccrualPolicy(hours_per_month=8, carry_over_hours=40))
+    fresh.set_balance("carry", 60)
+    BalanceService.post_accruals(date(2030, 11, 20))
+    # Dec 1: 68; Jan 1: cut to 40, then 48; Feb 1: 56 — as the approval-time projection assumed
+    assert BalanceService.post_accruals(date(2031, 2, 15)) == {"carry": 56}
+    assert AccrualPolicy(hours_per_month=8, carry_over_hours=40).project_one(
+        60, date(2030, 11, 20), date(2031, 2, 15)) == 56.0
+
+
+def test_projection_report_and_tool():
+    client.put("/employees/accrue-bo/accrual-policy", json={"hoursPerMonth": 10, "capHours": 60}, headers=AUTH)
+    as_of = _first_weekday_of_month(2).isoformat()
+    report = client.get("/balances/projected", params={"asOf": as_of, "ids": "accrue-bo"}, headers=AUTH).json()
+    assert report == [{"employeeId": "accrue-bo", "hoursAvailable": 40, "projectedHours": 60.0}]
+    everyone = client.get("/balances/projected", params={"asOf": as_of}, headers=AUTH).json()
+    assert {"employeeId": "accrue-bo", "hoursAvailable": 40, "projectedHours": 60.0} in everyone
+    assert client.get("/balances/projected", params={"asOf": "2001-01-01"}, headers=AUTH).status_code == 400
+
+    call = {"name": "projected_balance", "arguments": {"employeeId": "accrue-bo", "date": as_of}}
+    text = client.post("/mcp/tools/call", json=call).json()["content"][0]["text"]
+    assert text == f"Employee accrue-bo is projected to have 60 hours of vacation available on {as_of} (40 hours available now)."
+
+
+def test_projections_read_policies_another_worker_stored():
+    BalanceService.seed_balance("accrue-di", 10)
+    # Written straight to the store, as a policy set through another worker would be
+    store.set_accrual_policy("accrue-di", AccrualPolicy(hours_per_month=5))
+    as_of = _first_weekday_of_month(2).isoformat()
+    report = client.get("/balances/projected", params={"asOf": as_of, "ids": "accrue-di"}, headers=AUTH).json()
+    assert report == [{"employeeId": "accrue-di", "hoursAvailable": 10, "projectedHours": 20.0}]
+    call = {"name": "projected_balance", "arguments": {"employeeId": "accrue-di", "date": as_of}}
+    assert "projected to have 20 hours" in client.post("/mcp/tools/call", json=call).json()["content"][0]["text"]
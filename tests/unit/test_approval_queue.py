@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.store import store
+from src.services.approval_queue import PROCESSING_FAILED_REASON, ApprovalQueue
+from src.services.balance_service import BalanceService
+from src.services.change_feed import change_feed
+from src.services.request_service import RequestService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey"}
+ASYNC = {**AUTH, "Prefer": "respond-async"}
+
+
+def setup_module(module):
+    BalanceService.seed_balance("queue-quinn", 40)
+    BalanceService.seed_balance("queue-rae", 16)
+    BalanceService.seed_balance("queue-sid", 80)
+
+
+def test_respond_async_accepts_pending_then_decides():
+    body = {"employeeId": "queue-quinn", "startDate": "2033-03-07", "endDate": "2033-03-09"}
+    resp = client.post("/vacation-requests", json=body, headers=ASYNC)
+    assert resp.status_code == 202
+    # The worker may decide before the response is written
+    assert resp.json()["status"] in ("Pending", "Approved")
+    assert resp.headers["Preference-Applied"] == "respond-async"
+    location = resp.headers["Location"]
+    assert location == f"/vacation-requests/{resp.json()['id']}"
+
+    decided = client.get(location, params={"wait": 5}, headers={**AUTH, "X-Employee-Id": "queue-quinn"}).json()
+    assert decided["status"] == "Approved"
+    assert decided["totalHours"] == 24
+    assert store.get_balance("queue-quinn") == 16
+    # Still found once it is only in the store
+    approval = RequestService.get_request_async("queue-quinn", decided["id"])
+    assert asyncio.run(approval).status == "Approved"
+    assert client.get(location, headers={**AUTH, "X-Employee-Id": "someone-else"}).status_code == 404
+
+
+def test_unusable_dates_are_declined_without_queueing():
+    body = {"employeeId": "queue-quinn", "startDate": "2033-03-12", "endDate": "2033-03-13"}
+    resp = client.post("/vacation-requests", json=body, headers=ASYNC)
+    assert resp.status_code == 201
+    assert resp.json()["status"] == "Declined"
+
+
+def test_batch_applies_rules_in_submission_order():
+    decided_batches = []
+
+    def decide(employee_id, requests):
+        decided_batches.append((employee_id, len(requests)))
+        RequestService.decide_pending(employee_id, requests)
+
+    queue = ApprovalQueue(decide)
+    items = [
+        RequestService.prepare_request("queue-rae", "2033-05-02", "2033-05-02"),  # 8h: approved
+        RequestService.prepare_request("queue-rae", "2033-05-02", "2033-05-03"),  # overlaps the first
+        RequestService.prepare_request("queue-rae", "2033-05-09", "2033-05-10"),  # 16h > 8h left
+        RequestService.prepare_request("queue-sid", "2033-05-02", "2033-05-06"),
+    ]
+    for item in items:
+        queue.submit(item)
+    # Closing decides everything already queued
+    queue.close()
+
+    assert [r.status for r in items] == ["Approved", "Declined", "Declined", "Approved"]
+    assert [r.reason for r in items[1:3]] == ["Overlapping request exists", "Insufficient balance"]
+    assert store.get_balance("queue-rae") == 8
+    assert [r.id for r in store.list_requests("queue-rae")] == [items[0].id]
+    assert queue.status(items[2].id) is items[2]
+    assert sum(count for _, count in decided_batches) == 4
+    assert len(queue) == 0
+
+
+def test_failures_decline_instead_of_reporting_unstored_approvals(monkeypatch):
+    BalanceService.seed_balance("queue-tess", 40)
+    BalanceService.seed_balance("queue-uma", 40)
+    bad = RequestService.prepare_request("queue-tess", "2033-06-08", "2033-06-08")
+    real_approve = store.approve
+
+    def approve(employee_id, decide):
+        def decide_with_failing_check(balance, has_overlap):
+            def check(start_ordinal, end_ordinal):
+                if start_ordinal == bad.start_ordinal:
+                    raise RuntimeError("boom")
+                return has_overlap(start_ordinal, end_ordinal)
+            return decide(balance, check)
+        return real_approve(employee_id, decide_with_failing_check)
+
+    monkeypatch.setattr(store, "approve", approve)
+    good = RequestService.prepare_request("queue-tess", "2033-06-06", "2033-06-06")
+    start = change_feed.last_seq
+    # One request that cannot be evaluated does not sink the rest of the group
+    RequestService.decide_pending("queue-tess", [good, bad])
+    assert (good.status, bad.status) == ("Approved", "Declined")
+    assert bad.reason == PROCESSING_FAILED_REASON
+    assert store.get_balance("queue-tess") == 32
+
+    def bulk_load(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store, "bulk_load", bulk_load)
+    unstored = [RequestService.prepare_request("queue-uma", day, day) for day in ("2033-06-06", "2033-06-07")]
+    RequestService.decide_pending("queue-uma", unstored)
+    assert [(r.status, r.reason) for r in unstored] == [("Declined", PROCESSING_FAILED_REASON)] * 2
+    assert store.get_balance("queue-uma") == 40
+    assert store.list_requests("queue-uma") == []
+
+    events = [json.loads(payload) for _, _, payload in change_feed.events_after(start)]
+    decided = [(e["request"]["id"], e["request"]["status"]) for e in events if e["type"] == "request.decided"]
+    assert decided == [(good.id, "Approved"), (bad.id, "Declined")] + [(r.id, "Declined") for r in unstored]
+
+
+def test_queue_declines_the_whole_group_when_decide_raises():
+    def decide(employee_id, requests):
+        requests[0].status = "Approved"
+        raise RuntimeError("store unavailable")
+
+    queue = ApprovalQueue(decide)
+    items = [RequestService.prepare_request("queue-rae", day, day) for day in ("2033-07-04", "2033-07-05")]
+    for item in items:
+        queue.submit(item)
+    queue.close()
+    assert [(r.status, r.reason) for r in items] == [("Declined", PROCESSING_FAILED_REASON)] * 2
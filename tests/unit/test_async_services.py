@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.lib import async_store as async_store_module
+from src.lib.sqlite_store import SQLiteStore
+from src.lib.store import InMemoryStore
+from src.services import balance_service, request_service
+from src.services.balance_service import BalanceService
+from src.services.request_service import RequestService
+
+
+class SlowStore(InMemoryStore):
+    blocking = True
+
+    def get_balance(self, employee_id):
+        time.sleep(0.2)
+        return super().get_balance(employee_id)
+
+
+@pytest.fixture
+def backend(monkeypatch, request):
+    def use(store):
+        monkeypatch.setattr(async_store_module.async_store, "backend", store)
+        monkeypatch.setattr(balance_service, "store", store)
+        monkeypatch.setattr(request_service, "store", store)
+        return store
+    return use
+
+
+def test_memory_store_runs_inline(backend):
+    store = backend(InMemoryStore())
+    store.set_balance("inline", 40)
+    seen = []
+    original = store.get_balance
+    store.get_balance = lambda e: seen.append(threading.current_thread()) or original(e)
+    assert asyncio.run(BalanceService.get_balance_hours_async("inline")) == 40
+    assert seen == [threading.main_thread()]
+
+
+def test_blocking_store_does_not_block_the_loop(backend):
+    store = backend(SlowStore())
+    store.set_balance("slow", 16)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        hours = await asyncio.gather(*(BalanceService.get_balance_hours_async("slow") for _ in range(10)))
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        return hours, elapsed, ticks
+
+    hours, elapsed, ticks = asyncio.run(scenario())
+    assert hours == [16] * 10
+    assert elapsed < 1.0  # ten 0.2 s calls overlapped on worker threads
+    assert ticks >= 5
+
+
+def test_async_request_flow_on_sqlite(backend, tmp_path):
+    store = backend(SQLiteStore(str(tmp_path / "async.db")))
+    store.set_balance("sq", 16)
+
+    async def scenario():
+        results = await asyncio.gather(*(
+            RequestService.create_request_async("sq", day, day)
+            for day in ("2039-03-07", "2039-03-08", "2039-03-09")
+        ))
+        items, cursor = await RequestService.page_requests_async("sq", None, 1)
+        streamed = [r.id async for r in RequestService.iter_requests_async("sq", cursor)]
+        cancelled = await RequestService.cancel_request_async("sq", items[0].id)
+        return results, items, streamed, cancelled
+
+    results, items, streamed, cancelled = asyncio.run(scenario())
+    # 16 hours cover two single days; the per-employee lock keeps the third from overdrawing
+    assert sorted(ok for _, ok, _ in results) == [False, True, True]
+    assert len(items) == 1 and len(streamed) == 1
+    assert cancelled.id == items[0].id
+    assert store.get_balance("sq") == 8
+    store.close()
@@ -0,0 +1,127 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.journal import JournaledStore
+from src.lib.sqlite_store import SQLiteStore
+from src.lib.store import InMemoryStore, VacationRequest
+from src.services.balance_service import BalanceService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey"}
+
+
+def setup_module(module):
+    for employee_id in ("avail-ann", "avail-ben", "avail-cat"):
+        BalanceService.seed_balance(employee_id, 80)
+
+
+def _ordinal(iso: str) -> int:
+    return date.fromisoformat(iso).toordinal()
+
+
+def _request(request_id: str, employee_id: str, start: str, end: str, status: str = "Approved") -> VacationRequest:
+    return VacationRequest(
+        id=request_id,
+        employee_id=employee_id,
+        start_date=start,
+        end_date=end,
+        total_days=1,
+        total_hours=8,
+        status=status,
+    )
+
+
+@pytest.fixture(params=["memory", "sqlite", "journal"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryStore()
+    elif request.param == "sqlite":
+        s = SQLiteStore(str(tmp_path / "store.db"))
+        yield s
+        s.close()
+    else:
+        s = JournaledStore(str(tmp_path / "journal"), snapshot_interval=3600)
+        yield s
+        s.close()
+
+
+def _who(backend, start, end, team=None):
+    return [(r.id, t) for r, t in backend.absentees(_ordinal(start), _ordinal(end), team)]
+
+
+def test_absentees_by_day_range_and_team(backend):
+    backend.set_team("gus", "platform")
+    backend.add_request("gus", _request("r-gus", "gus", "2031-03-03", "2031-03-07"))
+    backend.add_request("hal", _request("r-hal", "hal", "2031-03-06", "2031-03-10"))
+    backend.add_request("ivy", _request("r-ivy", "ivy", "2031-03-05", "2031-03-05", status="Declined"))
+    backend.bulk_load({}, [_request("r-jo", "jo", "2031-03-04", "2031-03-04")], {"jo": "platform"})
+
+    assert _who(backend, "2031-03-05", "2031-03-05") == [("r-gus", "platform")]
+    assert _who(backend, "2031-03-01", "2031-03-31") == [("r-gus", "platform"), ("r-hal", None), ("r-jo", "platform")]
+    assert _who(backend, "2031-03-06", "2031-03-06", team="platform") == [("r-gus", "platform")]
+    assert _who(backend, "2031-03-11", "2031-03-20") == []
+
+    # Team changes and cancellations are reflected immediately
+    backend.set_team("hal", "platform")
+    backend.set_team("gus", None)
+    assert backend.get_team("gus") is None
+    assert _who(backend, "2031-03-06", "2031-03-06", team="platform") == [("r-hal", "platform")]
+    backend.remove_request("hal", "r-hal")
+    assert _who(backend, "2031-03-01", "2031-03-31", team="platform") == [("r-jo", "platform")]
+
+
+def test_journal_recovers_teams_and_absences(tmp_path):
+    directory = str(tmp_path / "journal")
+    s = JournaledStore(directory, snapshot_interval=3600)
+    s.set_team("kim", "support")
+    s.add_request("kim", _request("r-kim", "kim", "2031-04-01", "2031-04-02"))
+    s.snapshot()
+    s.set_team("lee", "support")
+    s.add_request("lee", _request("r-lee", "lee", "2031-04-02", "2031-04-02"))
+    s.close()
+
+    recovered = JournaledStore(directory, snapshot_interval=3600)
+    try:
+        assert _who(recovered, "2031-04-02", "2031-04-02", team="support") == [
+            ("r-kim", "support"), ("r-lee", "support"),
+        ]
+    finally:
+        recovered.close()
+
+
+def test_absences_endpoint():
+    assert client.put("/employees/avail-ann/team", json={"team": " design "}, headers=AUTH).json() == {
+        "employeeId": "avail-ann", "team": "design",
+    }
+    for employee_id, start, end in (
+        ("avail-ann", "2031-06-02", "2031-06-04"),
+        ("avail-ben", "2031-06-03", "2031-06-03"),
+    ):
+        body = {"employeeId": employee_id, "startDate": start, "endDate": end}
+        assert client.post("/vacation-requests", json=body, headers=AUTH).json()["status"] == "Approved"
+
+    day = client.get("/absences", params={"from": "2031-06-03"}, headers=AUTH).json()
+    assert [(a["employeeId"], a["team"]) for a in day] == [("avail-ann", "design"), ("avail-ben", None)]
+    team = client.get("/absences", params={"from": "2031-06-01", "to": "2031-06-30", "team": "design"}, headers=AUTH)
+    assert [a["employeeId"] for a in team.json()] == ["avail-ann"]
+    assert team.json()[0]["startDate"] == "2031-06-02"
+
+    assert client.get("/absences", params={"from": "2031-06-05", "to": "2031-06-01"}, headers=AUTH).status_code == 400
+    assert client.get("/absences", params={"from": "2031-01-01", "to": "2032-06-01"}, headers=AUTH).status_code == 400
+    assert client.get("/absences", params={"from": "2031-06-03"}).status_code in (401, 403)
+
+
+def test_who_is_out_tool():
+    client.put("/employees/avail-cat/team", json={"team": "ops"}, headers=AUTH)
+    body = {"employeeId": "avail-cat", "startDate": "2031-07-07", "endDate": "2031-07-08"}
+    client.post("/vacation-requests", json=body, headers=AUTH)
+
+    call = {"name": "who_is_out", "arguments": {"date": "2031-07-08", "group": "ops"}}
+    text = client.post("/mcp/tools/call", json=call).json()["content"][0]["text"]
+    assert text == "Out in team ops on 2031-07-08 (1):\n  - avail-cat: 2031-07-07 to 2031-07-08 (2 days)"
+    call = {"name": "who_is_out", "arguments": {"start_date": "2031-07-09", "end_date": "2031-07-10"}}
+    text = client.post("/mcp/tools/call", json=call).json()["content"][0]["text"]
+    assert text == "Nobody is out on 2031-07-09 to 2031-07-10"
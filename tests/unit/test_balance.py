@@ -15,7 +15,7 @@ def test_balance_bounds_and_route():
     assert BalanceService.get_balance_hours("alice") == 120
     resp = client.get(
         "/balance",
-        headers={"X-API-Key": "devkey", "X-Employee-Id": "alice"},
+        headers={"Authorization": "Bearer devkey", "X-Employee-Id": "alice"},
     )
     assert resp.status_code == 200
     assert 0 <= resp.json()["hoursAvailable"] <= 120
@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.services.balance_service import BalanceService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey"}
+
+
+def setup_module(module):
+    BalanceService.seed_balance("bulk-a", 24)
+    BalanceService.seed_balance("bulk-b", 500)
+
+
+def test_bulk_balances():
+    resp = client.get("/balances?ids=bulk-a,bulk-b&ids=bulk-unknown", headers=AUTH)
+    assert resp.status_code == 200
+    assert resp.json() == [
+        {"employeeId": "bulk-a", "hoursAvailable": 24},
+        {"employeeId": "bulk-b", "hoursAvailable": 120},
+        {"employeeId": "bulk-unknown", "hoursAvailable": 0},
+    ]
+    assert client.get("/balances?ids=", headers=AUTH).status_code == 400
+    assert client.get("/balances?ids=bulk-a").status_code == 403
+
+
+def test_bulk_request_submission_keeps_order_per_employee():
+    payload = [
+        {"employeeId": "bulk-a", "startDate": "2033-05-02", "endDate": "2033-05-03"},
+        {"employeeId": "bulk-b", "startDate": "2033-05-02", "endDate": "2033-05-02"},
+        {"employeeId": "bulk-a", "startDate": "2033-05-03", "endDate": "2033-05-03"},
+        {"employeeId": "bulk-a", "startDate": "2033-05-09", "endDate": "2033-05-09"},
+        {"employeeId": "bulk-a", "startDate": "2033-05-10", "endDate": "2033-05-10"},
+        {"employeeId": "bulk-b", "startDate": "2033-05-08", "endDate": "2033-05-07"},
+    ]
+    resp = client.post("/vacation-requests/batch", json=payload, headers=AUTH)
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [r["employeeId"] for r in results] == [p["employeeId"] for p in payload]
+    assert [r["status"] for r in results] == ["Approved", "Approved", "Declined", "Approved", "Declined", "Declined"]
+    assert results[2]["reason"] == "Overlapping request exists"
+    assert results[4]["reason"] == "Insufficient balance"
+    assert results[5]["reason"] == "end date before start date"
+    assert BalanceService.get_balances_hours(["bulk-a"]) == {"bulk-a": 0}
@@ -0,0 +1,201 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import app as app_module
+from src.app import app
+from src.services.balance_service import BalanceService
+from src.services.change_feed import ChangeFeed, ChangeFeedFull, ChangeFeedGap, change_feed, feed_stream
+from src.services.request_service import RequestService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey"}
+
+
+def setup_module(module):
+    BalanceService.seed_balance("feed-fay", 40)
+
+
+async def _read_changes(query: str, headers: dict, until, on_chunk=None, timeout: float = 5.0) -> str:
+    """Drive GET /changes at the ASGI level, since TestClient buffers whole (here endless) bodies."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/changes", "raw_path": b"/changes", "query_string": query.encode(), "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in {**AUTH, **headers}.items()],
+        "client": ("testclient", 50000), "server": ("testserver", 80),
+    }
+    body = bytearray()
+    stop = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await stop.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+            if on_chunk:
+                on_chunk(body.decode())
+            if until(body.decode()):
+                stop.set()
+
+    task = asyncio.create_task(app(scope, receive, send))
+    await asyncio.wait_for(stop.wait(), timeout)
+    await asyncio.wait_for(task, timeout)
+    return body.decode()
+
+
+def test_ring_buffer_retention_and_cursors():
+    feed = ChangeFeed(retention=3)
+    for hours in range(5):
+        feed.publish("balance.set", "e", hoursAvailable=hours)
+    assert [seq for seq, _, _ in feed.events_after(2)] == [3, 4, 5]
+    assert [seq for seq, _, _ in feed.events_after(2, limit=2)] == [3, 4]
+    assert feed.events_after(5) == []
+    with pytest.raises(ChangeFeedGap):
+        feed.events_after(1)
+    with pytest.raises(ChangeFeedGap):
+        feed.check_resume(6)
+
+    assert feed.parse_cursor(f"{feed.epoch}-4") == 4
+    assert feed.parse_cursor("4") == 4
+    with pytest.raises(ChangeFeedGap):
+        feed.parse_cursor("0000feed-4")
+    with pytest.raises(ValueError):
+        feed.parse_cursor("latest")
+    event = json.loads(feed.events_after(4)[0][2])
+    assert event["id"] == f"{feed.epoch}-5"
+    assert (event["type"], event["employeeId"], event["hoursAvailable"]) == ("balance.set", "e", 4)
+
+
+def test_slow_subscriber_is_reset_instead_of_buffered():
+    feed = ChangeFeed(retention=2)
+    feed.publish("balance.set", "e", hoursAvailable=1)
+
+    async def read_two():
+        stream = feed_stream(feed, 0, sse=False, keepalive=1)
+        first = await stream.__anext__()
+        # The subscriber stalls while more is published than the buffer keeps
+        for hours in range(2, 5):
+            feed.publish("balance.set", "e", hoursAvailable=hours)
+        second = await stream.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        return first, second
+
+    first, second = asyncio.run(read_two())
+    assert json.loads(first)["seq"] == 1
+    reset = json.loads(second)
+    assert (reset["type"], reset["seq"]) == ("feed.reset", 1)
+    assert feed.subscribers == 0
+
+
+def test_wait_returns_events_published_before_it_and_cleans_up():
+    feed = ChangeFeed(retention=10)
+
+    async def scenario():
+        assert await feed.wait(0, 0.01) == []
+        assert feed._waiters == []
+        # Published between a reader's last check and its wait: delivered at once, not after the timeout
+        feed.publish("balance.set", "e", hoursAvailable=1)
+        return await asyncio.wait_for(feed.wait(0, 60), 1)
+
+    assert [seq for seq, _, _ in asyncio.run(scenario())] == [1]
+
+
+def test_subscriber_slots_are_reserved_before_streaming():
+    feed = ChangeFeed(retention=10, max_subscribers=2)
+    first = feed_stream(feed, 0, sse=False, keepalive=1)
+    second = feed_stream(feed, 0, sse=False, keepalive=1)
+    # Neither stream has been read yet, but both slots are taken
+    with pytest.raises(ChangeFeedFull):
+        feed_stream(feed, 0, sse=False, keepalive=1)
+    assert feed.subscribers == 2
+    # A stream dropped before its first read gives its slot back
+    del first
+    assert feed.subscribers == 1
+
+    async def read_one():
+        feed.publish("balance.set", "e", hoursAvailable=1)
+        chunk = await second.__anext__()
+        await second.aclose()
+        return chunk
+
+    assert json.loads(asyncio.run(read_one()))["seq"] == 1
+    assert feed.subscribers == 0
+
+
+def test_services_publish_request_and_balance_events():
+    start = change_feed.last_seq
+    body = {"employeeId": "feed-fay", "startDate": "2035-03-05", "endDate": "2035-03-06"}
+    approved = client.post("/vacation-requests", json=body, headers=AUTH).json()
+    declined = client.post("/vacation-requests", json=body, headers=AUTH).json()
+    RequestService.cancel_request("feed-fay", approved["id"])
+    BalanceService.seed_balance("feed-fay", 40)
+    queued = client.post("/vacation-requests", json={**body, "startDate": "2035-03-12", "endDate": "2035-03-12"},
+                         headers={**AUTH, "Prefer": "respond-async"}).json()
+    assert client.get(f"/vacation-requests/{queued['id']}", params={"wait": 5},
+                      headers={**AUTH, "X-Employee-Id": "feed-fay"}).json()["status"] == "Approved"
+
+    events = [json.loads(payload) for _, _, payload in change_feed.events_after(start)]
+    mine = [e for e in events if e["employeeId"] == "feed-fay"]
+    assert [(e["type"], e.get("request", {}).get("id"), e.get("hoursAvailable")) for e in mine] == [
+        ("request.created", approved["id"], 24),
+        ("request.created", declined["id"], None),
+        ("request.cancelled", approved["id"], 40),
+        ("balance.set", None, 40),
+        ("request.created", queued["id"], None),
+        ("request.decided", queued["id"], 32),
+    ]
+    assert mine[1]["request"]["reason"] == "Overlapping request exists"
+    assert mine[4]["request"]["status"] == "Pending"
+    assert [e["seq"] for e in events] == list(range(start + 1, change_feed.last_seq + 1))
+
+
+def test_ndjson_stream_resumes_then_delivers_live_events(monkeypatch):
+    monkeypatch.setattr(app_module, "CHANGE_FEED_KEEPALIVE_SECONDS", 0.05)
+    BalanceService.seed_balance("feed-fay", 10)
+    missed = change_feed.last_seq
+    BalanceService.seed_balance("feed-fay", 11)
+    pushed = []
+
+    def on_chunk(text):
+        if not pushed and '"hoursAvailable":11' in text:
+            pushed.append(BalanceService.seed_balance("feed-fay", 12))
+
+    body = asyncio.run(_read_changes(
+        f"after={change_feed.epoch}-{missed}", {},
+        lambda text: '"hoursAvailable":12' in text and "heartbeat" in text, on_chunk,
+    ))
+    lines = [json.loads(line) for line in body.splitlines()]
+    hours = [e["hoursAvailable"] for e in lines if e["type"] == "balance.set" and e["employeeId"] == "feed-fay"]
+    assert hours == [11, 12]
+    assert lines[0]["seq"] == missed + 1
+    assert lines[-1] == {"type": "heartbeat", "seq": change_feed.last_seq}
+
+
+def test_sse_stream_uses_event_ids_for_last_event_id():
+    BalanceService.seed_balance("feed-fay", 20)
+    last = change_feed.last_seq
+    BalanceService.seed_balance("feed-fay", 21)
+    headers = {"Accept": "text/event-stream", "Last-Event-ID": f"{change_feed.epoch}-{last}"}
+    body = asyncio.run(_read_changes("", headers, lambda text: "\n\n" in text))
+    block = body.split("\n\n")[0].splitlines()
+    assert block[:2] == [f"id: {change_feed.epoch}-{last + 1}", "event: balance.set"]
+    assert json.loads(block[2].removeprefix("data: "))["hoursAvailable"] == 21
+
+
+def test_unusable_cursors_are_rejected():
+    assert client.get("/changes", params={"after": "0000feed-1"}, headers=AUTH).status_code == 410
+    assert client.get("/changes", params={"after": str(change_feed.last_seq + 10)}, headers=AUTH).status_code == 410
+    assert client.get("/changes", params={"after": "soon"}, headers=AUTH).status_code == 400
+    assert client.get("/changes").status_code in (401, 403)
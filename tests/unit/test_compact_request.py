@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.store import RequestStatus, VacationRequest, store
+from src.services.balance_service import BalanceService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey"}
+
+
+def _make(**overrides):
+    fields = dict(
+        id=str(uuid.uuid4()),
+        employee_id="compact",
+        start_date="2030-03-04",
+        end_date="2030-03-08",
+        total_days=5,
+        total_hours=40,
+        status="Approved",
+        reason=None,
+    )
+    fields.update(overrides)
+    return VacationRequest(**fields)
+
+
+def test_round_trips_public_fields():
+    rid = str(uuid.uuid4())
+    r = _make(id=rid)
+    assert not hasattr(r, "__dict__")
+    assert (r.id, r.start_date, r.end_date, r.status) == (rid, "2030-03-04", "2030-03-08", "Approved")
+    assert isinstance(r._id, bytes) and len(r._id) == 16
+    assert r._status is RequestStatus.Approved
+    assert r.start_ordinal + 4 == r.end_ordinal
+    assert r.as_api_dict()["startDate"] == "2030-03-04"
+    assert r == VacationRequest(rid, "compact", "2030-03-04", "2030-03-08", 5, 40, "Approved")
+    assert "2030-03-04" in repr(r)
+
+
+def test_keeps_values_that_do_not_pack_verbatim():
+    upper = str(uuid.uuid4()).upper()
+    r = _make(id=upper, start_date="garbage", end_date="2030-02-30", status="Cancelled")
+    assert (r.id, r.start_date, r.end_date, r.status) == (upper, "garbage", "2030-02-30", "Cancelled")
+    assert _make(id="legacy-7").id == "legacy-7"
+    with pytest.raises(ValueError):
+        r.start_ordinal
+
+
+def test_setters_repack():
+    r = _make()
+    r.status = "Declined"
+    r.start_date = "2030-03-05"
+    assert r._status is RequestStatus.Declined and r.start_date == "2030-03-05"
+
+
+def test_other_iso_date_forms_pack_and_are_decided_end_to_end():
+    r = _make(start_date="20300304", end_date="2030-W10-5")
+    assert (r.start_date, r.end_date) == ("2030-03-04", "2030-03-08")
+    assert r.start_ordinal + 4 == r.end_ordinal
+
+    BalanceService.seed_balance("compact-iso", 40)
+    resp = client.post("/vacation-requests", headers=AUTH,
+                       json={"employeeId": "compact-iso", "startDate": "20300304", "endDate": "20300305"})
+    assert resp.status_code == 201
+    assert resp.json()["status"] == "Approved"
+    batch = client.post("/vacation-requests/batch", headers=AUTH, json=[
+        {"employeeId": "compact-iso", "startDate": "2030-W11-1", "endDate": "2030-W11-1"},
+        {"employeeId": "compact-iso", "startDate": "20300312", "endDate": "20300312"},
+    ])
+    assert batch.status_code == 200
+    assert [item["status"] for item in batch.json()] == ["Approved", "Approved"]
+    assert store.get_balance("compact-iso") == 8
+    assert [(q.start_date, q.end_date) for q in store.list_requests("compact-iso")] == [
+        ("2030-03-04", "2030-03-05"), ("2030-03-11", "2030-03-11"), ("2030-03-12", "2030-03-12"),
+    ]
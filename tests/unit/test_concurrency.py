@@ -0,0 +1,99 @@
+import asyncio
+import multiprocessing
+import threading
+from datetime import date, timedelta
+
+from src.services import request_service
+from src.services.balance_service import BalanceService
+from src.services.request_service import RequestService
+from src.lib.sqlite_store import SQLiteStore
+from src.lib.store import store
+
+THREADS = 16
+ATTEMPTS_PER_THREAD = 10
+
+
+def _day(n: int) -> str:
+    # Distinct weekdays so requests never overlap; only the balance can decline them.
+    d = date(2031, 1, 6) + timedelta(days=7 * (n // 5) + n % 5)
+    return d.isoformat()
+
+
+def test_concurrent_requests_never_overdraw():
+    employees = ["stress-a", "stress-b"]
+    for e in employees:
+        BalanceService.seed_balance(e, 120)
+    approved = {e: 0 for e in employees}
+    counter_lock = threading.Lock()
+    barrier = threading.Barrier(THREADS)
+
+    def worker(t: int) -> None:
+        barrier.wait()
+        for i in range(ATTEMPTS_PER_THREAD):
+            e = employees[(t + i) % len(employees)]
+            day = _day(t * ATTEMPTS_PER_THREAD + i)
+            _, ok, _ = RequestService.create_request(e, day, day)
+            if ok:
+                with counter_lock:
+                    approved[e] += 1
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for e in employees:
+        # 120 hours buys exactly fifteen 8-hour days
+        assert approved[e] == 15
+        assert store.get_balance(e) == 0
+        assert len(store.list_requests(e)) == 15
+
+
+def test_async_and_threaded_callers_share_locks():
+    employee = "stress-async"
+    BalanceService.seed_balance(employee, 40)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        tasks = []
+        for n in range(20):
+            day = _day(n)
+            if n % 2:
+                tasks.append(RequestService.create_request_async(employee, day, day))
+            else:
+                tasks.append(loop.run_in_executor(None, RequestService.create_request, employee, day, day))
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+    assert sum(1 for _, ok, _ in results if ok) == 5
+    assert store.get_balance(employee) == 0
+
+
+def _sqlite_worker(path: str, days: range, barrier, results) -> None:
+    # A separate process sharing the database file, as another uvicorn worker would
+    request_service.store = SQLiteStore(path)
+    barrier.wait()
+    results.put(sum(RequestService.create_request("multi", _day(n), _day(n))[1] for n in days))
+
+
+def test_worker_processes_sharing_sqlite_never_overdraw_or_double_book(tmp_path):
+    path = str(tmp_path / "shared.db")
+    shared = SQLiteStore(path)
+    shared.set_balance("multi", 40)
+    ctx = multiprocessing.get_context("fork")
+    barrier, results = ctx.Barrier(3), ctx.Queue()
+    # Two processes race for the same days (overlap check), the third for days of its own (balance check)
+    days = [range(20), range(20), range(20, 40)]
+    workers = [ctx.Process(target=_sqlite_worker, args=(path, d, barrier, results)) for d in days]
+    for w in workers:
+        w.start()
+    approved = sum(results.get(timeout=30) for _ in workers)
+    for w in workers:
+        w.join(timeout=30)
+
+    # Five days of balance
+    assert approved == 5
+    assert shared.get_balance("multi") == 0
+    assert len({r.start_date for r in shared.list_requests("multi")}) == 5
+    shared.close()
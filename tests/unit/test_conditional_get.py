@@ -0,0 +1,96 @@
+import tempfile
+import uuid
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.etag import etag_matches, make_etag
+from src.lib.sqlite_store import SQLiteStore
+from src.lib.store import InMemoryStore, VacationRequest
+from src.services.balance_service import BalanceService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey"}
+
+
+def setup_module(module):
+    BalanceService.seed_balance("etag-eve", 40)
+
+
+def _headers(**extra):
+    return {**AUTH, "X-Employee-Id": "etag-eve", **extra}
+
+
+def _exercise(backend):
+    assert backend.version("v") == 0
+    backend.set_balance("v", 40)
+    after_balance = backend.version("v")
+    req = VacationRequest(str(uuid.uuid4()), "v", "2034-01-02", "2034-01-02", 1, 8, "Approved")
+    backend.add_request("v", req)
+    backend.set_team("v", "ops")
+    backend.remove_request("v", req.id)
+    backend.bulk_load({"v": 8}, [])
+    assert 0 < after_balance < backend.version("v")
+    assert backend.version("other") == 0
+
+
+def test_versions_grow_with_every_mutation():
+    _exercise(InMemoryStore())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "store.db")
+        sqlite = SQLiteStore(path)
+        _exercise(sqlite)
+        # The epoch lives in the database, so other workers on the same file agree on tags
+        other = SQLiteStore(path)
+        assert other.version_epoch == sqlite.version_epoch
+        assert other.version("v") == sqlite.version("v")
+        sqlite.close()
+        other.close()
+
+
+def test_if_none_match_forms():
+    etag = make_etag("abc", 3)
+    assert etag == '"abc-3"'
+    assert etag_matches('"x-1", W/"abc-3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abc-4"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_balance_is_not_modified_until_it_changes():
+    first = client.get("/balance", headers=_headers())
+    etag = first.headers["ETag"]
+    assert first.json() == {"hoursAvailable": 40}
+    cached = client.get("/balance", headers=_headers(**{"If-None-Match": etag}))
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    BalanceService.seed_balance("etag-eve", 32)
+    changed = client.get("/balance", headers=_headers(**{"If-None-Match": etag}))
+    assert changed.status_code == 200
+    assert changed.json() == {"hoursAvailable": 32}
+    assert changed.headers["ETag"] != etag
+
+
+def test_request_list_is_not_modified_until_it_changes():
+    first = client.get("/vacation-requests", headers=_headers())
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert client.get("/vacation-requests", headers=_headers(**{"If-None-Match": etag})).status_code == 304
+    # Served again from the per-version cache
+    assert client.get("/vacation-requests", headers=_headers()).content == first.content
+
+    body = {"employeeId": "etag-eve", "startDate": "2034-02-06", "endDate": "2034-02-06"}
+    created = client.post("/vacation-requests", json=body, headers=AUTH).json()
+    changed = client.get("/vacation-requests", headers=_headers(**{"If-None-Match": etag}))
+    assert changed.status_code == 200
+    assert [r["id"] for r in changed.json()] == [r["id"] for r in first.json()] + [created["id"]]
+    new_etag = changed.headers["ETag"]
+    assert new_etag != etag
+
+    page = client.get("/vacation-requests", params={"limit": 1}, headers=_headers(**{"If-None-Match": new_etag}))
+    assert page.status_code == 304
+    streamed = client.get("/vacation-requests", headers=_headers(Accept="application/x-ndjson"))
+    assert "ETag" not in streamed.headers
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src.lib.date_utils import count_weekdays_inclusive
+
+
+def _reference_count(start_iso: str, end_iso: str) -> int:
+    # The original day-by-day loop, kept as the parity oracle.
+    start = date.fromisoformat(start_iso)
+    end = date.fromisoformat(end_iso)
+    days = 0
+    current = start
+    while current <= end:
+        if current.weekday() < 5:
+            days += 1
+        current += timedelta(days=1)
+    return days
+
+
+def _ranges():
+    base = date(2024, 12, 23)
+    for offset in range(14):
+        start = base + timedelta(days=offset)
+        for length in range(0, 40):
+            end = start + timedelta(days=length)
+            yield start.isoformat(), end.isoformat()
+    yield "2000-02-28", "2031-03-01"
+
+
+def test_closed_form_matches_loop():
+    for start_iso, end_iso in _ranges():
+        assert count_weekdays_inclusive(start_iso, end_iso) == _reference_count(start_iso, end_iso)
+
+
+def test_end_before_start_raises():
+    with pytest.raises(ValueError):
+        count_weekdays_inclusive("2025-01-10", "2025-01-09")
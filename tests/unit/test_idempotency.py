@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.cache import IdempotencyKeyConflict, IdempotentCalls, TTLCache
+from src.services.balance_service import BalanceService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey"}
+
+
+def setup_module(module):
+    BalanceService.seed_balance("idem", 80)
+    BalanceService.seed_balance("idem-mcp", 80)
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    cache = TTLCache(max_entries=2, ttl=10)
+    cache.set("a", 1, now=0)
+    cache.set("b", 2, now=0)
+    assert cache.get("a", now=1) == 1  # a is now most recent
+    cache.set("c", 3, now=1)
+    assert cache.get("b", now=1) is None
+    assert cache.get("a", now=1) == 1
+    assert cache.get("c", now=10.5) == 3
+    assert cache.get("a", now=10.5) is None
+
+
+def test_concurrent_duplicates_share_one_computation():
+    calls = IdempotentCalls(max_entries=10, ttl=60)
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(calls.run("k", "fp", compute) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(runs) == 1
+    assert sorted(replayed for _, replayed in results) == [False, True, True, True, True]
+    assert {value for value, _ in results} == {"result"}
+    # Completed: answered from the cache without computing
+    assert asyncio.run(calls.run("k", "fp", compute)) == ("result", True)
+    assert len(runs) == 1
+    with pytest.raises(IdempotencyKeyConflict):
+        asyncio.run(calls.run("k", "other", compute))
+
+
+def test_failures_are_not_cached():
+    calls = IdempotentCalls(max_entries=10, ttl=60)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(calls.run("k", "fp", flaky))
+    assert asyncio.run(calls.run("k", "fp", flaky)) == ("ok", False)
+
+
+def test_rest_retry_returns_original_result():
+    body = {"employeeId": "idem", "startDate": "2040-05-07", "endDate": "2040-05-08"}
+    first = client.post("/vacation-requests", json=body, headers={**AUTH, "Idempotency-Key": "retry-1"})
+    again = client.post("/vacation-requests", json=body, headers={**AUTH, "Idempotency-Key": "retry-1"})
+    assert first.status_code == again.status_code == 201
+    assert first.json() == again.json() and first.json()["status"] == "Approved"
+    assert "Idempotent-Replayed" not in first.headers
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert client.get("/balance", headers={**AUTH, "X-Employee-Id": "idem"}).json()["hoursAvailable"] == 64
+
+    other = {**body, "endDate": "2040-05-09"}
+    conflict = client.post("/vacation-requests", json=other, headers={**AUTH, "Idempotency-Key": "retry-1"})
+    assert conflict.status_code == 422
+    # Without a key the retry is a new request, which overlaps the first
+    plain = client.post("/vacation-requests", json=body, headers=AUTH)
+    assert plain.json()["reason"] == "Overlapping request exists"
+
+
+def test_mcp_retry_with_idempotency_key():
+    call = {"name": "request_vacation", "arguments": {
+        "employee_id": "idem-mcp", "start_date": "2040-06-04", "idempotency_key": "agent-7",
+    }}
+    first = client.post("/mcp/tools/call", json=call).json()["content"][0]["text"]
+    again = client.post("/mcp/tools/call", json=call).json()["content"][0]["text"]
+    assert "Approved" in first and "earlier call" not in first
+    assert again.startswith(first) and "earlier call with the same idempotency_key" in again
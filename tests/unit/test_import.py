@@ -0,0 +1,125 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.sqlite_store import SQLiteStore
+from src.lib.store import InMemoryStore
+from src.services.balance_service import BalanceService
+from src.services.import_service import BulkImporter, import_lines
+
+
+def test_jsonl_import_validates_and_indexes():
+    target = InMemoryStore()
+    rows = [
+        {"type": "balance", "employeeId": "imp-a", "hours": 200},
+        {"type": "request", "employeeId": "imp-a", "startDate": "2023-03-13", "endDate": "2023-03-17", "id": "r2"},
+        {"type": "request", "employeeId": "imp-a", "startDate": "2023-01-02", "endDate": "2023-01-03", "id": "r1"},
+        {"type": "request", "employeeId": "imp-a", "startDate": "2023-03-15", "endDate": "2023-03-20"},
+        {"type": "request", "employeeId": "imp-a", "startDate": "2023-03-15", "endDate": "2023-03-16", "status": "Declined"},
+        {"type": "request", "employeeId": "imp-a", "startDate": "2023-04-05", "endDate": "2023-04-01"},
+        {"type": "request", "employeeId": "imp-a", "startDate": "2023-05-01", "endDate": "2023-05-01", "status": "Lost"},
+        {"type": "balance", "employeeId": "imp-b"},
+        {"type": "holiday", "employeeId": "imp-b"},
+    ]
+    lines = [json.dumps(r) for r in rows] + ["", "{not json"]
+    report = import_lines(lines, "jsonl", target)
+
+    assert report.rows == 10
+    assert report.balances == 1 and report.requests == 3 and report.rejected == 6
+    assert len(report.errors) == 6 and report.errors[0].startswith("line 4:")
+    assert target.get_balance("imp-a") == 120
+    requests = target.list_requests("imp-a")
+    assert [r.total_days for r in requests] == [5, 2, 2]
+    assert target.employee_id_to_index["imp-a"].ids == ["r1", "r2"]
+
+
+def test_csv_import_across_feeds_rejects_overlap_with_earlier_chunks():
+    target = InMemoryStore()
+    lines = [
+        "type,employeeId,hours,startDate,endDate,status,id,reason",
+        "balance,imp-c,40,,,,,",
+        "request,imp-c,,2023-06-05,2023-06-09,Approved,c1,summer",
+    ]
+    report = import_lines(lines, "csv", target)
+    assert (report.balances, report.requests, report.rejected) == (1, 1, 0)
+    assert target.list_requests("imp-c")[0].reason == "summer"
+
+    again = import_lines(lines[:1] + ["request,imp-c,,2023-06-09,2023-06-12,,,"], "csv", target)
+    assert again.rejected == 1 and "overlaps" in again.errors[0]
+
+
+def test_repeated_and_stored_ids_are_rejected_rows_not_a_failed_chunk(tmp_path):
+    target = SQLiteStore(str(tmp_path / "import.db"))
+    stored = [
+        {"type": "balance", "employeeId": "imp-d", "hours": 40},
+        {"type": "request", "employeeId": "imp-d", "startDate": "2023-07-03", "endDate": "2023-07-04", "id": "d1"},
+    ]
+    assert import_lines([json.dumps(r) for r in stored], "jsonl", target).requests == 1
+
+    rows = [
+        {"type": "request", "employeeId": "imp-d", "startDate": "2023-08-01", "endDate": "2023-08-01", "id": "d2"},
+        {"type": "request", "employeeId": "imp-d", "startDate": "2023-08-08", "endDate": "2023-08-08", "id": "d2"},
+        # Stored under another employee: SQLite ids are unique store-wide
+        {"type": "request", "employeeId": "imp-e", "startDate": "2023-08-01", "endDate": "2023-08-01", "id": "d1"},
+        {"type": "request", "employeeId": "imp-d", "startDate": "2023-07-04", "endDate": "2023-07-05"},
+        {"type": "request", "employeeId": "imp-e", "startDate": "2023-08-02", "endDate": "2023-08-02", "id": "e1"},
+    ]
+    report = import_lines([json.dumps(r) for r in rows], "jsonl", target)
+    assert (report.requests, report.rejected) == (2, 3)
+    assert report.errors == [
+        "line 2: duplicate request id 'd2'",
+        "line 3: duplicate request id 'd1'",
+        "line 4: overlaps another request for this employee",
+    ]
+    assert [r.id for r in target.list_requests("imp-d")] == ["d1", "d2"]
+    assert [r.id for r in target.list_requests("imp-e")] == ["e1"]
+    target.close()
+
+
+def test_admin_import_endpoint_streams_upload():
+    client = TestClient(app)
+    body = "\n".join(
+        json.dumps(r)
+        for r in [
+            {"type": "balance", "employeeId": "imp-http", "hours": 64},
+            {"type": "request", "employeeId": "imp-http", "startDate": "2024-02-05", "endDate": "2024-02-06"},
+        ]
+    )
+    resp = client.post("/admin/import", content=body.encode(), headers={"Authorization": "Bearer devkey"})
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["balances"] == 1 and report["requests"] == 1 and report["rejected"] == 0
+    assert BalanceService.get_balance_hours("imp-http") == 64
+    assert client.post("/admin/import", content=body.encode()).status_code == 403
+
+
+def test_rows_with_non_string_ids_or_pending_status_are_rejected():
+    target = InMemoryStore()
+    rows = [
+        {"type": "balance", "employeeId": 7, "hours": 40},
+        {"type": "request", "employeeId": ["imp-f"], "startDate": "2023-09-04", "endDate": "2023-09-04"},
+        {"type": "request", "employeeId": "imp-f", "startDate": "2023-09-04", "endDate": "2023-09-04", "status": "Pending"},
+    ]
+    report = import_lines([json.dumps(r) for r in rows], "jsonl", target)
+    assert report.rejected == 3
+    assert report.errors[:2] == ["line 1: employeeId must be a string", "line 2: employeeId must be a string"]
+    assert "Pending" in report.errors[2]
+    assert target.list_requests("imp-f") == []
+
+
+def test_csv_quoted_fields_may_span_lines_and_feeds():
+    target = InMemoryStore()
+    importer = BulkImporter("csv", target)
+    importer.feed(["type,employeeId,startDate,endDate,reason", 'request,imp-g,2023-10-02,2023-10-02,"first line'])
+    importer.feed(['second, line"', "request,imp-g,2023-10-09,2023-10-09,plain", 'request,imp-g,2023-10-16,2023-10-16,"open'])
+    report = importer.finish()
+    assert (report.requests, report.rejected) == (2, 1)
+    assert report.errors == ["line 5: unterminated quoted field"]
+    assert [r.reason for r in target.list_requests("imp-g")] == ["first line\nsecond, line", "plain"]
+
+
+def test_admin_import_rejects_invalid_utf8():
+    client = TestClient(app)
+    resp = client.post("/admin/import", content=b'{"type": "balance", "employeeId": "imp-\xff"}', headers={"Authorization": "Bearer devkey"})
+    assert resp.status_code == 400
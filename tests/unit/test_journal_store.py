@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+from datetime import date
+
+from src.lib.accrual import AccrualPolicy
+from src.lib.journal import JournaledStore
+from src.lib.store import VacationRequest
+from src.services import request_service
+from src.services.request_service import RequestService
+
+
+def _request(request_id: str, start: str, end: str) -> VacationRequest:
+    return VacationRequest(
+        id=request_id,
+        employee_id="jo",
+        start_date=start,
+        end_date=end,
+        total_days=1,
+        total_hours=8,
+        status="Approved",
+    )
+
+
+def _open(path) -> JournaledStore:
+    # Long interval: snapshots are triggered explicitly by the tests.
+    return JournaledStore(str(path), snapshot_interval=3600)
+
+
+def test_replays_journal_after_restart(tmp_path):
+    s = _open(tmp_path)
+    assert s.is_empty()
+    s.set_balance("jo", 80)
+    s.add_request("jo", _request("r1", "2030-02-04", "2030-02-04"))
+    s.add_request("jo", _request("r2", "2030-02-11", "2030-02-11"))
+    s.remove_request("jo", "r1")
+    s.set_balance("jo", 64)
+    s.close()
+
+    recovered = _open(tmp_path)
+    assert not recovered.is_empty()
+    assert recovered.get_balance("jo") == 64
+    assert [r.id for r in recovered.list_requests("jo")] == ["r2"]
+    assert len(recovered.employee_id_to_index["jo"]) == 1
+    recovered.close()
+
+
+def test_snapshot_compacts_and_recovers(tmp_path):
+    s = _open(tmp_path)
+    for i in range(50):
+        s.set_balance(f"e{i}", i)
+    s.snapshot()
+    s.set_balance("e0", 99)
+    s.add_request("jo", _request("r1", "2030-02-04", "2030-02-05"))
+    s.close()
+
+    segments = [n for n in os.listdir(tmp_path) if n.startswith("journal-")]
+    assert len(segments) == 1
+
+    recovered = _open(tmp_path)
+    assert recovered.get_balance("e0") == 99
+    assert recovered.get_balance("e49") == 49
+    feb5 = date(2030, 2, 5).toordinal()
+    assert recovered.has_overlap("jo", feb5, feb5)
+    recovered.close()
+
+
+def test_accrual_policies_and_postings_survive_restarts(tmp_path):
+    s = _open(tmp_path)
+    s.set_accrual_policy("jo", AccrualPolicy(hours_per_month=8, cap_hours=100))
+    s.post_accruals(None, 10, lambda balances: {})
+    s.snapshot()
+    s.set_accrual_policy("kim", AccrualPolicy(hours_per_month=4, carry_over_hours=16))
+    s.post_accruals(10, 40, lambda balances: {"jo": 8})
+    s.close()
+
+    recovered = _open(tmp_path)
+    assert recovered.accrual_policies() == {
+        "jo": AccrualPolicy(hours_per_month=8, cap_hours=100),
+        "kim": AccrualPolicy(hours_per_month=4, carry_over_hours=16),
+    }
+    assert (recovered.accrued_through(), recovered.get_balance("jo")) == (40, 8)
+    recovered.close()
+
+
+def test_concurrent_writers_are_all_durable(tmp_path):
+    s = _open(tmp_path)
+
+    def writer(n: int) -> None:
+        for i in range(100):
+            s.set_balance(f"w{n}-{i}", i)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    s.close()
+
+    recovered = _open(tmp_path)
+    assert len(recovered.employee_id_to_balance) == 800
+    assert recovered.get_balance("w7-99") == 99
+    recovered.close()
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    s = _open(tmp_path)
+    s.set_balance("jo", 8)
+    s.close()
+    segment = sorted(n for n in os.listdir(tmp_path) if n.startswith("journal-"))[-1]
+    with open(tmp_path / segment, "ab") as f:
+        f.write(b'{"op":"bal","e":"jo","h":1')
+
+    recovered = _open(tmp_path)
+    assert recovered.get_balance("jo") == 8
+    recovered.close()
+
+
+def test_writes_after_a_torn_segment_start_survive_the_next_restart(tmp_path):
+    s = _open(tmp_path)
+    s.set_balance("a", 10)
+    s.snapshot()
+    s.close()
+    # The crash tore the first record of the fresh segment, which is reopened on restart
+    segment = sorted(n for n in os.listdir(tmp_path) if n.startswith("journal-"))[-1]
+    with open(tmp_path / segment, "ab") as f:
+        f.write(b'{"op":"bal","e":"tor')
+
+    s = _open(tmp_path)
+    s.set_balance("b", 20)
+    s.set_balance("c", 30)
+    s.close()
+
+    recovered = _open(tmp_path)
+    assert [recovered.get_balance(e) for e in ("a", "b", "c")] == [10, 20, 30]
+    recovered.close()
+
+
+def test_approval_and_cancellation_are_one_record_each(tmp_path, monkeypatch):
+    s = _open(tmp_path)
+    monkeypatch.setattr(request_service, "store", s)
+    s.set_balance("jo", 40)
+    req, approved, _ = RequestService.create_request("jo", "2030-02-04", "2030-02-05")
+    assert approved
+    RequestService.cancel_request("jo", req.id)
+    RequestService.create_request("jo", "2030-02-11", "2030-02-11")
+    s.close()
+
+    # A crash can land between records but never inside one: no deduction without its request, or refund without its removal
+    segment = sorted(n for n in os.listdir(tmp_path) if n.startswith("journal-"))[-1]
+    with open(tmp_path / segment, "rb") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["op"] for r in records] == ["bal", "bulk", "refund", "bulk"]
+    assert records[1]["b"] == {"jo": 24} and records[1]["r"][0][0] == req.id
+
+    recovered = _open(tmp_path)
+    assert recovered.get_balance("jo") == 32
+    assert [r.start_date for r in recovered.list_requests("jo")] == ["2030-02-11"]
+    recovered.close()
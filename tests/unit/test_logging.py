@@ -0,0 +1,49 @@
+import io
+import logging
+
+from src.lib import logging as app_logging
+from src.lib.logging import BodySampler, log_body, log_event, setup_logging
+
+
+def test_sampler_caps_dumps_per_second():
+    sampler = BodySampler(rate=1.0, max_per_second=3)
+    assert sum(sampler.allow() for _ in range(100)) == 3
+    assert not BodySampler(rate=0.0, max_per_second=10).allow()
+    assert not BodySampler(rate=1.0, max_per_second=0).allow()
+
+
+def test_events_are_formatted_on_the_writer_thread():
+    calls = []
+
+    class Probe:
+        def __str__(self):
+            import threading
+            calls.append(threading.current_thread().name)
+            return "probe"
+
+    out = io.StringIO()
+    setup_logging(out)
+    try:
+        logger = logging.getLogger("vacationmcp.test")
+        log_event(logger, "unit_event", value=Probe(), n=2)
+        log_event(logger, "hidden_event", logging.DEBUG, value=Probe())
+        app_logging.shutdown_logging()
+        line = out.getvalue().strip()
+        assert line.endswith("unit_event value=probe n=2")
+        assert len(calls) == 1 and calls[0] != "MainThread"
+    finally:
+        setup_logging()
+
+
+def test_log_body_respects_sampler(monkeypatch):
+    out = io.StringIO()
+    setup_logging(out)
+    try:
+        monkeypatch.setattr(app_logging, "body_sampler", BodySampler(rate=1.0, max_per_second=1))
+        logger = logging.getLogger("vacationmcp.test")
+        for i in range(5):
+            log_body(logger, "body_dump", {"i": i})
+        app_logging.shutdown_logging()
+        assert out.getvalue().count("body_dump") == 1
+    finally:
+        setup_logging()
@@ -0,0 +1,87 @@
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.mcp import mcp_endpoints
+from src.services.balance_service import BalanceService
+
+client = TestClient(app)
+
+
+def setup_module(module):
+    BalanceService.seed_balance("batch-a", 40)
+    BalanceService.seed_balance("batch-b", 16)
+
+
+def _call(req_id, name, **arguments):
+    return {"jsonrpc": "2.0", "id": req_id, "method": "tools/call", "params": {"name": name, "arguments": arguments}}
+
+
+def test_batch_preserves_order_and_per_employee_sequence():
+    batch = [
+        _call(1, "check_vacation_balance", employee_id="batch-a"),
+        _call(2, "request_vacation", employee_id="batch-a", start_date="2032-03-01", end_date="2032-03-05"),
+        _call(3, "check_vacation_balance", employee_id="batch-b"),
+        _call(4, "check_vacation_balance", employee_id="batch-a"),
+        {"jsonrpc": "2.0", "id": 5, "method": "tools/list"},
+    ]
+    resp = client.post("/mcp", json=batch)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["id"] for r in body] == [1, 2, 3, 4, 5]
+    assert "40 hours" in body[0]["result"]["content"][0]["text"]
+    assert "Approved" in body[1]["result"]["content"][0]["text"]
+    assert "16 hours" in body[2]["result"]["content"][0]["text"]
+    # Same employee as entry 2, so it must observe the deduction
+    assert "0 hours" in body[3]["result"]["content"][0]["text"]
+    assert body[4]["result"]["tools"]
+
+
+def test_batch_reports_errors_per_entry():
+    batch = [
+        _call(1, "no_such_tool", employee_id="batch-b"),
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        42,
+        _call(2, "check_vacation_balance"),
+        {"jsonrpc": "2.0", "id": 3, "method": "bogus"},
+    ]
+    body = client.post("/mcp", json=batch).json()
+    assert len(body) == 4
+    assert body[0]["id"] == 1 and body[0]["error"]["code"] == -32602
+    assert body[1] == {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+    assert body[2]["id"] == 2 and "employee_id is required" in body[2]["error"]["message"]
+    assert body[3]["error"]["code"] == -32601
+
+
+def test_malformed_entries_fail_alone(monkeypatch):
+    batch = [
+        {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": "x"},
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+         "params": {"name": "check_vacation_balance", "arguments": ["batch-b"]}},
+        _call(3, "check_vacation_balance", employee_id={"id": "batch-b"}),
+        _call(4, "check_vacation_balance", employee_id="batch-b"),
+    ]
+    resp = client.post("/mcp", json=batch)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [(r["id"], r.get("error", {}).get("code")) for r in body] == [(1, -32602), (2, -32602), (3, -32602), (4, None)]
+    assert "16 hours" in body[3]["result"]["content"][0]["text"]
+
+    # An unexpected failure in one entry is an internal error for that entry only
+    real = mcp_endpoints._handle_rpc_message
+
+    async def flaky(message):
+        if message.get("id") == 5:
+            raise RuntimeError("boom")
+        return await real(message)
+
+    monkeypatch.setattr(mcp_endpoints, "_handle_rpc_message", flaky)
+    body = client.post("/mcp", json=[_call(5, "check_vacation_balance", employee_id="batch-b"),
+                                     _call(6, "check_vacation_balance", employee_id="batch-b")]).json()
+    assert body[0] == {"jsonrpc": "2.0", "id": 5, "error": {"code": -32603, "message": "Internal error"}}
+    assert "16 hours" in body[1]["result"]["content"][0]["text"]
+
+
+def test_empty_and_notification_only_batches():
+    assert client.post("/mcp", json=[]).json()["error"]["code"] == -32600
+    resp = client.post("/mcp", json=[{"jsonrpc": "2.0", "method": "notifications/initialized"}])
+    assert resp.status_code == 202
@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.mcp import mcp_endpoints
+from src.mcp.sessions import SERVER_STREAM, SESSION_HEADER, SessionManager, server_stream, session_manager
+from src.services.balance_service import BalanceService
+
+client = TestClient(app)
+SSE_ACCEPT = "application/json, text/event-stream"
+
+
+def setup_module(module):
+    BalanceService.seed_balance("streamer", 24)
+
+
+def _initialize() -> str:
+    resp = client.post("/mcp", json={
+        "jsonrpc": "2.0", "id": 0, "method": "initialize", "params": {"protocolVersion": "2025-03-26"},
+    })
+    assert resp.status_code == 200
+    assert resp.json()["result"]["protocolVersion"] == "2025-03-26"
+    return resp.headers[SESSION_HEADER]
+
+
+def _events(body: str) -> list:
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+        if "data" in fields:
+            events.append((int(fields["id"]), json.loads(fields["data"])))
+    return events
+
+
+def _call(req_id, name, **arguments):
+    return {"jsonrpc": "2.0", "id": req_id, "method": "tools/call", "params": {"name": name, "arguments": arguments}}
+
+
+async def _read_stream(headers: dict, until, on_chunk=None, timeout: float = 5.0) -> str:
+    """Drive GET /mcp/ at the ASGI level, since TestClient buffers whole (here endless) bodies."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/mcp/", "raw_path": b"/mcp/", "query_string": b"", "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("testclient", 50000), "server": ("testserver", 80),
+    }
+    body = bytearray()
+    stop = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await stop.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+            if on_chunk:
+                on_chunk(body.decode())
+            if until(body.decode()):
+                stop.set()
+
+    task = asyncio.create_task(app(scope, receive, send))
+    await asyncio.wait_for(stop.wait(), timeout)
+    await asyncio.wait_for(task, timeout)
+    return body.decode()
+
+
+def test_session_lifecycle():
+    session_id = _initialize()
+    headers = {SESSION_HEADER: session_id}
+    notified = client.post("/mcp", json={"jsonrpc": "2.0", "method": "notifications/initialized"}, headers=headers)
+    assert notified.status_code == 202
+    plain = client.post("/mcp", json=_call(1, "check_vacation_balance", employee_id="streamer"), headers=headers)
+    assert plain.headers["content-type"] == "application/json"
+    assert "24 hours" in plain.json()["result"]["content"][0]["text"]
+
+    assert client.delete("/mcp", headers=headers).status_code == 204
+    gone = client.post("/mcp", json=_call(2, "check_vacation_balance", employee_id="streamer"), headers=headers)
+    assert gone.status_code == 404
+    assert client.delete("/mcp", headers=headers).status_code == 404
+
+
+def test_sse_responses_and_resume_of_post_stream():
+    session_id = _initialize()
+    headers = {SESSION_HEADER: session_id, "Accept": SSE_ACCEPT}
+    batch = [_call(1, "check_vacation_balance", employee_id="streamer"), {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}]
+    resp = client.post("/mcp", json=batch, headers=headers)
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _events(resp.text)
+    assert [message["id"] for _, message in events] == [1, 2]
+    first_id, second_id = events[0][0], events[1][0]
+
+    # The client saw only the first event before disconnecting: resuming replays the rest and ends
+    resumed = client.get("/mcp", headers={SESSION_HEADER: session_id, "Accept": "text/event-stream", "Last-Event-ID": str(first_id)})
+    assert _events(resumed.text) == [(second_id, events[1][1])]
+
+
+def test_server_stream_carries_keepalives_not_responses(monkeypatch):
+    monkeypatch.setattr(mcp_endpoints, "SSE_KEEPALIVE_SECONDS", 0.05)
+    session_id = _initialize()
+    headers = {SESSION_HEADER: session_id, "Accept": SSE_ACCEPT}
+    client.post("/mcp", json=_call(1, "check_vacation_balance", employee_id="streamer"), headers=headers)
+
+    def on_chunk(text):
+        if text.count("keep-alive") == 2:
+            session_manager.delete(session_id)
+
+    body = asyncio.run(_read_stream(headers, lambda text: text.count("keep-alive") >= 2, on_chunk))
+    # POST responses stay on their own streams
+    assert _events(body) == []
+    assert session_manager.get(session_id) is None
+
+
+def test_waits_clean_up_and_an_open_stream_keeps_its_session_alive():
+    manager = SessionManager(ttl=0.2)
+    session = manager.create()
+
+    async def scenario():
+        assert await session.wait(SERVER_STREAM, 0, 0.01) == []
+        assert session._waiters == []
+        post = session.new_stream()
+        session.record(post, [{"jsonrpc": "2.0", "id": 1, "result": {}}])
+        # Recorded before the wait began: returned at once rather than after the timeout
+        assert len(await asyncio.wait_for(session.wait(post, 0, 60), 1)) == 1
+
+        stream = server_stream(session, 1, keepalive=0.05)
+        for _ in range(6):
+            assert await stream.__anext__() == b": keep-alive\n\n"
+        await stream.aclose()
+
+    asyncio.run(scenario())
+    # Idle longer than the TTL, but the stream was open the whole time
+    assert manager.get(session.id) is session
+
+
+def test_stream_requires_a_live_session():
+    resp = client.get("/mcp", headers={"Accept": "text/event-stream", SESSION_HEADER: "nope"})
+    assert resp.status_code == 404
+    assert client.get("/mcp", headers={"Accept": "text/event-stream"}).status_code == 400
+    # Plain GET keeps serving the tools listing
+    assert client.get("/mcp").json()["type"] == "mcp_list_tools"
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.metrics import Counter, Gauge, Histogram, MetricsRegistry
+from src.middleware.rate_limit import GCRALimiter, Quota, _enforce
+from src.services.balance_service import BalanceService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey", "X-Employee-Id": "metered"}
+
+
+def setup_module(module):
+    BalanceService.seed_balance("metered", 8)
+
+
+def test_counter_sums_thread_shards():
+    counter = Counter("c_total", "test", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc("b", amount=2)
+    assert counter.values() == {("a",): 8000, ("b",): 2}
+
+
+def test_histogram_and_gauge_exposition():
+    registry = MetricsRegistry()
+    hist = registry.register(Histogram("lat_seconds", "test", ("route",), buckets=(0.1, 1.0)))
+    gauge = registry.register(Gauge("busy", "test"))
+    hist.observe(0.05, "/a")
+    hist.observe(0.5, "/a")
+    hist.observe(5.0, "/a")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    text = registry.render()
+    assert '# TYPE lat_seconds histogram' in text
+    assert 'lat_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'lat_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'lat_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'lat_seconds_count{route="/a"} 3' in text
+    assert "busy 1" in text
+
+
+def test_metrics_endpoint_reports_routes_tools_and_decisions():
+    client.get("/balance", headers=AUTH)
+    client.post("/vacation-requests", json={"employeeId": "metered", "startDate": "2037-06-01", "endDate": "2037-06-05"}, headers=AUTH)
+    client.post("/mcp/tools/call", json={"name": "check_vacation_balance", "arguments": {"employee_id": "metered"}})
+    client.post("/mcp/tools/call", json={"name": "no_such_tool", "arguments": {}})
+    limiter = GCRALimiter(Quota(per_minute=1, burst=1), name="test_limiter")
+    _enforce(limiter, "k")
+    with pytest.raises(HTTPException):
+        _enforce(limiter, "k")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert 'vacationmcp_http_request_duration_seconds_count{method="GET",route="/balance",status="200"}' in text
+    assert 'vacationmcp_mcp_tool_duration_seconds_count{tool="check_vacation_balance",outcome="ok"}' in text
+    assert 'vacationmcp_mcp_tool_duration_seconds_count{tool="unknown",outcome="invalid"}' in text
+    assert 'vacationmcp_vacation_requests_total{status="Declined",reason="insufficient_balance"}' in text
+    assert 'vacationmcp_rate_limit_rejections_total{limiter="test_limiter"} 1' in text
+    assert 'vacationmcp_store_size{kind="employees"}' in text
+    assert "vacationmcp_http_requests_in_flight 1" in text  # the scrape itself
@@ -0,0 +1,39 @@
+from src.lib.store import store
+from src.services.balance_service import BalanceService
+from src.services.request_service import RequestService
+
+
+def setup_module(module):
+    BalanceService.seed_balance("olga", 120)
+
+
+def test_overlap_detection_uses_index():
+    req, ok, _ = RequestService.create_request("olga", "2030-03-04", "2030-03-08")
+    assert ok
+    _, ok, _ = RequestService.create_request("olga", "2030-03-18", "2030-03-19")
+    assert ok
+    for start, end in [
+        ("2030-03-01", "2030-03-04"),
+        ("2030-03-08", "2030-03-11"),
+        ("2030-03-05", "2030-03-06"),
+        ("2030-02-25", "2030-03-29"),
+        ("2030-03-19", "2030-03-19"),
+    ]:
+        declined, ok, reason = RequestService.create_request("olga", start, end)
+        assert not ok and reason == "Overlapping request exists", (start, end)
+    _, ok, _ = RequestService.create_request("olga", "2030-03-11", "2030-03-15")
+    assert ok
+    assert len(store.employee_id_to_index["olga"]) == 3
+    assert store.employee_id_to_index["olga"].starts == sorted(store.employee_id_to_index["olga"].starts)
+
+
+def test_cancel_keeps_index_consistent():
+    before = BalanceService.get_balance_hours("olga")
+    req, ok, _ = RequestService.create_request("olga", "2030-06-03", "2030-06-04")
+    assert ok
+    assert RequestService.cancel_request("olga", req.id) is req
+    assert BalanceService.get_balance_hours("olga") == before
+    assert RequestService.cancel_request("olga", req.id) is None
+    assert len(store.employee_id_to_index["olga"]) == 3
+    _, ok, _ = RequestService.create_request("olga", "2030-06-03", "2030-06-04")
+    assert ok
@@ -0,0 +1,109 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.sqlite_store import SQLiteStore
+from src.lib.store import InMemoryStore, RequestFilter, VacationRequest
+from src.services.balance_service import BalanceService
+from src.services.request_service import RequestService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey", "X-Employee-Id": "pager"}
+
+
+def _monday(week: int) -> str:
+    return (date(2034, 1, 2) + timedelta(weeks=week)).isoformat()
+
+
+def setup_module(module):
+    BalanceService.seed_balance("pager", 120)
+    for week in range(12):
+        day = _monday(week)
+        RequestService.create_request("pager", day, day)
+
+
+def _walk(limit, **kwargs):
+    seen, cursor = [], None
+    while True:
+        items, cursor = RequestService.page_requests("pager", cursor, limit, **kwargs)
+        seen.extend(i.start_date for i in items)
+        if cursor is None:
+            return seen
+
+
+def test_cursor_walk_matches_full_list():
+    full = [r.start_date for r in RequestService.list_requests("pager")]
+    assert len(full) == 12
+    for limit in (1, 5, 12, 50):
+        assert _walk(limit) == full
+
+
+def test_filters_and_bad_input():
+    filters = RequestService.build_filter(_monday(3), _monday(6), "Approved")
+    assert _walk(2, filters=filters) == [_monday(w) for w in range(3, 7)]
+    assert _walk(2, filters=RequestService.build_filter(status="Declined")) == []
+    with pytest.raises(ValueError):
+        RequestService.page_requests("pager", "not-a-cursor", 5)
+    with pytest.raises(ValueError):
+        RequestService.page_requests("pager", None, 0)
+    with pytest.raises(ValueError):
+        RequestService.build_filter("yesterday")
+
+
+def test_cursor_survives_removal():
+    items, cursor = RequestService.page_requests("pager", None, 3)
+    RequestService.cancel_request("pager", items[1].id)
+    rest, _ = RequestService.page_requests("pager", cursor, 3)
+    assert rest[0].start_date == _monday(3)
+    RequestService.create_request("pager", items[1].start_date, items[1].start_date)
+
+
+def test_rest_pagination_and_ndjson():
+    first = client.get("/vacation-requests?limit=5", headers=AUTH)
+    assert first.status_code == 200 and len(first.json()) == 5
+    cursor = first.headers["x-next-cursor"]
+    second = client.get(f"/vacation-requests?limit=5&cursor={cursor}", headers=AUTH)
+    assert second.json()[0]["startDate"] not in {r["startDate"] for r in first.json()}
+
+    ranged = client.get(f"/vacation-requests?from={_monday(10)}&to={_monday(11)}", headers=AUTH)
+    assert [r["startDate"] for r in ranged.json()] == [_monday(10), _monday(11)]
+    assert "x-next-cursor" not in ranged.headers
+    assert client.get("/vacation-requests?cursor=zzz", headers=AUTH).status_code == 400
+
+    streamed = client.get("/vacation-requests?status=Approved", headers={**AUTH, "Accept": "application/x-ndjson"})
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert len(lines) == 12 and all(line["employeeId"] == "pager" for line in lines)
+
+
+def test_mcp_tool_pages_with_cursor_hint():
+    body = client.post(
+        "/mcp/tools/call",
+        json={"name": "list_vacation_requests", "arguments": {"employee_id": "pager", "limit": 2}},
+    ).json()
+    text = body["content"][0]["text"]
+    assert text.count("  - Request ") == 2
+    cursor = text.rsplit("cursor=", 1)[1]
+    nxt = client.post(
+        "/mcp/tools/call",
+        json={"name": "list_vacation_requests", "arguments": {"employee_id": "pager", "limit": 20, "cursor": cursor}},
+    ).json()["content"][0]["text"]
+    assert nxt.count("  - Request ") == 10 and "cursor=" not in nxt
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_store_page_parity(backend, tmp_path):
+    s = InMemoryStore() if backend == "memory" else SQLiteStore(str(tmp_path / "p.db"))
+    for n in range(7):
+        day = _monday(n)
+        s.add_request("p", VacationRequest(f"r{n}", "p", day, day, 1, 8, "Declined" if n == 4 else "Approved"))
+    s.remove_request("p", "r2")
+    items, nxt = s.page_requests("p", 0, 3)
+    assert [i.id for i in items] == ["r0", "r1", "r3"] and nxt is not None
+    items, nxt = s.page_requests("p", nxt, 3)
+    assert [i.id for i in items] == ["r4", "r5", "r6"] and nxt is None
+    only_approved = RequestFilter(start_ordinal=date.fromisoformat(_monday(3)).toordinal(), status="Approved")
+    assert [i.id for i in s.page_requests("p", 0, 10, only_approved)[0]] == ["r3", "r5", "r6"]
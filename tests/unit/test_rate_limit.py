@@ -0,0 +1,91 @@
+import pytest
+from fastapi.testclient import TestClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from src.app import app
+from src.middleware.rate_limit import GCRALimiter, Quota, _env_quotas, mcp_client_limiter
+
+
+def test_burst_then_steady_rate():
+    limiter = GCRALimiter(Quota(per_minute=60, burst=3))
+    now = 1000.0
+    assert [limiter.acquire("k", now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    retry = limiter.acquire("k", now)
+    assert 0.99 < retry <= 1.0
+    # One token per second afterwards
+    assert limiter.acquire("k", now + 1.0) == 0.0
+    assert limiter.acquire("k", now + 1.0) > 0
+    # A long idle period refills to the burst size, not beyond it
+    later = now + 3600
+    assert [limiter.acquire("k", later) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("k", later) > 0
+
+
+def test_per_key_quotas_and_unlimited_default():
+    limiter = GCRALimiter(None, {"hr-sync": Quota(per_minute=1, burst=1)})
+    assert all(limiter.acquire("anyone", 0.0) == 0.0 for _ in range(100))
+    assert limiter.acquire("hr-sync", 0.0) == 0.0
+    assert limiter.acquire("hr-sync", 0.0) > 0
+    assert len(limiter) == 1
+
+
+def test_env_quotas_treat_zero_as_unlimited_and_reject_malformed_entries(monkeypatch):
+    monkeypatch.setenv("TEST_QUOTAS", " hr-sync=30/5, alice=0 ,")
+    quotas = _env_quotas("TEST_QUOTAS")
+    assert quotas == {"hr-sync": Quota(per_minute=30, burst=5), "alice": None}
+    limiter = GCRALimiter(Quota(per_minute=1, burst=1), quotas)
+    assert all(limiter.acquire("alice", 0.0) == 0.0 for _ in range(100))
+    assert limiter.acquire("bob", 0.0) == 0.0 and limiter.acquire("bob", 0.0) > 0
+
+    for value in ("alice", "=5", "alice=fast", "alice=10/1.5", "alice=-1", "alice=inf", "alice=10/0"):
+        monkeypatch.setenv("TEST_QUOTAS", value)
+        with pytest.raises(ValueError, match="TEST_QUOTAS"):
+            _env_quotas("TEST_QUOTAS")
+
+
+def test_idle_keys_are_evicted_lru():
+    limiter = GCRALimiter(Quota(per_minute=60, burst=1), max_keys=100)
+    for i in range(1000):
+        limiter.acquire(f"k{i}", 0.0)
+    assert len(limiter) == 100
+    # Recently used keys are retained with their state
+    assert limiter.acquire("k999", 0.0) > 0
+    assert limiter.acquire("k0", 0.0) == 0.0
+
+
+def test_mcp_routes_are_limited_per_client():
+    client = TestClient(app)  # requests come from host "testclient"
+    saved = mcp_client_limiter.quotas.copy()
+    mcp_client_limiter.quotas["testclient"] = Quota(per_minute=1, burst=1)
+    mcp_client_limiter._tat.pop("testclient", None)
+    try:
+        assert client.get("/mcp/health").status_code == 200
+        resp = client.get("/mcp/health")
+        assert resp.status_code == 429
+        assert int(resp.headers["retry-after"]) >= 1
+    finally:
+        mcp_client_limiter.quotas = saved
+        mcp_client_limiter._tat.pop("testclient", None)
+
+
+def test_mcp_clients_behind_a_trusted_proxy_get_their_own_quota():
+    # As deployed: uvicorn --proxy-headers with the proxy in --forwarded-allow-ips
+    proxied = TestClient(ProxyHeadersMiddleware(app, trusted_hosts=["testclient"]))
+    untrusted = TestClient(ProxyHeadersMiddleware(app, trusted_hosts=["127.0.0.1"]))
+    saved = mcp_client_limiter.quotas.copy()
+    keys = ("203.0.113.7", "203.0.113.8", "testclient")
+    for key in keys:
+        mcp_client_limiter.quotas[key] = Quota(per_minute=1, burst=1)
+        mcp_client_limiter._tat.pop(key, None)
+    try:
+        first = {"X-Forwarded-For": "203.0.113.7"}
+        assert proxied.get("/mcp/health", headers=first).status_code == 200
+        assert proxied.get("/mcp/health", headers=first).status_code == 429
+        assert proxied.get("/mcp/health", headers={"X-Forwarded-For": "203.0.113.8"}).status_code == 200
+        # A header from a peer that is not a trusted proxy is ignored
+        assert untrusted.get("/mcp/health", headers={"X-Forwarded-For": "203.0.113.9"}).status_code == 200
+        assert untrusted.get("/mcp/health", headers={"X-Forwarded-For": "203.0.113.10"}).status_code == 429
+    finally:
+        mcp_client_limiter.quotas = saved
+        for key in keys:
+            mcp_client_limiter._tat.pop(key, None)
@@ -0,0 +1,52 @@
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.lib.serialization import dumps
+from src.models.schemas import VacationRequest as VacationRequestModel
+from src.services.balance_service import BalanceService
+from src.services.request_service import RequestService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer devkey", "X-Employee-Id": "serial"}
+
+
+def setup_module(module):
+    BalanceService.seed_balance("serial", 120)
+    RequestService.create_request("serial", "2036-03-03", "2036-03-04")
+    RequestService.create_request("serial", "2036-03-10", "2036-03-10")
+
+
+def test_fast_path_matches_pydantic_encoding():
+    items = RequestService.list_requests("serial")
+    legacy = jsonable_encoder([VacationRequestModel(**i.as_api_dict()) for i in items])
+    assert dumps([i.as_api_dict() for i in items]) == json.dumps(legacy, separators=(",", ":")).encode()
+
+
+def test_list_route_body_unchanged():
+    r = client.get("/vacation-requests", headers=AUTH)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    body = r.json()
+    assert [VacationRequestModel(**b).model_dump() for b in body] == body
+    assert [b["status"] for b in body] == ["Approved", "Approved"]
+
+
+def test_openapi_still_documents_response_models():
+    schema = client.get("/openapi.json").json()
+    ok = schema["paths"]["/vacation-requests"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert ok["schema"]["items"]["$ref"].endswith("/VacationRequest")
+    batch = schema["paths"]["/vacation-requests/batch"]["post"]["responses"]["200"]["content"]["application/json"]
+    assert batch["schema"]["items"]["$ref"].endswith("/BatchRequestResult")
+
+
+def test_mcp_responses_are_json():
+    r = client.post("/mcp/tools/call", json={"name": "check_vacation_balance", "arguments": {"employee_id": "serial"}})
+    assert r.status_code == 200
+    assert "hours of vacation available" in r.json()["content"][0]["text"]
+    r = client.post("/mcp/", json={"jsonrpc": "2.0", "id": 7, "method": "tools/list"})
+    assert r.json()["id"] == 7
+    r = client.post("/mcp/", content=b"not json", headers={"Content-Type": "application/json"})
+    assert r.json()["error"]["code"] == -32700
@@ -0,0 +1,123 @@
+from datetime import date
+
+import pytest
+
+from src.lib.accrual import AccrualPolicy
+from src.lib.store import InMemoryStore, VacationRequest, create_store
+from src.lib.sqlite_store import SQLiteStore
+
+
+def _ordinal(iso: str) -> int:
+    return date.fromisoformat(iso).toordinal()
+
+
+def _request(request_id: str, start: str, end: str, status: str = "Approved") -> VacationRequest:
+    return VacationRequest(
+        id=request_id,
+        employee_id="erin",
+        start_date=start,
+        end_date=end,
+        total_days=1,
+        total_hours=8,
+        status=status,
+    )
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryStore()
+    else:
+        s = SQLiteStore(str(tmp_path / "store.db"))
+        yield s
+        s.close()
+
+
+def test_balance_roundtrip(backend):
+    assert backend.get_balance("erin") == 0
+    backend.set_balance("erin", 40)
+    backend.set_balance("erin", 32)
+    assert backend.get_balance("erin") == 32
+    backend.set_balance("fay", 8)
+    assert backend.get_balances(["fay", "erin", "nobody", "fay"]) == {"fay": 8, "erin": 32, "nobody": 0}
+
+
+def test_requests_and_overlap(backend):
+    backend.add_request("erin", _request("r2", "2030-05-13", "2030-05-14"))
+    backend.add_request("erin", _request("r1", "2030-05-06", "2030-05-07"))
+    backend.add_request("erin", _request("r3", "2030-05-20", "2030-05-24", status="Declined"))
+    assert [r.id for r in backend.list_requests("erin")] == ["r2", "r1", "r3"]
+    assert backend.list_requests("nobody") == []
+
+    assert backend.has_overlap("erin", _ordinal("2030-05-07"), _ordinal("2030-05-08"))
+    assert backend.has_overlap("erin", _ordinal("2030-05-01"), _ordinal("2030-05-31"))
+    assert not backend.has_overlap("erin", _ordinal("2030-05-08"), _ordinal("2030-05-10"))
+    assert not backend.has_overlap("erin", _ordinal("2030-05-21"), _ordinal("2030-05-22"))
+
+    removed = backend.remove_request("erin", "r1")
+    assert removed is not None and removed.start_date == "2030-05-06"
+    assert backend.remove_request("erin", "r1") is None
+    assert not backend.has_overlap("erin", _ordinal("2030-05-06"), _ordinal("2030-05-07"))
+
+
+def test_sqlite_persists_across_instances(tmp_path):
+    path = str(tmp_path / "persist.db")
+    first = SQLiteStore(path)
+    first.set_balance("erin", 24)
+    first.add_request("erin", _request("r1", "2030-01-07", "2030-01-07"))
+    first.close()
+
+    second = create_store("sqlite", path)
+    assert second.get_balance("erin") == 24
+    assert [r.id for r in second.list_requests("erin")] == ["r1"]
+    second.close()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_store("carrier-pigeon")
+
+
+def test_bulk_load_builds_index(backend):
+    backend.add_request("erin", _request("live", "2030-07-01", "2030-07-02"))
+    backend.bulk_load(
+        {"erin": 16, "gus": 40},
+        [_request("b2", "2030-08-05", "2030-08-06"), _request("b1", "2030-06-03", "2030-06-04")],
+    )
+    assert backend.get_balances(["erin", "gus"]) == {"erin": 16, "gus": 40}
+    assert backend.counts() == (2, 3)
+    assert [r.id for r in backend.list_requests("erin")] == ["live", "b2", "b1"]
+    assert backend.has_overlap("erin", _ordinal("2030-06-04"), _ordinal("2030-06-04"))
+    assert backend.has_overlap("erin", _ordinal("2030-07-02"), _ordinal("2030-08-05"))
+    assert not backend.has_overlap("erin", _ordinal("2030-06-05"), _ordinal("2030-06-28"))
+
+
+def test_booked_ranges_and_existing_ids(backend):
+    backend.bulk_load({}, [
+        _request("r1", "2030-05-06", "2030-05-07"),
+        _request("r2", "2030-05-13", "2030-05-13", status="Declined"),
+    ])
+    assert backend.booked_ranges(["erin", "nobody"]) == {
+        "erin": [(_ordinal("2030-05-06"), _ordinal("2030-05-07"))], "nobody": [],
+    }
+    assert backend.existing_request_ids([("erin", "r1"), ("erin", "r2"), ("erin", "r3")]) == {"r1", "r2"}
+
+
+def test_accrual_policies_and_posting_marker(backend):
+    assert backend.get_accrual_policy("erin") is None
+    backend.set_accrual_policy("erin", AccrualPolicy(hours_per_month=8, carry_over_hours=40))
+    backend.set_accrual_policy("fay", AccrualPolicy(hours_per_month=10))
+    backend.set_accrual_policy("fay", None)
+    assert backend.accrual_policies() == {"erin": AccrualPolicy(hours_per_month=8, carry_over_hours=40)}
+
+    assert backend.accrued_through() is None
+    assert backend.post_accruals(None, 100, lambda balances: {}) == {}
+    backend.set_balance("erin", -8)
+    before = backend.version("erin")
+    # The callback sees the balances as they stand inside the posting
+    assert backend.post_accruals(100, 130, lambda balances: {"erin": balances["erin"] + 8}) == {"erin": 0}
+    assert backend.get_balance("erin") == 0
+    assert backend.version("erin") > before
+    # A poster that read the old marker must not credit the month again
+    assert backend.post_accruals(100, 130, lambda balances: {"erin": 8}) is None
+    assert (backend.accrued_through(), backend.get_balance("erin")) == (130, 0)
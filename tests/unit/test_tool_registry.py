@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from fastmcp import FastMCP
+
+from src.mcp.mcp_endpoints import MCP_TOOLS
+from src.mcp.registry import ToolArgumentError, UnknownToolError, tool_registry
+from src.services.balance_service import BalanceService
+
+
+def setup_module(module):
+    BalanceService.seed_balance("reggie", 40)
+
+
+def test_aliases_defaults_and_normalizers():
+    tool = tool_registry.get("request_vacation")
+    bound = tool.bind({"employeeId": "reggie", "day": "2038-02-01"})
+    assert bound == {"employee_id": "reggie", "start_date": "2038-02-01", "end_date": "2038-02-01"}
+    listing = tool_registry.get("list_vacation_requests").bind({"employee_id": "reggie", "limit": "5"})
+    assert listing == {"employee_id": "reggie", "limit": 5}
+
+
+def test_missing_arguments_are_named():
+    with pytest.raises(ToolArgumentError, match="^employee_id is required$"):
+        tool_registry.get("check_vacation_balance").bind({})
+    with pytest.raises(ToolArgumentError, match="employee_id, start_date, and end_date are all required"):
+        tool_registry.get("request_vacation").bind({})
+    with pytest.raises(UnknownToolError):
+        tool_registry.get("nope")
+
+
+def test_http_catalogue_comes_from_registry():
+    assert [t["name"] for t in MCP_TOOLS] == [t.name for t in tool_registry]
+    schema = MCP_TOOLS[2]["inputSchema"]
+    assert schema["required"] == ["employee_id"]
+    assert schema["properties"]["status"]["enum"] == ["Pending", "Approved", "Declined"]
+
+
+def test_fastmcp_registration_uses_the_same_handlers():
+    server = FastMCP("registry-test")
+    for tool in tool_registry:
+        server.add_tool(tool.as_function(), name=tool.name, description=tool.description)
+
+    async def run():
+        tools = await server.get_tools()
+        params = tools["request_vacation"].parameters
+        assert params["required"] == ["employee_id", "start_date", "end_date"]
+        assert params["properties"]["start_date"]["description"].startswith("Start date")
+        return await server._mcp_call_tool("check_vacation_balance", {"employee_id": "reggie"})
+
+    content = asyncio.run(run())
+    assert content[0].text == "Employee reggie has 40 hours of vacation available."
@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.mcp.mcp_endpoints import MCP_TOOLS
+
+client = TestClient(app)
+
+
+def test_listing_shape_and_unique_ids():
+    first = client.get("/mcp/tools")
+    second = client.post("/mcp/tools")
+    assert first.status_code == 200 and second.status_code == 200
+    a, b = first.json(), second.json()
+    assert a["id"].startswith("mcpl_") and len(a["id"]) == len("mcpl_") + 32
+    assert a["id"] != b["id"]
+    assert a["type"] == "mcp_list_tools" and a["server_label"] == "vacation-mcp"
+    assert [t["name"] for t in a["tools"]] == [t["name"] for t in MCP_TOOLS]
+    schema = a["tools"][0]["input_schema"]
+    assert schema["$schema"] == "https://json-schema.org/draft/2020-12/schema"
+    assert schema["additionalProperties"] is False
+    assert a["tools"][0]["annotations"] is None
+    # The shared catalogue is never mutated by serving it
+    assert "$schema" not in MCP_TOOLS[0]["inputSchema"]
+
+
+def test_etag_revalidation():
+    resp = client.get("/mcp")
+    etag = resp.headers["etag"]
+    assert etag.startswith('"')
+    for path in ("/mcp", "/mcp/", "/mcp/tools"):
+        cached = client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.content == b""
+    assert client.get("/mcp/tools", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_jsonrpc_tools_list():
+    body = client.post("/mcp", json={"jsonrpc": "2.0", "id": 7, "method": "tools/list"}).json()
+    tools = body["result"]["tools"]
+    assert [t["name"] for t in tools] == [t["name"] for t in MCP_TOOLS]
+    assert tools[0]["annotations"] == {}
+    assert tools[0]["inputSchema"]["additionalProperties"] is False